@@ -1,7 +1,11 @@
 import dotenv
+import json
 import os
 
 dotenv.load_dotenv(override=True)
+# Tools that import or spawn the app (util.loadtest, util.profile_pages) pin
+# settings that must win over .env as a JSON object in TH_BL_ENV_OVERRIDES.
+os.environ.update(json.loads(os.environ.get('TH_BL_ENV_OVERRIDES') or '{}'))
 IS_PROD = os.environ.get('FLASK_ENV', 'production') == 'production'
 if IS_PROD:
     print('Monkey patching for Gevent')
@@ -11,9 +15,12 @@ if IS_PROD:
 import dash
 import dash_auth
 import dash_bootstrap_components as dbc
-import json
+import functools
 
+import util.auth
+import util.discord
 import util.seasons
+import util.timing
 from util.passwords import hash_password, verify_password
 
 # Grab logo
@@ -43,6 +50,7 @@ app = dash.Dash(
 # it can be run standalone to mint hashes; imported above.
 
 
+@functools.lru_cache(maxsize=1)
 def load_admins():
     """Return {username: password_hash} for every configured admin.
 
@@ -50,7 +58,8 @@ def load_admins():
       * ``TH_BL_USERS`` -- a JSON object of ``{"username": "<hash>"}``.
       * ``TH_BL_USER`` + ``TH_BL_PASSWORD_HASH`` -- the legacy single-account
         pair, kept for backward compatibility.
-    Generate hashes with ``hash_password()``.
+    Generate hashes with ``hash_password()``. Read once per process (the env
+    doesn't change under a running worker); restart to pick up new accounts.
     """
     admins = {}
     raw = os.getenv('TH_BL_USERS')
@@ -75,7 +84,7 @@ def check_user(username, password):
     stored_hash = load_admins().get(username)
     if not stored_hash:
         return False
-    return verify_password(password, stored_hash)
+    return util.auth.verify_cached(username, password, stored_hash)
 
 
 def get_user_groups(user):
@@ -102,6 +111,7 @@ dash_auth.BasicAuth(
         '/leaderboard',
         '/locations',
         '/rules',
+        '/api/badge-image/<key>.png',  # Public badge card downloads
         '/login',  # Example public login page (if needed)
         '/_favicon.ico',  # Favicon (avoids auth for icon requests)
         '/_dash-layout',  # Required for initial page layout
@@ -145,6 +155,7 @@ def serve_layout():
             ]), color='dark', dark=True),
             dash.dcc.Store(id='season-nav-noop'),
             dash.dcc.Store(id='season-link-noop'),
+            dash.dcc.Store(id='infinite-scroll-noop'),
             dbc.Container([
                 dash.page_container,
             ], class_name='my-1', id='page_container')
@@ -156,6 +167,9 @@ def serve_layout():
 app.layout = serve_layout
 server = app.server
 
+# Server-Timing header + one structured log line per request (TH_BL_TIMING=0 disables).
+util.timing.install(app)
+
 dash.clientside_callback(
     dash.ClientsideFunction(namespace='clientside', function_name='updatePageFluidity'),
     dash.Output('page_container', 'fluid'),
@@ -185,12 +199,48 @@ dash.clientside_callback(
     dash.Input('_pages_location', 'pathname'),
 )
 
+# Install (once) the observer that pages windowed badge grids as they scroll.
+dash.clientside_callback(
+    dash.ClientsideFunction(namespace='clientside', function_name='installInfiniteScroll'),
+    dash.Output('infinite-scroll-noop', 'data'),
+    dash.Input('_pages_location', 'pathname'),
+)
+
 
 @server.get('/health')
 def check_health():
     return 'ok', 200
 
 
+@server.get('/api/discord-stats')
+def discord_stats():
+    """Discord webhook counters (requires auth). Per worker: each has its own client."""
+    from flask import jsonify
+    return jsonify(pid=os.getpid(), webhook=util.discord.CLIENT.snapshot())
+
+
+@server.get('/api/badge-image/<key>.png')
+def badge_image(key):
+    """Serve a badge card PNG by content key (see ``util.badge_images``).
+
+    The key is a hash of everything drawn on the card, so a given URL always
+    means the same pixels and can be cached forever.
+    """
+    import util.badge_images
+    from flask import Response
+
+    if len(key) != 32 or any(c not in '0123456789abcdef' for c in key):
+        return 'Unknown badge', 404
+    png = util.badge_images.image_for_key(key)
+    if png is None:
+        return 'Unknown badge', 404
+    return Response(
+        png,
+        mimetype='image/png',
+        headers={'Cache-Control': 'public, max-age=31536000, immutable'},
+    )
+
+
 def _exportable_files():
     """Map basename -> path for every data file we're willing to serve.
 
@@ -245,4 +295,7 @@ def export_badges():
 
 
 if __name__ == '__main__':
+    # Only the server drains the outbox (gunicorn does it per worker in
+    # gunicorn.conf.py); tools that merely import the app must not post.
+    util.discord.start_outbox()
     app.run(debug=not IS_PROD, host='0.0.0.0', port=8080)
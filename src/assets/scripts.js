@@ -64,6 +64,57 @@ window.dash_clientside.clientside = {
     return window.dash_clientside.no_update;
   },
 
+  // Page windowed badge grids (components/badge_grid.py) like an infinite
+  // scroll: click a grid's "Show more" button once it nears the viewport, and
+  // again after each page lands while it is still in view.
+  installInfiniteScroll: function (pathname) {
+    if (window.__infiniteScroll) {
+      return window.dash_clientside.no_update;
+    }
+    window.__infiniteScroll = true;
+    const observed = new WeakSet();
+    const loading = new WeakSet();  // clicked; waiting for the page to land
+    const visible = new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting && !loading.has(entry.target)) {
+          loading.add(entry.target);
+          entry.target.click();
+        }
+      });
+    }, { rootMargin: '200px' });
+    const watch = function () {
+      document.querySelectorAll('.badge-grid-more').forEach(function (el) {
+        if (observed.has(el)) { return; }
+        observed.add(el);
+        visible.observe(el);
+      });
+    };
+    // The observer only reports visibility *changes*, so a button still in
+    // view after a page is appended (tall screen, short page) would never
+    // fire again. Re-observing reports the current state, so re-arm a grid's
+    // button whenever its cards change.
+    const rearm = new Set();
+    const flush = function () {
+      rearm.forEach(function (el) {
+        loading.delete(el);
+        visible.unobserve(el);
+        visible.observe(el);
+      });
+      rearm.clear();
+    };
+    new MutationObserver(function (records) {
+      watch();
+      records.forEach(function (record) {
+        const grid = record.target.closest ? record.target.closest('.badge-grid') : null;
+        const more = grid ? grid.querySelector('.badge-grid-more') : null;
+        if (more && loading.has(more)) { rearm.add(more); }
+      });
+      if (rearm.size) { window.requestAnimationFrame(flush); }
+    }).observe(document.body, { childList: true, subtree: true });
+    watch();
+    return window.dash_clientside.no_update;
+  },
+
   customRadioEnableAdd: function (input, options) {
     if (input === undefined) { console.log('returning'); return true; }
     if (input.length === 0) { return true; }
@@ -0,0 +1,168 @@
+"""Windowed badge-card grid: the first page up front, the rest on demand.
+
+Prolific players, popular decks and busy months can hold hundreds of badges,
+and every ``create_badge_component`` card carries several pattern-matched ids.
+Instead of shipping every card in one callback response, a grid renders the
+first ``PAGE_SIZE`` cards plus a "Show more" button. The button is clicked
+automatically as it scrolls into view (``installInfiniteScroll`` in
+assets/scripts.js) and appends the next page with a ``Patch``.
+
+Pages are sliced from a positional index -- group key -> positions into
+``util.seasons.read_badges(scope)`` -- built once per data version.
+"""
+import dash
+import dash_bootstrap_components as dbc
+from dash import html, dcc, callback, Output, Input, State, MATCH, Patch
+
+import components.badge
+import util.grouping
+import util.seasons
+
+PAGE_SIZE = 12
+
+PREFIX = 'badge-grid'
+
+# ``dbc.Col`` sizing props a grid may carry in its query.
+_BREAKPOINTS = {'width', 'xs', 'sm', 'md', 'lg', 'xl', 'xxl'}
+
+
+def row_id(grid):
+    return {'type': f'{PREFIX}-row', 'index': grid}
+
+
+def more_id(grid):
+    return {'type': f'{PREFIX}-more', 'index': grid}
+
+
+def query_id(grid):
+    return {'type': f'{PREFIX}-query', 'index': grid}
+
+
+def _month_key(badge):
+    date = badge.get('date')
+    return date.replace(day=1).isoformat() if date else None
+
+
+# How each grid kind groups badges; keys are what pages pass as ``key``.
+_KEY_GETTERS = {
+    'trainer': lambda b: b.get('trainer'),
+    'deck': lambda b: (b.get('deck') or {}).get('id'),
+    'month': _month_key,
+}
+
+_INDEX_CACHE = {}
+
+
+def _known_scope(scope):
+    """``scope`` as the index is keyed: ``OVERALL`` or a configured season year; None if neither."""
+    if util.seasons.is_overall(scope):
+        return util.seasons.OVERALL
+    if isinstance(scope, str) and scope.isdigit():
+        scope = int(scope)
+    if type(scope) is int and scope in util.seasons.available_seasons():
+        return scope
+    return None
+
+
+def _scope(scope):
+    """Canonical scope for a page's value; unknown values fall back as in ``read_badges``."""
+    known = _known_scope(scope)
+    return known if known is not None else util.seasons.resolve_season(scope)
+
+
+def _indexed(scope, kind):
+    """Return ``(badges, positions_by_key)`` for a scope, rebuilt per data version."""
+    scope = _scope(scope)
+    version = util.seasons.data_version(scope)
+    cached = _INDEX_CACHE.get((scope, kind))
+    if cached and cached['version'] == version:
+        return cached['badges'], cached['index']
+    badges = util.seasons.read_badges(scope)
+    index = util.grouping.index_positions(badges, _KEY_GETTERS[kind])
+    _INDEX_CACHE[(scope, kind)] = {'version': version, 'badges': badges, 'index': index}
+    return badges, index
+
+
+def badges_for(scope, kind, key):
+    """Return every badge in ``scope`` whose ``kind`` key equals ``key``, in order."""
+    badges, index = _indexed(scope, kind)
+    return [badges[i] for i in index.get(key, [])]
+
+
+def _badge_col(badge, index, cols):
+    return dbc.Col(
+        components.badge.create_badge_component(badge, index),
+        class_name='mb-2',
+        **cols,
+    )
+
+
+def _more_style(shown, total):
+    return {} if shown < total else {'display': 'none'}
+
+
+def create_badge_grid(grid_id, scope, kind, key, **cols):
+    """Render the first page of ``key``'s badges with a pager for the rest.
+
+    ``cols`` are the ``dbc.Col`` breakpoints for each card (e.g. ``md=6``).
+    """
+    scope = _scope(scope)
+    badges, index = _indexed(scope, kind)
+    positions = index.get(key, [])
+    first = positions[:PAGE_SIZE]
+    query = {'scope': scope, 'kind': kind, 'key': key, 'offset': len(first), 'cols': cols}
+    return html.Div([
+        dbc.Row(
+            [_badge_col(badges[p], i, cols) for i, p in enumerate(first)],
+            id=row_id(grid_id),
+            justify='around',
+        ),
+        dbc.Button(
+            'Show more',
+            id=more_id(grid_id),
+            n_clicks=0,
+            color='secondary',
+            outline=True,
+            class_name='badge-grid-more d-block mx-auto mb-2',
+            style=_more_style(len(first), len(positions)),
+        ),
+        dcc.Store(id=query_id(grid_id), data=query),
+    ], className='badge-grid')
+
+
+@callback(
+    Output({'type': f'{PREFIX}-row', 'index': MATCH}, 'children'),
+    Output({'type': f'{PREFIX}-query', 'index': MATCH}, 'data'),
+    Output({'type': f'{PREFIX}-more', 'index': MATCH}, 'style'),
+    Input({'type': f'{PREFIX}-more', 'index': MATCH}, 'n_clicks'),
+    State({'type': f'{PREFIX}-query', 'index': MATCH}, 'data'),
+    prevent_initial_call=True,
+)
+def load_more_badges(n_clicks, query):
+    """Append the next page of cards to a grid."""
+    if not n_clicks or not isinstance(query, dict):
+        raise dash.exceptions.PreventUpdate
+    # The query comes back from the client; ignore anything we didn't render.
+    # Only configured scopes reach the index cache, so a client can't grow it.
+    scope = _known_scope(query.get('scope'))
+    offset = query.get('offset')
+    if (
+        scope is None
+        or query.get('kind') not in _KEY_GETTERS
+        or type(offset) is not int
+        or offset < 0
+        or not isinstance(query.get('key'), (str, int, type(None)))
+        or not isinstance(query.get('cols'), dict)
+        or not set(query['cols']) <= _BREAKPOINTS
+    ):
+        return dash.no_update, dash.no_update, dash.no_update
+    badges, index = _indexed(scope, query['kind'])
+    positions = index.get(query['key'], [])
+    page = positions[offset:offset + PAGE_SIZE]
+    if not page:
+        return dash.no_update, dash.no_update, _more_style(offset, len(positions))
+    patched = Patch()
+    for i, p in enumerate(page, start=offset):
+        patched.append(_badge_col(badges[p], i, query['cols']))
+    shown = offset + len(page)
+    return patched, {**query, 'scope': scope, 'offset': shown}, _more_style(shown, len(positions))
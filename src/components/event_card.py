@@ -46,8 +46,10 @@ def create_event_card(event, index=None):
     if players:
         meta_badges.append(dbc.Badge(f'{players} players', color='info'))
 
+    standings = _sorted_standings(event)
+    names = util.names.public_names(s.get('trainer', '') for s in standings)
     rows = []
-    for standing in _sorted_standings(event):
+    for standing in standings:
         earned = bool(standing.get('earned_badge'))
         deck = standing.get('deck')
         check = (
@@ -57,7 +59,7 @@ def create_event_card(event, index=None):
         rows.append(html.Tr([
             html.Td(standing.get('placement'), className='text-center align-middle w-0'),
             html.Td(
-                util.names.public_name(standing.get('trainer', '')),
+                names[standing.get('trainer', '')],
                 className='align-middle fw-semibold' if earned else 'align-middle',
             ),
             html.Td(
@@ -26,3 +26,10 @@ worker_tmp_dir = "/dev/shm" if os.path.exists("/dev/shm") else tempfile.gettempd
 accesslog = "-"               # or None to save a bit of CPU
 errorlog = "-"
 loglevel = "info"
+
+
+# Drain Discord announcements queued before the last restart. Done here rather
+# than at import so tools that import app.py never post.
+def post_worker_init(worker):
+    import util.discord
+    util.discord.start_outbox()
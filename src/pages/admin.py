@@ -230,7 +230,7 @@ def _update_save_label(edit_line):
     prevent_initial_call=True,
 )
 def _toggle_discord_id(trainer):
-    if not trainer or trainer in util.discord._load_discord_ids():
+    if not trainer or util.discord.has_discord_id(trainer):
         return {'display': 'none'}, ''
     return {'display': 'block'}, ''
 
@@ -299,7 +299,7 @@ def _add_badge(n_clicks, trainer, pronouns, deck_id, store, date, decks, color,
         if discord_id:
             util.discord.save_discord_id(trainer, discord_id.strip())
         util.data.append_data(contents=badge)
-        util.discord.post_badge(badge)
+        util.discord.enqueue_badge(badge)
     return '/'
 
 
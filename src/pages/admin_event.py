@@ -333,7 +333,7 @@ def _on_trainer_selected(trainer):
     """When a trainer is picked, prefill their last-used pronoun and flag whether
     a Discord ping is already on file (hiding the "Discord ID" input if so)."""
     pronoun = _latest_pronoun(trainer)
-    if trainer and trainer in util.discord._load_discord_ids():
+    if util.discord.has_discord_id(trainer):
         return (
             html.Span([html.I(className='fas fa-circle-check me-1'),
                        'Ping ready for this trainer']),
@@ -589,8 +589,7 @@ def _save_event(n_clicks, store_name, date, players, tier, fmt,
     }
 
     # Persist Discord IDs first so the badge pings can mention new trainers.
-    for trainer, discord_id in pending_discord:
-        util.discord.save_discord_id(trainer, discord_id)
+    util.discord.save_discord_ids(dict(pending_discord))
 
     filename = util.seasons.data_file_for(season)
 
@@ -607,19 +606,20 @@ def _save_event(n_clicks, store_name, date, players, tier, fmt,
 
     util.data.append_data_to_file(filename=filename, contents=event)
 
-    for standing in standings:
-        if standing.get('earned_badge'):
-            util.discord.post_badge({
-                'store': store_name,
-                'date': date,
-                'tier': tier,
-                'format': fmt,
-                'trainer': standing['trainer'],
-                'pronouns': standing.get('pronouns', 'their'),
-                'deck': standing.get('deck'),
-                'color': standing.get('color'),
-                'background': standing.get('background'),
-            })
+    util.discord.enqueue_event([
+        {
+            'store': store_name,
+            'date': date,
+            'tier': tier,
+            'format': fmt,
+            'trainer': standing['trainer'],
+            'pronouns': standing.get('pronouns', 'their'),
+            'deck': standing.get('deck'),
+            'color': standing.get('color'),
+            'background': standing.get('background'),
+        }
+        for standing in standings if standing.get('earned_badge')
+    ])
 
     return '/', dash.no_update
 
@@ -4,7 +4,7 @@ import datetime
 from collections import defaultdict
 from dash import html, callback, clientside_callback, ClientsideFunction, Output, Input, State, MATCH
 
-import components.badge
+import components.badge_grid
 import util.seasons
 
 dash.register_page(__name__, path='/badges')
@@ -17,6 +17,8 @@ def layout(season=None, **kwargs):
     month_map = defaultdict(list)
     for i, b in enumerate(badges):
         date_obj = b.get('date')
+        if not date_obj:
+            continue  # undated (malformed) records have no month to file under
         month_start = datetime.date(date_obj.year, date_obj.month, 1)
         month_map[month_start].append((i, b))
 
@@ -59,12 +61,6 @@ clientside_callback(
     State({'type': 'month-collapse', 'index': MATCH}, 'is_open'),
 )
 
-def _next_month(date: datetime.date) -> datetime.date:
-    if date.month == 12:
-        return datetime.date(date.year + 1, 1, 1)
-    return datetime.date(date.year, date.month + 1, 1)
-
-
 @callback(
     Output({'type': 'month-content', 'index': MATCH}, 'children'),
     Input({'type': 'month-collapse', 'index': MATCH}, 'is_open'),
@@ -75,19 +71,7 @@ def _next_month(date: datetime.date) -> datetime.date:
 def load_month_badges(is_open, children, collapse_id, season):
     if not is_open or children:
         return dash.no_update
-    month_start = datetime.date.fromisoformat(collapse_id['index'])
-    month_end = _next_month(month_start)
-    badges = util.seasons.read_badges(season)
-    filtered = [
-        b for b in badges
-        if b.get('date') and month_start <= b['date'] < month_end
-    ]
-    badge_rows = [
-        dbc.Col(
-            components.badge.create_badge_component(b, i),
-            xs=12, md=6, lg=4, xxl=3,
-            class_name='mb-2'
-        )
-        for i, b in enumerate(filtered)
-    ]
-    return dbc.Row(badge_rows, justify='around')
+    month = collapse_id['index']
+    return components.badge_grid.create_badge_grid(
+        month, season, 'month', month, xs=12, md=6, lg=4, xxl=3,
+    )
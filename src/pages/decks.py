@@ -2,7 +2,7 @@ import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Output, Input, State
 
-import components.badge
+import components.badge_grid
 import components.deck_label
 import util.seasons
 import util.grouping
@@ -116,24 +116,12 @@ def render_deck_badges(deck_id, season):
     """Render all badges for the selected deck in the selected season scope."""
     if not deck_id:
         return dash.no_update
-    badges = util.seasons.read_badges(season)
-    deck_badges = [
-        b for b in badges
-        if (b.get('deck') or {}).get('id') == deck_id
-    ]
+    deck_badges = components.badge_grid.badges_for(season, 'deck', deck_id)
     if not deck_badges:
         return html.P('No badges found for this deck yet.')
 
     deck_name = _deck_name_from_badges(deck_badges) or deck_id
     deck_label = components.deck_label.create_label(deck_badges[0].get('deck'))
-    badge_cols = [
-        dbc.Col(
-            components.badge.create_badge_component(b, i),
-            xs=12, md=6, lg=4,
-            class_name='mb-2'
-        )
-        for i, b in enumerate(deck_badges)
-    ]
     header_children = [
         html.H3(f"{deck_name} - {len(deck_badges)} trainer{'s' if len(deck_badges) != 1 else ''}")
     ]
@@ -142,5 +130,5 @@ def render_deck_badges(deck_id, season):
     return html.Div([
         *header_children,
         _deck_totals(deck_badges),
-        dbc.Row(badge_cols, justify='around')
+        components.badge_grid.create_badge_grid('deck', season, 'deck', deck_id, xs=12, md=6, lg=4),
     ])
@@ -9,10 +9,13 @@ import th_helpers.components.help_icon
 import components.badge
 import components.deck_label
 import components.event_card
+import util.badge_images
+import util.buckets
 import util.data
 import util.leaderboard
 import util.names
 import util.seasons
+import util.timing
 
 dash.register_page(
     __name__,
@@ -28,15 +31,7 @@ def _season_start(date: datetime.date) -> datetime.date:
 
 def _quarter_start(date: datetime.date) -> datetime.date:
     """Return the beginning of the quarter for a given date."""
-    m = date.month
-    y = date.year
-    if 7 <= m <= 9:
-        return datetime.date(y, 7, 1)
-    if 10 <= m <= 12:
-        return datetime.date(y, 10, 1)
-    if 1 <= m <= 3:
-        return datetime.date(y, 1, 1)
-    return datetime.date(y, 4, 1)
+    return util.buckets.quarter_start(date)
 
 
 def _next_quarter_start(date: datetime.date) -> datetime.date:
@@ -60,40 +55,6 @@ def _quarter_label(start: datetime.date) -> str:
     return f"{season.year + 1} {start.strftime('%B')} - {end.strftime('%B')}"
 
 
-def _parse_badges():
-    badges = util.seasons.read_badges()
-    return badges
-
-
-def _create_deck_map(badges):
-    """Return mapping of deck name to full deck data."""
-    deck_map = {}
-    for b in badges:
-        deck = b.get('deck')
-        if isinstance(deck, dict):
-            name = deck.get('name')
-            if name and name not in deck_map:
-                deck_map[name] = deck
-    return deck_map
-
-
-def _summarize_badges(badges, primary_key, secondary_key):
-    """Return mapping of primary -> secondary -> tier counts."""
-    summary = defaultdict(lambda: defaultdict(Counter))
-    for b in badges:
-        primary = b.get(primary_key)
-        secondary = b.get(secondary_key)
-        if not primary or not secondary:
-            continue
-        if isinstance(primary, dict):
-            primary = primary.get('name') or primary.get('id')
-        if isinstance(secondary, dict):
-            secondary = secondary.get('name') or secondary.get('id')
-        tier = (b.get('tier') or '').title()
-        summary[primary][secondary][tier] += 1
-    return summary
-
-
 def _most_unique(badges, primary_key, secondary_key):
     """Return list of items with the most unique secondary values."""
     uniques = defaultdict(set)
@@ -182,6 +143,7 @@ SEASON_AWARDS_HELP = [
 
 def _format_detail_list(details, use_deck_label=False, deck_map=None):
     items = []
+    names = {} if use_deck_label else util.names.public_names(details)
     for name, tiers in details.items():
         badges = [
             dbc.Badge(f"{t} {c}x" if c > 1 else t, class_name='ms-1')
@@ -191,7 +153,7 @@ def _format_detail_list(details, use_deck_label=False, deck_map=None):
             deck = deck_map.get(name, {'name': name}) if deck_map else {'name': name}
             label = components.deck_label.create_label(deck)
         else:
-            label = util.names.public_name(name)
+            label = names[name]
         items.append(html.Li(html.Div([html.Span('-', className='mx-1'), label, *badges], className='d-flex align-items-center mb-1')))
     return html.Ul(items, className='mb-0 list-unstyled')
 
@@ -206,6 +168,7 @@ def _leaderboard_table(title, data_counter, summaries, row_type, deck_rows=False
     prev_rank = None
     rank = 0
     num_same = 1
+    names = {} if deck_rows else util.names.public_names(name for name, _, _ in data_counter)
     for i, (name, count, points) in enumerate(data_counter):
         idx = f"{row_type}-{title}-{i}-{name}".lower().replace(' ', '')
         toggle_id = {'type': f'lb-toggle', 'index': idx}
@@ -214,7 +177,7 @@ def _leaderboard_table(title, data_counter, summaries, row_type, deck_rows=False
             deck = deck_map.get(name, {'name': name}) if deck_map else {'name': name}
             label = components.deck_label.create_label(deck)
         else:
-            label = util.names.public_name(name)
+            label = names[name]
 
         if prev_rank and (count, points) == prev_rank:
             num_same += 1
@@ -244,13 +207,16 @@ def _leaderboard_table(title, data_counter, summaries, row_type, deck_rows=False
     return table
 
 
-def _leaderboard_section(badges, label, prefix, deck_map=None):
-    """Return the basic leaderboard section with trainer and deck tables."""
-    trainer_lb = util.leaderboard.weighted_leaderboard(badges, 'trainer')[:10]
-    deck_lb = util.leaderboard.weighted_leaderboard(badges, 'deck')[:10]
+def _leaderboard_section(bucket, label, prefix, deck_map=None):
+    """Return the basic leaderboard section with trainer and deck tables.
+
+    ``bucket`` is an aggregate from :mod:`util.buckets`.
+    """
+    trainer_lb = util.leaderboard.leaderboard_from_counts(bucket['trainers'], bucket['trainer_points'])[:10]
+    deck_lb = util.leaderboard.leaderboard_from_counts(bucket['decks'], bucket['deck_points'])[:10]
 
-    trainer_summary = _summarize_badges(badges, 'trainer', 'deck')
-    deck_summary = _summarize_badges(badges, 'deck', 'trainer')
+    trainer_summary = bucket['trainer_summary']
+    deck_summary = bucket['deck_summary']
 
     return dbc.Row([
         dbc.Col([
@@ -262,36 +228,13 @@ def _leaderboard_section(badges, label, prefix, deck_map=None):
     ])
 
 
-def _totals_badges(badges):
-    """Return summary metric cards for a badge collection."""
-    total_badges = len(badges)
-    unique_trainers = {
-        b.get('trainer')
-        for b in badges
-        if b.get('trainer')
-    }
-    unique_decks = set()
-    unique_stores = {
-        b.get('store')
-        for b in badges
-        if b.get('store')
-    }
-    for badge in badges:
-        deck = badge.get('deck')
-        if not deck:
-            continue
-        if isinstance(deck, dict):
-            deck_value = deck.get('name') or deck.get('id')
-        else:
-            deck_value = deck
-        if deck_value:
-            unique_decks.add(deck_value)
-
+def _totals_badges(bucket):
+    """Return summary metric cards for an aggregate from :mod:`util.buckets`."""
     metrics = [
-        ('Total Badges', total_badges),
-        ('Unique Trainers', len(unique_trainers)),
-        ('Unique Decks', len(unique_decks)),
-        ('Unique Locations', len(unique_stores)),
+        ('Total Badges', bucket['total']),
+        ('Unique Trainers', len(bucket['trainers'])),
+        ('Unique Decks', len(bucket['decks'])),
+        ('Unique Locations', len(bucket['stores'])),
     ]
 
     return dbc.Row(
@@ -514,10 +457,6 @@ def _season_awards(badges, deck_map=None):
     ])
 
 
-def _filter_badges(badges, start: datetime.date, end: datetime.date):
-    return [b for b in badges if b.get('date') and start <= b['date'] < end]
-
-
 def _next_month(date: datetime.date) -> datetime.date:
     if date.month == 12:
         return datetime.date(date.year + 1, 1, 1)
@@ -579,8 +518,11 @@ def layout(season=None, **kwargs):
         ]) if event_cols else None,
         html.Div([
             html.H2('Recent Badges', className='d-flex mb-0'),
-            dbc.Button(html.I(className='fas fa-download'), title='Download recent badge', id='download'),
-            dbc.Input(value='recent-0', class_name='d-none', id='recent')
+            dbc.Button(
+                html.I(className='fas fa-download'), title='Download recent badge', id='download',
+                href=util.badge_images.image_url(badges[0]), external_link=True,
+                download=f"trainerhill-recent-{datetime.date.today().isoformat()}.png",
+            ) if badges else None,
         ], className='d-flex align-items-center gap-1 my-1'),
         html.P('Keep up with the latest badges.'),
         dbc.Row(badge_cols, class_name='overflow-auto flex-nowrap mb-2 pb-3'),
@@ -602,18 +544,19 @@ def _season_content(scope, season_badges):
     Quarter/month drill-down is season-specific, so it is only shown when a
     concrete season is selected (not the all-time "Overall" view).
     """
-    deck_map = _create_deck_map(season_badges)
+    season_bucket = util.buckets.season_bucket(scope)
+    deck_map = season_bucket['deck_map']
     label = util.seasons.season_label(scope)
     children = [
-        _totals_badges(season_badges),
-        _leaderboard_section(season_badges, label, f'season-{scope}', deck_map=deck_map),
+        _totals_badges(season_bucket),
+        _leaderboard_section(season_bucket, label, f'season-{scope}', deck_map=deck_map),
         _season_awards(season_badges, deck_map=deck_map),
     ]
     if scope != util.seasons.OVERALL:
         season_year = scope
         quarter_starts = sorted({
-            _quarter_start(b['date'])
-            for b in season_badges if b.get('date')
+            _quarter_start(month)
+            for month in util.buckets.month_buckets(scope) if month
         }, reverse=True)
         quarter_tabs = [
             dbc.Tab(label=_quarter_label(qs), tab_id=qs.isoformat(), active_tab_style={'fontWeight': 'bold'})
@@ -638,20 +581,20 @@ def _season_content(scope, season_badges):
 def render_quarter(active_quarter):
     if not active_quarter:
         return dash.no_update
-    season_year = int(dash.ctx.triggered_id['index'] if dash.ctx.triggered_id else active_quarter.split('-')[0])
-    badges = _parse_badges()
-    season_start = _season_start(datetime.datetime.strptime(active_quarter, "%Y-%m-%d").date())
-    season_end = datetime.date(season_year+1, 7, 1)
-    season_badges = _filter_badges(badges, season_start, season_end)
     qs = datetime.date.fromisoformat(active_quarter)
     qe = _next_quarter_start(qs)
-    quarter_badges = _filter_badges(season_badges, qs, qe)
+    season_year = int(
+        dash.ctx.triggered_id['index'] if dash.ctx.triggered_id
+        else util.seasons.season_year_for_date(qs)
+    )
+    util.timing.set_scope(season_year)
+    buckets = util.buckets.month_buckets(season_year)
+    quarter_bucket = util.buckets.range_bucket(season_year, qs, qe)
     month_tabs = []
     month_start = qs
     for _ in range(3):
         me = _next_month(month_start)
-        month_badges = _filter_badges(season_badges, month_start, me)
-        if len(month_badges) == 0:
+        if not buckets.get(month_start):
             month_start = me
             continue
         month_tabs.append(
@@ -663,10 +606,10 @@ def render_quarter(active_quarter):
         )
         month_start = me
     month_tabs.reverse()
-    deck_map = _create_deck_map(season_badges)
+    deck_map = util.buckets.deck_map(season_year)
     return html.Div([
-        _totals_badges(quarter_badges),
-        _leaderboard_section(quarter_badges, _quarter_label(qs), f'quarter-{qs.isoformat()}', deck_map=deck_map),
+        _totals_badges(quarter_bucket),
+        _leaderboard_section(quarter_bucket, _quarter_label(qs), f'quarter-{qs.isoformat()}', deck_map=deck_map),
         html.H3('Month', id='month'),
         dbc.Tabs(
             month_tabs,
@@ -685,13 +628,13 @@ def render_month(active_month):
     if not active_month:
         return dash.no_update
     month_start = datetime.date.fromisoformat(active_month)
-    month_end = _next_month(month_start)
-    badges = _parse_badges()
-    month_badges = _filter_badges(badges, month_start, month_end)
-    deck_map = _create_deck_map(badges)
+    season_year = util.seasons.season_year_for_date(month_start)
+    util.timing.set_scope(season_year)
+    month_bucket = util.buckets.month_buckets(season_year).get(month_start) or util.buckets.merge([])
+    deck_map = util.buckets.deck_map(season_year)
     return html.Div([
-        _totals_badges(month_badges),
-        _leaderboard_section(month_badges, month_start.strftime('%B %Y'), f'month-{month_start.isoformat()}', deck_map=deck_map)
+        _totals_badges(month_bucket),
+        _leaderboard_section(month_bucket, month_start.strftime('%B %Y'), f'month-{month_start.isoformat()}', deck_map=deck_map)
     ])
 
 
@@ -701,10 +644,3 @@ clientside_callback(
     Input({'type': 'lb-toggle', 'index': MATCH}, 'n_clicks'),
     State({'type': 'lb-collapse', 'index': MATCH}, 'is_open'),
 )
-
-clientside_callback(
-    ClientsideFunction(namespace='clientside', function_name='downloadDomAsImage'),
-    Output('download', 'className'),
-    Input('download', 'n_clicks'),
-    State('recent', 'value'),
-)
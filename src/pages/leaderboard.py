@@ -46,6 +46,7 @@ def _summarize_badges(badges, primary_key, secondary_key):
 
 def _format_detail_list(details, use_deck_label=False, deck_map=None):
     items = []
+    names = {} if use_deck_label else util.names.public_names(details)
     for name, tiers in details.items():
         tier_badges = [
             dbc.Badge(f"{t} {c}x" if c > 1 else t, class_name='ms-1')
@@ -55,7 +56,7 @@ def _format_detail_list(details, use_deck_label=False, deck_map=None):
             deck = deck_map.get(name, {'name': name}) if deck_map else {'name': name}
             label = components.deck_label.create_label(deck)
         else:
-            label = util.names.public_name(name)
+            label = names[name]
         items.append(html.Li(
             html.Div([html.Span('-', className='mx-1'), label, *tier_badges], className='d-flex align-items-center mb-1')
         ))
@@ -69,6 +70,7 @@ def _leaderboard_table(title, data, summaries, row_type, deck_rows=False, deck_m
     prev_score = None
     rank = 0
     num_same = 1
+    names = {} if deck_rows else util.names.public_names(name for name, _, _ in data)
     for i, (name, count, points) in enumerate(data):
         idx = f"{row_type}-{i}-{name}".lower().replace(' ', '')
         toggle_id = {'type': f'{PREFIX}-toggle', 'index': idx}
@@ -78,7 +80,7 @@ def _leaderboard_table(title, data, summaries, row_type, deck_rows=False, deck_m
             deck = deck_map.get(name, {'name': name}) if deck_map else {'name': name}
             label = components.deck_label.create_label(deck)
         else:
-            label = util.names.public_name(name)
+            label = names[name]
 
         if prev_score and (count, points) == prev_score:
             num_same += 1
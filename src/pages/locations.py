@@ -39,6 +39,7 @@ def _unique_trainers_per_store(badges):
 
 def _format_detail_list(details):
     items = []
+    names = util.names.public_names(details)
     for name, tiers in details.items():
         tier_badges = [
             dbc.Badge(f"{t} {c}x" if c > 1 else t, class_name='ms-1')
@@ -46,7 +47,7 @@ def _format_detail_list(details):
         ]
         items.append(html.Li(
             html.Div(
-                [html.Span('-', className='mx-1'), util.names.public_name(name), *tier_badges],
+                [html.Span('-', className='mx-1'), names[name], *tier_badges],
                 className='d-flex align-items-center mb-1'
             )
         ))
@@ -2,7 +2,7 @@ import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Output, Input, State
 
-import components.badge
+import components.badge_grid
 import util.names
 import util.seasons
 import util.grouping
@@ -61,9 +61,10 @@ def layout(season=None, **kwargs):
     badges = util.seasons.read_badges(scope)
     grouped = util.grouping.group_badges(badges, lambda b: b.get('trainer'))
     sorted_players = util.grouping.sort_group_items(grouped)
+    names = util.names.public_names(grouped)
     player_options = util.grouping.dropdown_options(
         sorted_players,
-        lambda name, player_badges: f"{util.names.public_name(name)} ({len(player_badges)})"
+        lambda name, player_badges: f"{names[name]} ({len(player_badges)})"
     )
 
     return dbc.Container([
@@ -102,19 +103,10 @@ def render_player_badges(player, season):
     """Render all badges for the selected player in the selected season scope."""
     if not player:
         return dash.no_update
-    badges = util.seasons.read_badges(season)
-    player_badges = [b for b in badges if b.get('trainer') == player]
-    badge_cols = [
-        dbc.Col(
-            components.badge.create_badge_component(b, i),
-            xs=12, md=6, lg=4,
-            class_name='mb-2'
-        )
-        for i, b in enumerate(player_badges)
-    ]
+    player_badges = components.badge_grid.badges_for(season, 'trainer', player)
     header = html.H3(f"{util.names.public_name(player)} - {len(player_badges)} badge{'s' if len(player_badges) != 1 else ''}")
     return html.Div([
         header,
         _player_totals(player_badges),
-        dbc.Row(badge_cols, justify='around')
+        components.badge_grid.create_badge_grid('player', season, 'trainer', player, xs=12, md=6, lg=4),
     ])
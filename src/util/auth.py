@@ -4,9 +4,28 @@ Auth is HTTP Basic (see ``dash_auth.BasicAuth`` in ``app.py``), so the browser
 resends credentials on every request -- including Dash callback POSTs. That lets
 any protected callback learn who is acting via ``flask.request.authorization``,
 which we use to stamp an ``author`` on the events/badges they create.
+
+Because credentials arrive on every request, verifying them is on the hot path.
+:func:`verify_cached` remembers successful checks for a short TTL so PBKDF2 only
+runs on a cache miss -- and then in a worker thread, not on the gevent loop.
 """
+import hashlib
+import hmac
+import os
+import time
+
 import flask
 
+from util.passwords import verify_password
+
+# Seconds a successful verification is trusted before PBKDF2 runs again.
+VERIFY_TTL = float(os.getenv('TH_BL_AUTH_CACHE_TTL', '300'))
+_MAX_CACHED = 256
+
+# Per-process key so cached digests are useless outside this worker's memory.
+_CACHE_KEY = os.urandom(32)
+_VERIFIED = {}  # digest -> monotonic expiry
+
 
 def current_username():
     """Return the logged-in admin's username, or None if unauthenticated.
@@ -21,3 +40,46 @@ def current_username():
     if auth and auth.username:
         return auth.username
     return None
+
+
+def _digest(username, password, stored_hash):
+    # The stored hash is part of the key, so a password change invalidates it.
+    message = '\0'.join((username, password, stored_hash)).encode()
+    return hmac.new(_CACHE_KEY, message, hashlib.sha256).digest()
+
+
+def _verify_off_loop(password, stored_hash):
+    """Run PBKDF2 in gevent's threadpool when the app is monkey patched.
+
+    ``hashlib.pbkdf2_hmac`` releases the GIL, so other greenlets keep serving
+    while a real thread grinds through the iterations.
+    """
+    try:
+        import gevent
+        from gevent import monkey
+    except ImportError:
+        return verify_password(password, stored_hash)
+    if not monkey.is_module_patched('threading'):
+        return verify_password(password, stored_hash)
+    return gevent.get_hub().threadpool.apply(verify_password, (password, stored_hash))
+
+
+def verify_cached(username, password, stored_hash):
+    """Verify a password against its stored hash, caching successes for ``VERIFY_TTL``.
+
+    Only successful checks are cached; failures always pay full price.
+    """
+    key = _digest(username, password, stored_hash)
+    now = time.monotonic()
+    expiry = _VERIFIED.get(key)
+    if expiry and expiry > now:
+        return True
+    if not _verify_off_loop(password, stored_hash):
+        return False
+    if len(_VERIFIED) >= _MAX_CACHED:
+        for stale in [k for k, exp in _VERIFIED.items() if exp <= now]:
+            del _VERIFIED[stale]
+        if len(_VERIFIED) >= _MAX_CACHED:
+            _VERIFIED.clear()
+    _VERIFIED[key] = now + VERIFY_TTL
+    return True
@@ -0,0 +1,156 @@
+"""Content-addressed cache of rendered badge PNGs.
+
+A badge card's pixels depend only on a handful of fields (trainer, deck,
+store, date, colors, ...). :func:`badge_key` hashes exactly those, so the key
+names the image: if any field (or the renderer, browser vs native) changes,
+so does the key, and a cached PNG can never be stale. That lets
+``/api/badge-image/<key>.png`` be served with immutable cache headers, and
+repeat downloads and re-announcements skip the render. (Downloads show the
+public name and Discord cards the full name, so the two are cached
+separately.)
+
+PNGs live one file per key under the data dir's ``badge_images/`` and are
+written atomically (tmp + rename), so concurrent workers at worst render the
+same card twice.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import util.data
+import util.names
+import util.seasons
+
+logger = logging.getLogger(__name__)
+
+if util.data.DATA_DIR:
+    _CACHE_DIR = util.data.data_path('badge_images')
+else:
+    _CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'badge_images')
+
+# Bump when the card layout changes so old renders aren't served.
+_LAYOUT_VERSION = 2
+
+_KEY_CACHE = {}
+
+
+def _renderer():
+    import util.discord_image
+    return util.discord_image.RENDERER
+
+
+def _image_fields(badge):
+    deck = badge.get('deck') or {}
+    if not isinstance(deck, dict):
+        deck = {'name': str(deck)}
+    date = badge.get('date', '')
+    if hasattr(date, 'isoformat'):
+        date = date.isoformat()
+    return {
+        'v': _LAYOUT_VERSION,
+        'renderer': _renderer().kind,
+        'trainer': badge.get('trainer', ''),
+        'pronouns': badge.get('pronouns', 'their'),
+        'deck': {'name': deck.get('name', ''), 'icons': deck.get('icons') or []},
+        'store': badge.get('store', ''),
+        'date': date,
+        'tier': badge.get('tier', ''),
+        'format': badge.get('format', ''),
+        'color': badge.get('color', '#ffffff'),
+        'background': badge.get('background'),
+    }
+
+
+def badge_key(badge):
+    """Return the content hash naming ``badge``'s rendered image."""
+    canonical = json.dumps(_image_fields(badge), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def public_badge(badge, names=None):
+    """The badge as shown publicly: trainer replaced by their public name.
+
+    Pass ``names`` (from ``util.names.public_names``) when converting many.
+    """
+    trainer = badge.get('trainer', '')
+    public = names[trainer] if names is not None else util.names.public_name(trainer)
+    return {**badge, 'trainer': public}
+
+
+def image_url(badge):
+    """URL of the public download image for a badge."""
+    return f'/api/badge-image/{badge_key(public_badge(badge))}.png'
+
+
+def _path(key):
+    return os.path.join(_CACHE_DIR, f'{key}.png')
+
+
+def read_cached(key):
+    """Return cached PNG bytes for ``key``, or None."""
+    try:
+        with open(_path(key), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _store(key, png):
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp = f'{_path(key)}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(png)
+        os.replace(tmp, _path(key))
+    except OSError as e:
+        logger.warning('Could not cache badge image %s: %s', key, e)
+
+
+def render_many(badges):
+    """Return PNG bytes per badge (None on failure), rendering only cache misses."""
+    badges = list(badges)
+    keys = [badge_key(b) for b in badges]
+    images = [read_cached(k) for k in keys]
+    missing = [i for i, image in enumerate(images) if image is None]
+    if missing:
+        rendered = _renderer().render_many([badges[i] for i in missing])
+        for i, png in zip(missing, rendered):
+            if png:
+                _store(keys[i], png)
+                images[i] = png
+    return images
+
+
+def render(badge):
+    """Return PNG bytes for one badge (cached), or None on failure."""
+    return render_many([badge])[0]
+
+
+def _public_index():
+    """key -> public badge for every badge we hold, rebuilt per data version."""
+    version = util.seasons.data_version()
+    if _KEY_CACHE.get('version') != version:
+        index = {}
+        badges = util.seasons.read_badges(util.seasons.OVERALL)
+        names = util.names.public_names({b.get('trainer', '') for b in badges})
+        for badge in badges:
+            public = public_badge(badge, names)
+            index.setdefault(badge_key(public), public)
+        _KEY_CACHE.update(version=version, index=index)
+    return _KEY_CACHE['index']
+
+
+def image_for_key(key):
+    """Return PNG bytes for a public image key, rendering it on first request.
+
+    Only keys of badges in our data are rendered, so arbitrary keys can't be
+    used to fill the cache.
+    """
+    png = read_cached(key)
+    if png is not None:
+        return png
+    badge = _public_index().get(key)
+    if badge is None:
+        return None
+    return render(badge)
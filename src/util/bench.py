@@ -0,0 +1,239 @@
+"""Micro-benchmarks for the data hot paths.
+
+Each case runs against synthetic data files at several sizes (written by
+:mod:`util.synthetic` to a temp data dir, without malformed lines), and
+reports the best wall time over ``--repeat`` runs plus the peak memory one
+run allocates (measured in a separate, ``tracemalloc``-instrumented run so
+tracing doesn't skew the timings).
+
+Save a baseline, then compare later runs against it; cases that got slower
+or hungrier than ``--threshold`` are flagged and the exit status is 1::
+
+    PYTHONPATH=src python -m util.bench --sizes 1000,10000 --save bench.json
+    PYTHONPATH=src python -m util.bench --sizes 1000,10000 --baseline bench.json
+
+The data dir is chosen before any ``util`` data module is imported (their
+paths are read from the environment at import time), so run this as its own
+process rather than importing it into the app.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+BADGE_FILE = 'badges.jsonl'
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+# name -> (setup, run). ``setup`` runs untimed before every run and returns
+# the argument passed to ``run``.
+Case = Tuple[Callable[[], Any], Callable[[Any], Any]]
+
+
+def _cases() -> Dict[str, Case]:
+    import util.data
+    import util.export_time_series as ets
+    import util.leaderboard
+    import util.names
+    import util.normalize
+    import util.seasons
+
+    badge_file = util.data.FILENAME
+    events_file = util.seasons.data_file_for(2027)
+
+    def cold_read():
+        util.data._READ_CACHE.clear()
+
+    def overall():
+        return util.seasons.read_badges(util.seasons.OVERALL)
+
+    def dated():
+        # What the exporter sees after its date filter.
+        return [b for b in overall() if b.get('date')]
+
+    def cold_names():
+        util.names._MAP_CACHE.clear()
+        return sorted({b['trainer'] for b in overall()})
+
+    def timelines():
+        return ets._timelines(dated(), ['trainer'], emit='updated')['trainer']
+
+    return {
+        'data.read_data_from_file[cold]': (cold_read, lambda _: util.data.read_data_from_file(badge_file)),
+        'data.read_data_from_file[warm]': (
+            lambda: util.data.read_data_from_file(badge_file),
+            lambda _: util.data.read_data_from_file(badge_file),
+        ),
+        'seasons.read_badges[2026]': (lambda: None, lambda _: util.seasons.read_badges(2026)),
+        'seasons.read_badges[2027]': (lambda: None, lambda _: util.seasons.read_badges(2027)),
+        'seasons.read_badges[overall]': (lambda: None, lambda _: overall()),
+        'normalize.normalize_records[badges]': (
+            lambda: util.data.read_data_from_file(badge_file),
+            lambda records: util.normalize.normalize_records(records, 'badges'),
+        ),
+        'normalize.normalize_records[events]': (
+            lambda: util.data.read_data_from_file(events_file),
+            lambda records: util.normalize.normalize_records(records, 'events'),
+        ),
+        'leaderboard.weighted_leaderboard': (
+            overall, lambda badges: util.leaderboard.weighted_leaderboard(badges, 'trainer'),
+        ),
+        'leaderboard.trainer_extras': (overall, util.leaderboard.trainer_extras),
+        'names.public_name[cold]': (
+            cold_names, lambda trainers: [util.names.public_name(t) for t in trainers],
+        ),
+        'export_time_series._timeline_rows': (
+            dated, lambda badges: ets._timeline_rows(badges, 'trainer'),
+        ),
+        'export_time_series._cumulative_table': (
+            timelines,
+            lambda records: sum(1 for _ in ets._cumulative_table(records, group_by='trainer')[0]),
+        ),
+    }
+
+
+def _measure(setup: Callable[[], Any], run: Callable[[Any], Any], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        started = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - started)
+
+    arg = setup()
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': min(times),
+        'median_seconds': statistics.median(times),
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_benchmarks(sizes: Iterable[int], repeat: int = 5, only: Optional[List[str]] = None,
+                   seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Run every case at every size; returns ``{"<case>@<size>": measurement}``."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='th-bl-bench-') as data_dir:
+        os.environ['TH_BL_DATA_DIR'] = data_dir
+        os.environ['TH_BL_FILE'] = BADGE_FILE
+        import util.synthetic
+
+        cases = _cases()
+        for size in sizes:
+            # ~size badges-mode lines, plus events contributing ~size / 4 badges.
+            util.synthetic.generate(
+                data_dir, badges=size, events=max(1, size // 16), malformed=0, seed=seed,
+            )
+            for name, (setup, run) in cases.items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[f'{name}@{size}'] = _measure(setup, run, repeat)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Return a description of every case worse than ``threshold`` x baseline."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in ('seconds', 'peak_kib'):
+            before, after = previous.get(metric), current[metric]
+            if before and after > before * threshold:
+                regressions.append(f'{key}: {metric} {before:.4g} -> {after:.4g} ({after / before:.2f}x)')
+    return regressions
+
+
+def render_text(results: Dict[str, Dict[str, float]],
+                baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    width = max((len(key) for key in results), default=0)
+    lines = [f'{"case".ljust(width)}  {"best ms":>10}  {"median ms":>10}  {"peak KiB":>10}  {"vs base":>8}']
+    for key, m in results.items():
+        ratio = ''
+        if baseline and baseline.get(key, {}).get('seconds'):
+            ratio = f'{m["seconds"] / baseline[key]["seconds"]:.2f}x'
+        lines.append(
+            f'{key.ljust(width)}  {m["seconds"] * 1000:>10.2f}  {m["median_seconds"] * 1000:>10.2f}'
+            f'  {m["peak_kib"]:>10.1f}  {ratio:>8}'
+        )
+    return '\n'.join(lines)
+
+
+def _parse_sizes(value: str) -> List[int]:
+    try:
+        sizes = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f'Invalid sizes {value!r}; expected e.g. 1000,10000') from exc
+    if not sizes or any(size <= 0 for size in sizes):
+        raise argparse.ArgumentTypeError('Sizes must be positive integers')
+    return sizes
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the badge data hot paths.')
+    parser.add_argument(
+        '--sizes',
+        type=_parse_sizes,
+        default=[1000, 10000],
+        help='Comma-separated badge counts to benchmark at (default: 1000,10000).',
+    )
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (default: 5).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data.')
+    parser.add_argument(
+        '--only',
+        type=lambda value: [part for part in value.split(',') if part],
+        help='Comma-separated substrings; run only cases whose name contains one.',
+    )
+    parser.add_argument('--save', help='Write results to this JSON file (a new baseline).')
+    parser.add_argument('--baseline', help='Compare against results saved with --save.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help='Flag cases slower or larger than this multiple of the baseline (default: 1.25).',
+    )
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_arguments(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.sizes, repeat=args.repeat, only=args.only, seed=args.seed)
+    print(render_text(results, baseline))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) beyond {args.threshold}x:')
+            print('\n'.join(f'  {line}' for line in regressions))
+            return 1
+        print(f'\nNo regressions beyond {args.threshold}x.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
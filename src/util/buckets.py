@@ -0,0 +1,177 @@
+"""Per-month aggregate buckets for calendar drill-downs.
+
+The home page drills a season down into quarters and months. Rather than
+re-reading and re-filtering the badge list on every tab click, each scope's
+badges are folded once (per data version) into one bucket per calendar month.
+Quarter and season views are then a merge of a handful of small counters.
+
+A bucket is a plain dict::
+
+    total           -- number of badges
+    trainers/decks  -- Counter of badges per trainer / deck name
+    trainer_points/deck_points -- Counter of tier points per trainer / deck
+    trainer_summary -- trainer -> deck -> tier -> count
+    deck_summary    -- deck -> trainer -> tier -> count
+    stores          -- set of store names
+    deck_map        -- deck name -> full deck dict (for labels)
+
+Badges without a date land in a ``None`` bucket so season totals stay exact.
+The merged season bucket is cached alongside its months. Buckets returned
+from the cache are shared -- treat them as read-only and use
+:func:`merge` to combine them.
+"""
+from __future__ import annotations
+
+import datetime
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional
+
+import util.seasons
+import util.timing
+from util.leaderboard import badge_points, normalize_value
+
+_CUBE_CACHE: dict = {}
+
+
+def _empty_bucket() -> dict:
+    return {
+        'total': 0,
+        'trainers': Counter(),
+        'trainer_points': Counter(),
+        'decks': Counter(),
+        'deck_points': Counter(),
+        'trainer_summary': defaultdict(lambda: defaultdict(Counter)),
+        'deck_summary': defaultdict(lambda: defaultdict(Counter)),
+        'stores': set(),
+        'deck_map': {},
+    }
+
+
+def month_start(date: datetime.date) -> datetime.date:
+    """Return the first day of ``date``'s month (the bucket key)."""
+    return date.replace(day=1)
+
+
+def quarter_start(date: datetime.date) -> datetime.date:
+    """Return the first day of ``date``'s quarter (Jul/Oct/Jan/Apr)."""
+    return datetime.date(date.year, (date.month - 1) // 3 * 3 + 1, 1)
+
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+
+
+def period_end(date: datetime.date, granularity: str) -> datetime.date:
+    """Return the last day of the ``granularity`` period containing ``date``.
+
+    Weeks end on Sunday; quarters follow :func:`quarter_start`.
+    """
+    if granularity == 'day':
+        return date
+    if granularity == 'week':
+        return date + datetime.timedelta(days=6 - date.weekday())
+    if granularity == 'month':
+        start = month_start(date)
+    elif granularity == 'quarter':
+        start = quarter_start(date)
+    else:
+        raise ValueError(f'unsupported granularity: {granularity}')
+    months = 1 if granularity == 'month' else 3
+    year, month = divmod(start.month - 1 + months, 12)
+    return datetime.date(start.year + year, month + 1, 1) - datetime.timedelta(days=1)
+
+
+def _add_badge(bucket: dict, badge: dict) -> None:
+    points = badge_points(badge)
+    trainer = badge.get('trainer')
+    deck = badge.get('deck')
+    deck_name = normalize_value(deck)
+    tier = (badge.get('tier') or '').title()
+
+    bucket['total'] += 1
+    if trainer:
+        bucket['trainers'][trainer] += 1
+        bucket['trainer_points'][trainer] += points
+    if deck_name:
+        bucket['decks'][deck_name] += 1
+        bucket['deck_points'][deck_name] += points
+        if isinstance(deck, dict) and deck.get('name'):
+            bucket['deck_map'].setdefault(deck['name'], deck)
+    if trainer and deck_name:
+        bucket['trainer_summary'][trainer][deck_name][tier] += 1
+        bucket['deck_summary'][deck_name][trainer][tier] += 1
+    if badge.get('store'):
+        bucket['stores'].add(badge['store'])
+
+
+@util.timing.timed('aggregate')
+def build_month_buckets(badges: Iterable[dict]) -> Dict[Optional[datetime.date], dict]:
+    """Fold badges into one bucket per calendar month in a single pass."""
+    buckets: Dict[Optional[datetime.date], dict] = {}
+    for badge in badges:
+        date = badge.get('date')
+        key = month_start(date) if date else None
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = _empty_bucket()
+        _add_badge(bucket, badge)
+    return buckets
+
+
+def month_buckets(season) -> Dict[Optional[datetime.date], dict]:
+    """Return a scope's month buckets, rebuilt only when its data changes."""
+    version = util.seasons.data_version(season)
+    cached = _CUBE_CACHE.get(season)
+    if cached and cached['version'] == version:
+        return cached['buckets']
+    buckets = build_month_buckets(util.seasons.read_badges(season))
+    _CUBE_CACHE[season] = {'version': version, 'buckets': buckets}
+    return buckets
+
+
+@util.timing.timed('aggregate')
+def merge(buckets: Iterable[dict]) -> dict:
+    """Sum buckets into a new one, leaving the inputs untouched.
+
+    Pass buckets newest-first so ``deck_map`` keeps the most recent deck data,
+    matching how pages build it from newest-first badge lists.
+    """
+    merged = _empty_bucket()
+    for bucket in buckets:
+        merged['total'] += bucket['total']
+        for field in ('trainers', 'trainer_points', 'decks', 'deck_points'):
+            merged[field].update(bucket[field])
+        for field in ('trainer_summary', 'deck_summary'):
+            for primary, secondaries in bucket[field].items():
+                for secondary, tiers in secondaries.items():
+                    merged[field][primary][secondary].update(tiers)
+        merged['stores'] |= bucket['stores']
+        for name, deck in bucket['deck_map'].items():
+            merged['deck_map'].setdefault(name, deck)
+    return merged
+
+
+def range_bucket(season, start: datetime.date, end: datetime.date) -> dict:
+    """Merge a scope's month buckets for months in ``[start, end)``."""
+    buckets = month_buckets(season)
+    months = sorted((m for m in buckets if m and start <= m < end), reverse=True)
+    return merge(buckets[m] for m in months)
+
+
+def season_bucket(season) -> dict:
+    """Merge every month bucket (plus undated badges) for a scope, cached per data version."""
+    buckets = month_buckets(season)
+    cached = _CUBE_CACHE.get(season)
+    if cached and cached['buckets'] is buckets and 'season' in cached:
+        return cached['season']
+    months = sorted((m for m in buckets if m), reverse=True)
+    if None in buckets:
+        months.append(None)
+    merged = merge(buckets[m] for m in months)
+    if cached and cached['buckets'] is buckets:
+        cached['season'] = merged
+    return merged
+
+
+def deck_map(season) -> dict:
+    """Deck name -> newest deck dict across a scope (shared; don't mutate it)."""
+    return season_bucket(season)['deck_map']
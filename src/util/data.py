@@ -2,6 +2,9 @@ import datetime
 import functools
 import json
 import os
+import re
+
+import util.timing
 
 EXAMPLE = 'example.jsonl'
 
@@ -22,6 +25,7 @@ IS_DEMO = os.path.basename(FILENAME) == EXAMPLE
 _READ_CACHE = {}
 
 
+@util.timing.timed('stat')
 def _get_file_version(filename):
     try:
         stats = os.stat(filename)
@@ -30,6 +34,15 @@ def _get_file_version(filename):
     return (stats.st_mtime_ns, stats.st_size)
 
 
+def file_version(filename):
+    """Return a token that changes whenever ``filename`` is written (None if missing).
+
+    Lets derived caches elsewhere (indexes, aggregates) invalidate on the same
+    signal ``read_data_from_file`` uses.
+    """
+    return _get_file_version(filename)
+
+
 def read_data_from_file(filename):
     '''Read data from file with basic file modification caching'''
     file_version = _get_file_version(filename)
@@ -41,32 +54,82 @@ def read_data_from_file(filename):
     if cached and cached['version'] == file_version:
         return cached['data']
 
-    data = []
-    with open(filename, 'r') as f:
-        for i, line in enumerate(f):
-            try:
-                badge = json.loads(line.strip())
+    with util.timing.span('parse'):
+        data = []
+        with open(filename, 'r') as f:
+            for i, line in enumerate(f):
+                try:
+                    badge = json.loads(line.strip())
+                except json.JSONDecodeError:
+                    continue  # Skip invalid lines
+                if not isinstance(badge, dict):
+                    continue  # Valid JSON but not a record (e.g. a stray list)
                 badge['_line'] = i
                 data.append(badge)
-            except json.JSONDecodeError:
-                continue  # Skip invalid lines
-    for b in data:
-        try:
-            b['date'] = datetime.date.fromisoformat(b.get('date'))
-        except Exception:
-            b['date'] = None
-    badges = sorted(
-        data,
-        key=lambda x: (
-            x['date'] or datetime.date.min,
-            x.get('_line', 0),
-        ),
-        reverse=True,
-    )
+        for b in data:
+            try:
+                b['date'] = datetime.date.fromisoformat(b.get('date'))
+            except Exception:
+                b['date'] = None
+        badges = sorted(
+            data,
+            key=lambda x: (
+                x['date'] or datetime.date.min,
+                x.get('_line', 0),
+            ),
+            reverse=True,
+        )
     _READ_CACHE[filename] = {'version': file_version, 'data': badges}
     return badges
 
 
+_DATE_FIELD = re.compile(r'"date"\s*:\s*"(\d{4}-\d{2}-\d{2})"')
+
+
+def iter_records(filename, start=None, end=None):
+    """Stream records from a JSONL file in file order, one at a time.
+
+    Unlike ``read_data_from_file`` this neither sorts nor touches
+    ``_READ_CACHE``, so bulk jobs over large or archived files run in constant
+    memory. Records get the same ``_line`` index and parsed ``date``.
+
+    With ``start``/``end``, only records dated in ``[start, end)`` are yielded
+    (undated ones are dropped). Lines whose date is visibly out of range are
+    skipped before JSON decoding.
+    """
+    start_key = start.isoformat() if start else None
+    end_key = end.isoformat() if end else None
+    try:
+        f = open(filename, 'r')
+    except FileNotFoundError:
+        return
+    with f:
+        for i, line in enumerate(f):
+            if start_key or end_key:
+                match = _DATE_FIELD.search(line)
+                # Only trust the raw match when it's the record's sole date.
+                if match and line.count('"date"') == 1:
+                    key = match.group(1)
+                    if (start_key and key < start_key) or (end_key and key >= end_key):
+                        continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            try:
+                record['date'] = datetime.date.fromisoformat(record.get('date'))
+            except Exception:
+                record['date'] = None
+            if start or end:
+                date = record['date']
+                if date is None or (start and date < start) or (end and date >= end):
+                    continue
+            record['_line'] = i
+            yield record
+
+
 def update_data_in_file(filename=None, line_index=None, contents=None):
     if filename is None or line_index is None or contents is None:
         return
@@ -1,10 +1,13 @@
+import contextlib
 import json
 import logging
 import os
+import threading
 
-import requests
-
+import util.badge_images
 import util.data
+import util.outbox
+import util.webhook
 
 logger = logging.getLogger(__name__)
 
@@ -12,17 +15,47 @@ logger = logging.getLogger(__name__)
 # TH_BL_DATA_DIR is set (Docker), else next to src/ as before (local dev).
 if util.data.DATA_DIR:
     _DISCORD_IDS_FILE = util.data.data_path('discord_ids.json')
+    _OUTBOX_DIR = util.data.data_path('discord_outbox')
 else:
     _DISCORD_IDS_FILE = os.path.join(os.path.dirname(__file__), '..', 'discord_ids.json')
+    _OUTBOX_DIR = os.path.join(os.path.dirname(__file__), '..', 'discord_outbox')
 _WEBHOOK_URL = os.getenv('TH_BL_DISCORD_WEBHOOK')
+# Announcements rendered/posted concurrently per process.
+_OUTBOX_WORKERS = int(os.getenv('TH_BL_DISCORD_WORKERS', '2'))
+
+# One pooled, rate-limited client shared by every announcement in the process.
+CLIENT = util.webhook.WebhookClient(_WEBHOOK_URL, pool_size=_OUTBOX_WORKERS)
+
+
+# discord_ids.json is read on every mention and on admin trainer picks, so
+# keep the parsed map in memory and re-read only when the file's mtime/size
+# change (another worker saved). Writes go to a temp file renamed into place,
+# under a lock file so concurrent workers don't lose each other's updates.
+_IDS_CACHE = {'version': None, 'ids': {}}
+_IDS_LOCK = threading.Lock()
 
 
-def _load_discord_ids():
+def _read_discord_ids():
     try:
         with open(_DISCORD_IDS_FILE, 'r') as f:
-            return json.load(f)
+            ids = json.load(f)
     except (OSError, json.JSONDecodeError):
         return {}
+    return ids if isinstance(ids, dict) else {}
+
+
+def discord_ids():
+    """Return the trainer -> Discord ID map (shared; don't mutate it)."""
+    version = util.data.file_version(_DISCORD_IDS_FILE)
+    if _IDS_CACHE['version'] != version or version is None:
+        with _IDS_LOCK:
+            if _IDS_CACHE['version'] != version or version is None:
+                _IDS_CACHE.update(version=version, ids=_read_discord_ids())
+    return _IDS_CACHE['ids']
+
+
+def has_discord_id(trainer):
+    return bool(trainer) and trainer in discord_ids()
 
 
 def _ensure_file():
@@ -39,62 +72,176 @@ def _ensure_file():
     return True
 
 
-def save_discord_id(trainer, discord_id):
+@contextlib.contextmanager
+def _file_lock():
+    """Serialize writers across threads and gunicorn workers."""
+    with _IDS_LOCK, open(f'{_DISCORD_IDS_FILE}.lock', 'w') as lock:
+        try:
+            import fcntl
+        except ImportError:  # not POSIX; the thread lock still applies
+            yield
+            return
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_discord_ids(ids):
+    tmp = f'{_DISCORD_IDS_FILE}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(ids, f, indent=2)
+    try:
+        os.replace(tmp, _DISCORD_IDS_FILE)
+    except OSError:
+        # A file bind-mounted on its own can't be replaced; write in place.
+        os.remove(tmp)
+        with open(_DISCORD_IDS_FILE, 'w') as f:
+            json.dump(ids, f, indent=2)
+
+
+def save_discord_ids(updates):
+    """Merge ``{trainer: discord_id}`` into the registry in one write."""
+    updates = {trainer: discord_id for trainer, discord_id in updates.items() if trainer and discord_id}
+    if not updates:
+        return
     if not _ensure_file():
-        logger.warning('Skipping Discord ID save for %s: file not writable', trainer)
+        logger.warning('Skipping Discord ID save for %s: file not writable', ', '.join(updates))
         return
-    ids = _load_discord_ids()
-    ids[trainer] = discord_id
-    with open(_DISCORD_IDS_FILE, 'w') as f:
-        json.dump(ids, f, indent=2)
+    with _file_lock():
+        ids = _read_discord_ids()  # fresh: another worker may have written
+        ids.update(updates)
+        _write_discord_ids(ids)
+        _IDS_CACHE.update(version=util.data.file_version(_DISCORD_IDS_FILE), ids=ids)
+
+
+def save_discord_id(trainer, discord_id):
+    save_discord_ids({trainer: discord_id})
 
 
 def _mention(trainer):
-    discord_id = _load_discord_ids().get(trainer)
+    discord_id = discord_ids().get(trainer)
     if discord_id:
         return f'<@{discord_id}>'
     return trainer
 
 
+# Discord accepts at most 10 attachments per message.
+_MAX_ATTACHMENTS = 10
 
-def post_badge(badge):
-    """Post a new badge announcement to Discord via webhook."""
-    if not _WEBHOOK_URL:
-        return
 
-    image_bytes = None
+def _render_images(badges):
     try:
-        import subprocess, sys
-        src_dir = os.path.dirname(os.path.dirname(__file__))
-        result = subprocess.run(
-            [sys.executable, '-m', 'util.discord_image'],
-            input=json.dumps(badge, default=str).encode(),
-            capture_output=True,
-            timeout=30,
-            cwd=src_dir,
-        )
-        if result.returncode == 0:
-            image_bytes = result.stdout
-        else:
-            logger.warning('Badge image process failed: %s', result.stderr.decode())
+        return util.badge_images.render_many(badges)
     except Exception as e:
-        logger.warning('Failed to generate badge image: %s', e)
+        logger.warning('Failed to generate badge images: %s', e)
+        return [None] * len(badges)
 
-    mention = _mention(badge.get('trainer', 'Someone'))
-    payload = {'content': f'Congrats to {mention} on earning their badge!'}
 
+def _post(payload, images):
+    """Send one webhook message with ``images`` (PNG bytes) attached.
+
+    Raises once the client gives up, so the outbox parks the job as failed.
+    """
+    files = [(f'badge-{i + 1}.png', image, 'image/png') for i, image in enumerate(images)]
     try:
-        if image_bytes:
-            requests.post(
-                _WEBHOOK_URL,
-                data={'payload_json': json.dumps(payload)},
-                files={'file': ('badge.png', image_bytes, 'image/png')},
-                timeout=10,
-            )
-        else:
-            requests.post(_WEBHOOK_URL, json=payload, timeout=10)
-    except Exception as e:
+        CLIENT.post(payload, files)
+    except util.webhook.WebhookError as e:
         logger.error('Failed to post badge to Discord: %s', e)
+        raise
+
+
+def _join_names(names):
+    if len(names) <= 1:
+        return ''.join(names)
+    return f'{", ".join(names[:-1])} and {names[-1]}'
+
+
+def _attach(badges, images):
+    """Keep the rendered cards, logging any badge whose card failed to render."""
+    missing = [b.get('trainer', 'Someone') for b, image in zip(badges, images) if not image]
+    if missing:
+        logger.warning('Posting without a badge card for %s: render failed', ', '.join(missing))
+    return [image for image in images if image]
+
+
+def post_badge(badge):
+    """Post a new badge announcement to Discord via webhook."""
+    if not _WEBHOOK_URL:
+        return
+    images = _attach([badge], _render_images([badge]))
+    mention = _mention(badge.get('trainer', 'Someone'))
+    _post({'content': f'Congrats to {mention} on earning their badge!'}, images)
+
+
+def post_event(badges):
+    """Announce up to ``_MAX_ATTACHMENTS`` badges earned at one event in one webhook message.
+
+    :func:`enqueue_event` splits bigger events into one job per message, so
+    a failed post is retried without repeating the messages already sent.
+    """
+    if not _WEBHOOK_URL or not badges:
+        return
+    images = _attach(badges, _render_images(badges))
+    mentions = _join_names([_mention(b.get('trainer', 'Someone')) for b in badges])
+    store = badges[0].get('store')
+    where = f' at {store}' if store else ''
+    noun = 'badge' if len(badges) == 1 else 'badges'
+    _post({'content': f'Congrats to {mentions} on earning their {noun}{where}!'}, images)
+
+
+def _event_jobs(badges):
+    """One outbox job per webhook message for an event's badges."""
+    if len(badges) == 1:
+        return [{'kind': 'badge', 'badge': badges[0]}]
+    return [
+        {'kind': 'event', 'badges': badges[start:start + _MAX_ATTACHMENTS]}
+        for start in range(0, len(badges), _MAX_ATTACHMENTS)
+    ]
+
+
+def _deliver(job):
+    """Outbox handler: run one queued announcement."""
+    kind = job.get('kind')
+    if kind == 'badge':
+        post_badge(job['badge'])
+    elif kind == 'event' and len(job['badges']) > _MAX_ATTACHMENTS:
+        # Queued before events were split per message: split it now.
+        for part in _event_jobs(job['badges']):
+            OUTBOX.put(part)
+    elif kind == 'event':
+        post_event(job['badges'])
+    else:
+        logger.warning('Unknown Discord job kind: %s', kind)
+
+
+OUTBOX = util.outbox.Outbox(_OUTBOX_DIR, _deliver, workers=_OUTBOX_WORKERS)
+
+
+def enqueue_badge(badge):
+    """Queue a badge announcement; returns immediately.
+
+    The job is persisted to the outbox before returning, so it survives a
+    restart. A no-op when no webhook is configured.
+    """
+    if not _WEBHOOK_URL:
+        return None
+    return OUTBOX.put({'kind': 'badge', 'badge': badge})
+
+
+def enqueue_event(badges):
+    """Queue an event's announcement: one job per message. Returns the job ids."""
+    if not _WEBHOOK_URL or not badges:
+        return None
+    return [OUTBOX.put(job) for job in _event_jobs(list(badges))]
+
+
+def start_outbox():
+    """Resume announcements left pending by a previous process."""
+    if not _WEBHOOK_URL:
+        return 0
+    return OUTBOX.start()
 
 
 if __name__ == '__main__':
@@ -1,12 +1,28 @@
+import atexit
 import base64
+import functools
+import json
+import logging
 import os
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
 
 import th_helpers.utils.colors
 
+import util.sprites
+
+logger = logging.getLogger(__name__)
+
 _ASSETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets')
 
 
+@functools.lru_cache(maxsize=32)
 def _svg_data_uri(background):
+    """Energy background as a data URI (memoized; there are only a handful)."""
     if not background:
         return None
     svg_path = os.path.join(_ASSETS_DIR, 'energy_types', f'{background.lower()}.svg')
@@ -19,17 +35,7 @@ def _svg_data_uri(background):
 
 
 def _sprite_data_uri(icon):
-    import requests
-    if not icon or not isinstance(icon, str):
-        return None
-    url = icon if icon.startswith('https') else f'https://raw.githubusercontent.com/bradley-erickson/pokesprite/master/pokemon/regular/{icon}.png'
-    try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = base64.b64encode(resp.content).decode()
-        return f'data:image/png;base64,{data}'
-    except Exception:
-        return None
+    return util.sprites.sprite_data_uri(icon)
 
 
 def _build_badge_html(badge):
@@ -104,14 +110,21 @@ def _build_badge_html(badge):
 </html>'''
 
 
+_VIEWPORT = {'width': 816, 'height': 600}
+
+
 def badge_to_bytes(badge):
-    """Render badge HTML to PNG bytes via headless Chromium (Playwright)."""
+    """Render badge HTML to PNG bytes via headless Chromium (Playwright).
+
+    One-shot: launches and closes a browser. Long-running callers should use
+    :data:`RENDERER`, which keeps a warm browser in a helper process.
+    """
     from playwright.sync_api import sync_playwright
 
     html = _build_badge_html(badge)
     with sync_playwright() as p:
         browser = p.chromium.launch()
-        page = browser.new_page(viewport={'width': 816, 'height': 600})
+        page = browser.new_page(viewport=_VIEWPORT)
         page.set_content(html, wait_until='networkidle')
         card = page.locator('.card')
         png = card.screenshot()
@@ -119,7 +132,192 @@ def badge_to_bytes(badge):
     return png
 
 
+# ---------------------------------------------------------------------------
+# Persistent renderer
+# ---------------------------------------------------------------------------
+# ``python -m util.discord_image --serve`` runs a render server: one Chromium
+# plus a pool of reusable pages, taking jobs over stdin and answering on stdout.
+# Frames are length-prefixed so PNG bytes pass through untouched:
+#   request:  >II  (job_id, length) + JSON badge
+#   response: >IBI (job_id, status, length) + PNG (status 0) or error text
+# Jobs render concurrently across the page pool, so responses may come back
+# out of order; the job id pairs them up.
+_REQUEST = struct.Struct('>II')
+_RESPONSE = struct.Struct('>IBI')
+_OK, _ERROR = 0, 1
+_POOL_SIZE = int(os.getenv('TH_BL_RENDER_PAGES', '2'))
+
+
+async def _serve(pool_size):
+    import asyncio
+    from playwright.async_api import async_playwright
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer,
+    )
+    out = sys.stdout.buffer
+
+    def respond(job_id, status, payload):
+        # Single thread, no await between write and flush: frames never interleave.
+        out.write(_RESPONSE.pack(job_id, status, len(payload)) + payload)
+        out.flush()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        pages = asyncio.Queue()
+        for _ in range(max(1, pool_size)):
+            pages.put_nowait(await browser.new_page(viewport=_VIEWPORT))
+
+        async def render(job_id, badge):
+            page = await pages.get()
+            try:
+                html = await loop.run_in_executor(None, _build_badge_html, badge)
+                await page.set_content(html, wait_until='networkidle')
+                png = await page.locator('.card').screenshot()
+                respond(job_id, _OK, png)
+            except Exception as e:
+                respond(job_id, _ERROR, str(e).encode())
+            finally:
+                pages.put_nowait(page)
+
+        tasks = set()
+        while True:
+            try:
+                header = await reader.readexactly(_REQUEST.size)
+                job_id, length = _REQUEST.unpack(header)
+                badge = json.loads(await reader.readexactly(length))
+            except asyncio.IncompleteReadError:
+                break  # parent closed the pipe
+            task = asyncio.ensure_future(render(job_id, badge))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        await browser.close()
+
+
+class RenderError(Exception):
+    pass
+
+
+class BrowserRenderer:
+    """Client for the render server, started lazily and owned by this process.
+
+    The server is restarted on the next call if it dies or times out. Calls are
+    serialized with a lock; :meth:`render_many` pipelines a whole batch so the
+    server's page pool renders it in parallel.
+    """
+
+    kind = 'browser'
+
+    def __init__(self, pool_size=_POOL_SIZE, timeout=30):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._proc = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        atexit.register(self.close)
+
+    def _ensure(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._proc = subprocess.Popen(
+            [sys.executable, '-m', 'util.discord_image', '--serve', str(self.pool_size)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=src_dir,
+        )
+        return self._proc
+
+    def _read(self, fd, size, deadline):
+        buf = b''
+        while len(buf) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RenderError('render server timed out')
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, size - len(buf))
+            if not chunk:
+                raise RenderError('render server exited')
+            buf += chunk
+        return buf
+
+    def render_many(self, badges):
+        """Render badges to PNG bytes, in order. Failed renders come back as None."""
+        badges = list(badges)
+        if not badges:
+            return []
+        with self._lock:
+            proc = self._ensure()
+            ids = {}
+            try:
+                for i, badge in enumerate(badges):
+                    self._next_id = (self._next_id + 1) % 2 ** 32
+                    payload = json.dumps(badge, default=str).encode()
+                    proc.stdin.write(_REQUEST.pack(self._next_id, len(payload)) + payload)
+                    ids[self._next_id] = i
+                proc.stdin.flush()
+                results = [None] * len(badges)
+                fd = proc.stdout.fileno()
+                deadline = time.monotonic() + self.timeout * len(badges)
+                for _ in badges:
+                    job_id, status, length = _RESPONSE.unpack(self._read(fd, _RESPONSE.size, deadline))
+                    payload = self._read(fd, length, deadline)
+                    if status == _OK:
+                        results[ids[job_id]] = payload
+                    else:
+                        logger.warning('Badge render failed: %s', payload.decode(errors='replace'))
+                return results
+            except (OSError, RenderError, KeyError, struct.error) as e:
+                logger.warning('Render server failed, restarting next call: %s', e)
+                self._kill()
+                return [None] * len(badges)
+
+    def render(self, badge):
+        """Render one badge to PNG bytes (None on failure)."""
+        return self.render_many([badge])[0]
+
+    def _kill(self):
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+    def close(self):
+        """Stop the render server (closing stdin lets it finish in-flight jobs)."""
+        proc, self._proc = self._proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
+def _make_renderer():
+    """Pick the badge renderer: ``TH_BL_BADGE_RENDERER=browser`` (default) or ``native``."""
+    kind = os.getenv('TH_BL_BADGE_RENDERER', 'browser').strip().lower()
+    if kind == 'native':
+        import util.native_image
+        return util.native_image.NativeRenderer()
+    if kind != 'browser':
+        logger.warning('Unknown TH_BL_BADGE_RENDERER %r; using the browser renderer', kind)
+    return BrowserRenderer()
+
+
+RENDERER = _make_renderer()
+
+
 if __name__ == '__main__':
-    import json, sys
-    badge = json.loads(sys.stdin.read())
-    sys.stdout.buffer.write(badge_to_bytes(badge))
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        import asyncio
+        asyncio.run(_serve(int(sys.argv[2]) if len(sys.argv) > 2 else _POOL_SIZE))
+    else:
+        badge = json.loads(sys.stdin.read())
+        sys.stdout.buffer.write(badge_to_bytes(badge))
@@ -0,0 +1,333 @@
+"""Export normalized badges and event standings as a columnar (Parquet) dataset.
+
+Notebook analysis otherwise re-parses every JSONL line on each run. This
+writes two typed tables under an output directory:
+
+    badges/     one row per normalized badge (badges-mode lines and badges
+                derived from events-mode standings)
+    standings/  one row per events-mode standing, with placement and record
+
+String columns (trainer, deck, store, tier, ...) are dictionary-encoded and
+dates are real ``date32`` columns. Load them with e.g.
+``pyarrow.dataset.dataset('out/badges')`` or ``pandas.read_parquet('out/badges')``.
+
+Exports are incremental. ``_manifest.json`` remembers, per source file, how
+many bytes were exported plus a hash of them. A later run appends one new
+part file (row group) per file holding only the lines added since. If an
+earlier line was edited in place (admin edits rewrite lines), that file's
+parts are rebuilt.
+
+Requires ``pyarrow`` (not needed by the web app)::
+
+    pip install pyarrow
+    PYTHONPATH=src python -m util.export_columnar out/ [--season 2027] [--full]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import util.data
+import util.normalize
+import util.seasons
+from util.badges import tier_points
+
+MANIFEST = '_manifest.json'
+_FORMAT_VERSION = 1
+
+# (column, type) -- 'dict' columns are dictionary-encoded strings.
+BADGE_COLUMNS: List[Tuple[str, str]] = [
+    ('source', 'dict'), ('line', 'int32'), ('date', 'date'), ('season', 'int16'),
+    ('trainer', 'dict'), ('pronouns', 'dict'), ('deck_id', 'dict'), ('deck_name', 'dict'),
+    ('store', 'dict'), ('tier', 'dict'), ('format', 'dict'), ('points', 'int16'),
+    ('color', 'dict'), ('background', 'dict'), ('author', 'dict'), ('event_id', 'string'),
+]
+STANDING_COLUMNS: List[Tuple[str, str]] = [
+    ('source', 'dict'), ('line', 'int32'), ('event_id', 'string'), ('date', 'date'),
+    ('season', 'int16'), ('store', 'dict'), ('tier', 'dict'), ('format', 'dict'),
+    ('players', 'int32'), ('placement', 'int32'), ('record', 'string'),
+    ('trainer', 'dict'), ('deck_id', 'dict'), ('deck_name', 'dict'), ('earned_badge', 'bool'),
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise SystemExit('export_columnar needs pyarrow: pip install pyarrow') from exc
+    return pyarrow, pyarrow.parquet
+
+
+# ---------------------------------------------------------------------------
+# Rows
+# ---------------------------------------------------------------------------
+def _as_date(value: Any) -> Optional[datetime.date]:
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _deck_fields(deck: Any) -> Tuple[Optional[str], Optional[str]]:
+    if isinstance(deck, dict):
+        return _as_str(deck.get('id')), _as_str(deck.get('name'))
+    return None, _as_str(deck)
+
+
+def _season(date: Optional[datetime.date]) -> Optional[int]:
+    return util.seasons.season_year_for_date(date) if date else None
+
+
+def _badge_row(badge: Dict[str, Any], source: str) -> Dict[str, Any]:
+    date = _as_date(badge.get('date'))
+    deck_id, deck_name = _deck_fields(badge.get('deck'))
+    return {
+        'source': source,
+        'line': badge.get('_line'),
+        'date': date,
+        'season': _season(date),
+        'trainer': _as_str(badge.get('trainer')),
+        'pronouns': _as_str(badge.get('pronouns')),
+        'deck_id': deck_id,
+        'deck_name': deck_name,
+        'store': _as_str(badge.get('store')),
+        'tier': _as_str(badge.get('tier')),
+        'format': _as_str(badge.get('format')),
+        'points': tier_points(badge.get('tier')),
+        'color': _as_str(badge.get('color')),
+        'background': _as_str(badge.get('background')),
+        'author': _as_str(badge.get('author')),
+        'event_id': _as_str(badge.get('event_id')),
+    }
+
+
+def _standing_rows(event: Dict[str, Any], source: str) -> Iterator[Dict[str, Any]]:
+    date = _as_date(event.get('date'))
+    for standing in event.get('standings') or []:
+        deck_id, deck_name = _deck_fields(standing.get('deck'))
+        yield {
+            'source': source,
+            'line': event.get('_line'),
+            'event_id': _as_str(event.get('id')),
+            'date': date,
+            'season': _season(date),
+            'store': _as_str(event.get('store')),
+            'tier': _as_str(event.get('tier')),
+            'format': _as_str(event.get('format')),
+            'players': _as_int(event.get('players')),
+            'placement': _as_int(standing.get('placement')),
+            'record': _as_str(standing.get('record')),
+            'trainer': _as_str(standing.get('trainer')),
+            'deck_id': deck_id,
+            'deck_name': deck_name,
+            'earned_badge': bool(standing.get('earned_badge')),
+        }
+
+
+def _rows_for(records: Iterable[Dict[str, Any]], mode: str, source: str):
+    """Return ``(badge_rows, standing_rows)`` for raw records of one file."""
+    records = list(records)
+    standings: List[Dict[str, Any]] = []
+    if mode == 'events':
+        for record in records:
+            standings.extend(_standing_rows(record, source))
+    derived, _ = util.normalize.normalize_records(records, mode)
+    return [_badge_row(badge, source) for badge in derived], standings
+
+
+def _table(rows: List[Dict[str, Any]], columns: List[Tuple[str, str]]):
+    pa, _ = _pyarrow()
+    types = {
+        'int16': pa.int16(), 'int32': pa.int32(), 'date': pa.date32(),
+        'string': pa.string(), 'bool': pa.bool_(),
+    }
+    arrays = []
+    for name, kind in columns:
+        values = [row[name] for row in rows]
+        if kind == 'dict':
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=types[kind]))
+    return pa.Table.from_arrays(arrays, names=[name for name, _ in columns])
+
+
+# ---------------------------------------------------------------------------
+# Incremental file state
+# ---------------------------------------------------------------------------
+def _prefix_sha(path: str, length: int) -> str:
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _read_from(path: str, offset: int, first_line: int):
+    """Decode complete lines after ``offset``. Returns ``(records, new_offset, lines)``.
+
+    A trailing line without a newline (a write in progress) is left for the
+    next run.
+    """
+    records = []
+    line_no = first_line
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break
+            offset += len(raw)
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                record = None
+            if isinstance(record, dict):
+                record['_line'] = line_no
+                record['date'] = _as_date(record.get('date'))
+                records.append(record)
+            line_no += 1
+    return records, offset, line_no
+
+
+def _load_manifest(out_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(out_dir, MANIFEST), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {'format': _FORMAT_VERSION, 'files': {}}
+    if manifest.get('format') != _FORMAT_VERSION:
+        return {'format': _FORMAT_VERSION, 'files': {}}
+    return manifest
+
+
+def _write_atomic(path: str, write) -> None:
+    tmp = f'{path}.{os.getpid()}.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _remove_parts(out_dir: str, parts: List[str]) -> None:
+    for part in parts:
+        try:
+            os.remove(os.path.join(out_dir, part))
+        except FileNotFoundError:
+            pass
+
+
+def export_file(out_dir: str, path: str, mode: str, state: Optional[Dict[str, Any]], full: bool = False):
+    """Bring one source file's parts up to date. Returns ``(state, badges, standings)`` added."""
+    _, pq = _pyarrow()
+    version = util.data.file_version(path)
+    if version is None:
+        return state, 0, 0
+    if state and not full and state.get('version') == list(version) and state.get('mode') == mode:
+        return state, 0, 0
+
+    size = version[1]
+    offset = line = 0
+    parts: List[str] = []
+    if state and not full and state.get('mode') == mode and size >= state['offset'] \
+            and _prefix_sha(path, state['offset']) == state['sha256']:
+        offset, line, parts = state['offset'], state['lines'], list(state['parts'])
+    elif state:
+        _remove_parts(out_dir, state.get('parts', []))  # edited in place: rebuild
+
+    records, new_offset, new_line = _read_from(path, offset, line)
+    source = os.path.basename(path)
+    badge_rows, standing_rows = _rows_for(records, mode, source)
+    stem = os.path.splitext(source)[0]
+    seq = state.get('seq', 0) + 1 if state else 1
+    for table, rows, columns in (
+        ('badges', badge_rows, BADGE_COLUMNS),
+        ('standings', standing_rows, STANDING_COLUMNS),
+    ):
+        if not rows:
+            continue
+        os.makedirs(os.path.join(out_dir, table), exist_ok=True)
+        part = os.path.join(table, f'{stem}-{seq:05d}.parquet')
+        arrow_table = _table(rows, columns)
+        _write_atomic(os.path.join(out_dir, part), lambda tmp: pq.write_table(arrow_table, tmp))
+        parts.append(part)
+
+    state = {
+        'mode': mode,
+        'version': list(version),
+        'offset': new_offset,
+        'lines': new_line,
+        'sha256': _prefix_sha(path, new_offset),
+        'seq': seq,
+        'parts': parts,
+    }
+    return state, len(badge_rows), len(standing_rows)
+
+
+def export(out_dir: str, files: Dict[str, str], full: bool = False) -> Dict[str, Tuple[int, int]]:
+    """Export ``{path: mode}`` into ``out_dir``. Returns rows added per file."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    added = {}
+    for path, mode in files.items():
+        key = os.path.basename(path)
+        state, badges, standings = export_file(out_dir, path, mode, manifest['files'].get(key), full=full)
+        if state:
+            manifest['files'][key] = state
+        added[key] = (badges, standings)
+
+    def write_manifest(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(os.path.join(out_dir, MANIFEST), write_manifest)
+    return added
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Export normalized badges and event standings to a Parquet dataset.',
+    )
+    parser.add_argument('output', help='Output directory (created if missing).')
+    parser.add_argument(
+        '--season',
+        type=int,
+        help="Export only this season's data file (default: every configured season).",
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Rebuild from scratch instead of appending new lines.',
+    )
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_arguments(argv)
+    files = util.seasons.data_files(args.season)
+    for source, (badges, standings) in export(args.output, files, full=args.full).items():
+        print(f'{source}: +{badges} badge rows, +{standings} standing rows')
+
+
+if __name__ == '__main__':
+    main()
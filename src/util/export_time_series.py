@@ -2,20 +2,26 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import concurrent.futures
 import csv
 import datetime
 import json
 from collections import defaultdict
 from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import th_helpers.components.deck_label
 
+import util.normalize
+import util.seasons
 from util.badges import season_bounds, tier_points
-from util.data import FILENAME as DEFAULT_DATA_FILE, read_data_from_file
+from util.buckets import GRANULARITIES, period_end
+from util.data import FILENAME as DEFAULT_DATA_FILE, iter_records
 
-GROUP_BY_CHOICES: Sequence[str] = ('trainer', 'deck')
+GROUP_BY_CHOICES: Sequence[str] = ('trainer', 'deck', 'store')
+EMIT_CHOICES: Sequence[str] = ('all', 'updated', 'changes')
 
 # Score weighting constant - makes it explicit what the magic number means
 POINTS_WEIGHT = 0.001
@@ -30,6 +36,26 @@ def _default_input_path() -> Path:
     return project_root_example
 
 
+def _parse_group_by(value: str) -> List[str]:
+    """Parse a comma-separated list of group-by dimensions for argparse."""
+    group_bys = []
+    for part in value.split(','):
+        part = part.strip()
+        if part not in GROUP_BY_CHOICES:
+            raise argparse.ArgumentTypeError(
+                f"invalid group-by: {part!r} (choose from {', '.join(GROUP_BY_CHOICES)})"
+            )
+        if part not in group_bys:
+            group_bys.append(part)
+    return group_bys
+
+
+def _group_bys(args: argparse.Namespace) -> List[str]:
+    """Return the requested dimensions (accepts a list or a single name)."""
+    value = args.group_by
+    return _parse_group_by(value) if isinstance(value, str) else list(value)
+
+
 def _parse_date(value: Optional[str]) -> Optional[datetime.date]:
     """Parse ISO date string for argparse."""
     if not value:
@@ -49,6 +75,8 @@ def _badge_entity(badge: Dict[str, Any], group_by: str) -> Optional[str]:
         if isinstance(deck, dict):
             return deck.get('name') or deck.get('id')
         return deck
+    if group_by == 'store':
+        return badge.get('store')
     raise ValueError(f'unsupported group-by value: {group_by}')
 
 
@@ -141,146 +169,235 @@ def _resolve_deck_image_url(
     return None
 
 
-def _timeline_rows(
-    badges: List[Dict[str, Any]],
-    group_by: str,
+def _rank_key(entity: str, badges: int, points: int) -> Tuple[int, int, str, str]:
+    """Sort key: badges (desc), points (desc), then name (asc)."""
+    return (-badges, -points, str(entity).lower(), str(entity))
+
+
+class _Timeline:
+    """Cumulative counts and an incrementally maintained ranking for one dimension.
+
+    The ranking is kept in a sorted list: each snapshot only repositions the
+    entities that earned badges since the last one (bisect out, bisect in)
+    instead of re-sorting everyone.
+    """
+
+    def __init__(self, group_by: str, *, image_map: Optional[Dict[str, str]], emit: str):
+        if emit not in EMIT_CHOICES:
+            raise ValueError(f'unsupported emit value: {emit}')
+        self.group_by = group_by
+        self.image_map = image_map
+        self.emit = emit
+        self.records: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.points: Dict[str, int] = defaultdict(int)
+        self.ranking: List[Tuple[int, int, str, str]] = []
+        self.key_to_entity: Dict[Tuple[int, int, str, str], str] = {}
+        self.last_rank: Dict[str, int] = {}
+        self.updated: Dict[str, Tuple[int, int]] = {}  # entity -> (badges, points) before this snapshot
+        self.image_urls: Optional[Dict[str, Optional[str]]] = {} if group_by == 'deck' else None
+
+    def add(self, badge: Dict[str, Any]) -> None:
+        entity = _badge_entity(badge, self.group_by)
+        if not entity:
+            return
+        if entity not in self.updated:
+            self.updated[entity] = (self.counts.get(entity, 0), self.points.get(entity, 0))
+        self.counts[entity] += 1
+        self.points[entity] += tier_points(badge.get('tier'))
+
+        # Cache deck image URLs
+        if self.image_urls is not None and entity not in self.image_urls:
+            self.image_urls[entity] = _resolve_deck_image_url(
+                badge, entity, image_map=self.image_map
+            )
+
+    def _record(self, snapshot_date: datetime.date, entity: str, rank: int, updated: bool) -> Dict[str, Any]:
+        badges, points = self.counts[entity], self.points[entity]
+        record: Dict[str, Any] = {
+            'date': snapshot_date.isoformat(),
+            'entity': entity,
+            'badges': badges,
+            'points': points,
+            'score': _score_value(badges, points),
+            'rank': rank,
+            'updated': updated,
+        }
+        if self.image_urls is not None:
+            record['image_url'] = self.image_urls.get(entity)
+        if self.emit == 'changes':
+            record['previous_rank'] = self.last_rank.get(entity)
+        return record
+
+    def snapshot(self, snapshot_date: datetime.date) -> None:
+        """Re-rank the entities added since the last snapshot and emit rows."""
+        updated, self.updated = self.updated, {}
+        if not self.counts:
+            return
+        counts, points, ranking, key_to_entity = self.counts, self.points, self.ranking, self.key_to_entity
+
+        # Every insert/remove lands inside [lo, hi), so ranks outside that
+        # window can't have moved.
+        lo, hi = len(ranking), 0
+        for entity, (old_badges, old_points) in updated.items():
+            if old_badges:
+                old_key = _rank_key(entity, old_badges, old_points)
+                index = bisect.bisect_left(ranking, old_key)
+                del ranking[index]
+                del key_to_entity[old_key]
+                lo, hi = min(lo, index), max(hi, index + 1)
+            else:
+                hi = len(ranking) + 1  # a newcomer shifts everyone below it
+            new_key = _rank_key(entity, counts[entity], points[entity])
+            index = bisect.bisect_left(ranking, new_key)
+            ranking.insert(index, new_key)
+            key_to_entity[new_key] = entity
+            lo = min(lo, index)
+            hi = max(hi, index + 1)
+        hi = min(hi, len(ranking))
+
+        records = self.records
+        if self.emit == 'all':
+            for rank, key in enumerate(ranking, start=1):
+                entity = key_to_entity[key]
+                records.append(self._record(snapshot_date, entity, rank, entity in updated))
+        elif self.emit == 'updated':
+            for entity in sorted(updated, key=lambda e: _rank_key(e, counts[e], points[e])):
+                rank = bisect.bisect_left(ranking, _rank_key(entity, counts[entity], points[entity])) + 1
+                records.append(self._record(snapshot_date, entity, rank, True))
+        else:
+            for rank, key in enumerate(ranking[lo:hi], start=lo + 1):
+                entity = key_to_entity[key]
+                is_updated = entity in updated
+                if is_updated or self.last_rank.get(entity) != rank:
+                    records.append(self._record(snapshot_date, entity, rank, is_updated))
+                    self.last_rank[entity] = rank
+
+
+def _timelines(
+    badges: Iterable[Dict[str, Any]],
+    group_bys: Sequence[str],
     *,
     image_map: Optional[Dict[str, str]] = None,
-) -> List[Dict[str, Any]]:
-    """Generate timeline records with cumulative badge counts and rankings."""
-    records: List[Dict[str, Any]] = []
-    counts: Dict[str, int] = defaultdict(int)
-    points: Dict[str, int] = defaultdict(int)
-    
-    sorted_badges = sorted(
-        badges,
-        key=lambda b: (b['date'], _badge_entity(b, group_by) or ''),
-    )
-    
-    deck_image_urls: Optional[Dict[str, Optional[str]]] = (
-        {} if group_by == 'deck' else None
-    )
+    emit: str = 'all',
+    granularity: str = 'day',
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Build timeline records for several dimensions in one sorted pass.
+
+    One snapshot is taken per ``granularity`` period that has badges, dated
+    at the period's last day (``day`` keeps one per distinct badge date).
+
+    ``emit`` picks which rows each snapshot produces:
+      * ``all``     -- every entity seen so far (a full snapshot per date);
+      * ``updated`` -- only entities that earned badges that date;
+      * ``changes`` -- entities that earned badges or whose rank moved, with
+        their ``previous_rank`` (None when new).
+    """
+    timelines = [_Timeline(g, image_map=image_map, emit=emit) for g in group_bys]
 
-    for badge_date, date_group in groupby(sorted_badges, key=lambda b: b['date']):
-        updated_entities: set[str] = set()
-        
-        # Process all badges for this date
+    def snapshot_date(badge):
+        return period_end(badge['date'], granularity)
+
+    for badge_date, date_group in groupby(sorted(badges, key=lambda b: b['date']), key=snapshot_date):
         for badge in date_group:
-            entity = _badge_entity(badge, group_by)
-            if not entity:
-                continue
-            counts[entity] += 1
-            points[entity] += tier_points(badge.get('tier'))
-            updated_entities.add(entity)
-
-            # Cache deck image URLs
-            if deck_image_urls is not None and entity not in deck_image_urls:
-                deck_image_urls[entity] = _resolve_deck_image_url(
-                    badge, entity, image_map=image_map
-                )
-
-        if not counts:
-            continue
+            for timeline in timelines:
+                timeline.add(badge)
+        for timeline in timelines:
+            timeline.snapshot(badge_date)
 
-        # Rank entities by badges (desc), points (desc), then name (asc)
-        ranking = sorted(
-            counts,
-            key=lambda entity: (-counts[entity], -points[entity], str(entity).lower()),
-        )
+    return {timeline.group_by: timeline.records for timeline in timelines}
 
-        # Create record for each entity
-        for rank, entity in enumerate(ranking, start=1):
-            record: Dict[str, Any] = {
-                'date': badge_date.isoformat(),
-                'entity': entity,
-                'badges': counts[entity],
-                'points': points[entity],
-                'score': _score_value(counts[entity], points[entity]),
-                'rank': rank,
-                'updated': entity in updated_entities,
-            }
-            if deck_image_urls is not None:
-                record['image_url'] = deck_image_urls.get(entity)
-            records.append(record)
 
-    return records
+def _timeline_rows(
+    badges: Iterable[Dict[str, Any]],
+    group_by: str,
+    *,
+    image_map: Optional[Dict[str, str]] = None,
+    emit: str = 'all',
+    granularity: str = 'day',
+) -> List[Dict[str, Any]]:
+    """Generate timeline records with cumulative badge counts and rankings."""
+    return _timelines(
+        badges, [group_by], image_map=image_map, emit=emit, granularity=granularity,
+    )[group_by]
 
 
 def _cumulative_table(
-    records: List[Dict[str, Any]],
+    records: Iterable[Dict[str, Any]],
     *,
     value_field: str = 'score',
     group_by: str,
     image_map: Optional[Dict[str, str]] = None,
-) -> Tuple[List[Dict[str, Any]], List[str]]:
+    dates: Optional[Iterable[str]] = None,
+) -> Tuple[Iterable[Dict[str, Any]], List[str]]:
     """Pivot long-form timeline records into cumulative entity rows (wide format).
 
+    Records only need to cover the dates an entity changed: each entity's
+    values are kept as a sparse, date-ordered series and forward-filled across
+    every date column as its row is produced. ``dates`` adds columns for dates
+    with no records of their own.
+
     Returns:
-        Tuple of (rows, fieldnames) where each row represents an entity with 
-        their values across all dates.
+        Tuple of (rows, fieldnames). ``rows`` is a generator yielding one
+        entity at a time, so the dense table is never held in memory.
     """
-    if not records:
-        base_fields = ['entity']
-        if group_by == 'deck' or image_map:
-            base_fields.append('image_url')
-        return [], base_fields
-
     include_image_urls = group_by == 'deck' or bool(image_map)
-    seen_entities: List[str] = []
-    seen_dates: List[str] = []
-    data_by_entity: Dict[str, Dict[str, Any]] = {}
+    fieldnames: List[str] = ['entity']
+    if include_image_urls:
+        fieldnames.append('image_url')
+
+    date_set = set(dates or ())
+    series: Dict[str, List[Tuple[str, Any]]] = {}  # entity -> [(date, value)], first-seen order
     image_urls: Dict[str, Optional[str]] = {}
+    in_order = True
 
-    # Collect all entities, dates, and values
     for record in records:
         entity = str(record['entity'])
         date = str(record['date'])
-        
-        if entity not in seen_entities:
-            seen_entities.append(entity)
-        if date not in seen_dates:
-            seen_dates.append(date)
-        
-        if entity not in data_by_entity:
-            data_by_entity[entity] = {}
-        
+        date_set.add(date)
         # Get value from specified field, fallback to badges
-        data_by_entity[entity][date] = record.get(value_field, record.get('badges', 0))
-        
-        # Cache image URLs
-        if include_image_urls and entity not in image_urls:
-            image_value = record.get('image_url')
-            if not image_value and image_map:
-                image_value = image_map.get(entity)
-            image_urls[entity] = image_value
-
-    # Sort dates chronologically
-    seen_dates.sort()
-    
-    # Build fieldnames
-    fieldnames: List[str] = ['entity']
-    if include_image_urls:
-        fieldnames.append('image_url')
-    fieldnames.extend(seen_dates)
-    
-    # Build rows: one per entity with cumulative values
-    rows: List[Dict[str, Any]] = []
-    for entity in seen_entities:
-        row: Dict[str, Any] = {'entity': entity}
-        
-        if include_image_urls:
-            row['image_url'] = image_urls.get(entity, '')
-        
-        # Forward-fill values across dates
-        last_value: Any = 0
-        for date in seen_dates:
-            if date in data_by_entity[entity]:
-                last_value = data_by_entity[entity][date]
-            row[date] = last_value
-        
-        rows.append(row)
-
-    return rows, fieldnames
+        value = record.get(value_field, record.get('badges', 0))
+
+        points = series.get(entity)
+        if points is None:
+            points = series[entity] = []
+            # Cache image URLs
+            if include_image_urls:
+                image_value = record.get('image_url')
+                if not image_value and image_map:
+                    image_value = image_map.get(entity)
+                image_urls[entity] = image_value
+        if points and points[-1][0] == date:
+            points[-1] = (date, value)
+            continue
+        if points and points[-1][0] > date:
+            in_order = False
+        points.append((date, value))
+
+    if not series:
+        return [], fieldnames
+
+    columns = sorted(date_set)
+    fieldnames.extend(columns)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        for entity, points in series.items():
+            if not in_order:
+                points = sorted(dict(points).items())
+            row: Dict[str, Any] = {'entity': entity}
+            if include_image_urls:
+                row['image_url'] = image_urls.get(entity, '')
+            # Forward-fill values across dates
+            last_value: Any = 0
+            i = 0
+            for date in columns:
+                if i < len(points) and points[i][0] == date:
+                    last_value = points[i][1]
+                    i += 1
+                row[date] = last_value
+            yield row
+
+    return rows(), fieldnames
 
 
 def _resolve_date_filters(
@@ -312,19 +429,33 @@ def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         '-i', '--input',
         type=Path,
-        default=_default_input_path(),
-        help='Source JSONL file (defaults to TH_BL_FILE or example data).',
+        help=('Source JSONL file (defaults to TH_BL_FILE or example data). Events-mode '
+              'season files are expanded into their badges.'),
     )
     parser.add_argument(
         '--group-by',
-        choices=GROUP_BY_CHOICES,
-        default='trainer',
-        help='Group badges by trainer or deck (default: trainer).',
+        type=_parse_group_by,
+        default=['trainer'],
+        help=('Group badges by trainer, deck or store (default: trainer). Pass several, '
+              'comma-separated, to export each in one pass: OUTPUT gains a -<dimension> suffix.'),
     )
     parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Threads for writing multiple group-by outputs.',
+    )
+    seasons = parser.add_mutually_exclusive_group()
+    seasons.add_argument(
         '--season',
         type=int,
-        help='Limit results to a season year (e.g. 2024 for July 2023-June 2024).',
+        help=('Limit results to a season year (e.g. 2024 for July 2023-June 2024). '
+              'Without --input, reads that season\'s configured data file.'),
+    )
+    seasons.add_argument(
+        '--all-seasons',
+        action='store_true',
+        help='Read every configured season\'s data file (badges and events); not with --input.',
     )
     parser.add_argument(
         '--start-date',
@@ -341,17 +472,59 @@ def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         action='store_true',
         help='Pivot output into cumulative date columns (wide format).',
     )
+    parser.add_argument(
+        '--granularity',
+        choices=GRANULARITIES,
+        default='day',
+        help='Take one snapshot per day (default), week, month or quarter, dated at its end.',
+    )
+    parser.add_argument(
+        '--emit',
+        choices=EMIT_CHOICES,
+        default='all',
+        help=('Rows per date: every entity (all, default), only entities that '
+              'earned badges (updated), or those plus any whose rank moved (changes).'),
+    )
     parser.add_argument(
         '--image-map',
         type=Path,
         help='Optional JSON file mapping entities to image URLs.',
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    if args.input is not None and args.all_seasons:
+        parser.error('argument --all-seasons: not allowed with argument -i/--input')
+    return args
 
 
-def load_badges(path: Path) -> List[Dict[str, Any]]:
-    """Load badge data from JSONL file."""
-    return read_data_from_file(str(path))
+def load_badges(
+    path: Path,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> Iterable[Dict[str, Any]]:
+    """Stream badge data from a JSONL file, optionally limited to ``[start, end)``.
+
+    A file backing an events-mode season is expanded into the badges derived
+    from its standings.
+    """
+    records = iter_records(str(path), start=start, end=end)
+    mode = util.seasons.mode_for_file(str(path))
+    if mode == 'badges':
+        return records
+    badges, _ = util.normalize.normalize_records(records, mode)
+    return badges
+
+
+def _source_badges(
+    args: argparse.Namespace,
+    start: Optional[datetime.date],
+    end: Optional[datetime.date],
+) -> Iterable[Dict[str, Any]]:
+    """Badges for the CLI: an explicit --input file, else the season config."""
+    if args.input is None and getattr(args, 'all_seasons', False):
+        return util.seasons.read_badges(util.seasons.OVERALL)
+    if args.input is None and args.season:
+        return util.seasons.read_badges(args.season)
+    return load_badges(args.input or _default_input_path(), start, end)
 
 
 def _load_image_map(path: Optional[Path]) -> Dict[str, str]:
@@ -393,57 +566,113 @@ def _load_image_map(path: Optional[Path]) -> Dict[str, str]:
     return image_map
 
 
-def export_time_series(
+def export_timelines(
     args: argparse.Namespace
-) -> Tuple[List[Dict[str, Any]], List[str]]:
-    """Generate time series data from badges based on CLI arguments.
-    
+) -> Dict[str, Tuple[Iterable[Dict[str, Any]], List[str]]]:
+    """Generate time series data for every requested group-by dimension.
+
+    Badges are loaded, filtered and sorted once; all dimensions are ranked in
+    the same pass.
+
     Returns:
-        Tuple of (rows, fieldnames) for CSV output.
+        Mapping of dimension -> (rows, fieldnames) for CSV output. Cumulative
+        rows are produced lazily; pass them straight to :func:`write_csv`.
     """
-    badges = load_badges(args.input)
+    group_bys = _group_bys(args)
+    start, end = _resolve_date_filters(args)
+    badges = _filter_badges(_source_badges(args, start, end), start=start, end=end)
     image_map = _load_image_map(getattr(args, 'image_map', None))
-    
-    # Define base fieldnames for non-cumulative output
-    base_fieldnames: List[str] = ['date', 'entity']
-    if args.group_by == 'deck' or image_map:
-        base_fieldnames.append('image_url')
-    base_fieldnames.extend(['badges', 'points', 'score', 'rank', 'updated'])
-    
+    emit = getattr(args, 'emit', 'all')
+    granularity = getattr(args, 'granularity', 'day')
+
+    def fieldnames_for(group_by: str) -> List[str]:
+        if args.cumulative:
+            return ['entity', 'image_url'] if group_by == 'deck' or image_map else ['entity']
+        # Define base fieldnames for non-cumulative output
+        base_fieldnames: List[str] = ['date', 'entity']
+        if group_by == 'deck' or image_map:
+            base_fieldnames.append('image_url')
+        base_fieldnames.extend(['badges', 'points', 'score', 'rank', 'updated'])
+        if emit == 'changes':
+            base_fieldnames.append('previous_rank')
+        return base_fieldnames
+
     if not badges:
-        return [], (['entity', 'image_url'] if args.cumulative and (args.group_by == 'deck' or image_map) 
-                   else ['entity'] if args.cumulative 
-                   else base_fieldnames)
+        return {g: ([], fieldnames_for(g)) for g in group_bys}
+
+    if not args.cumulative:
+        timelines = _timelines(badges, group_bys, image_map=image_map, emit=emit, granularity=granularity)
+        return {g: (timelines[g], fieldnames_for(g)) for g in group_bys}
+
+    # The pivot forward-fills, so only rows that changed are needed; every
+    # badge date from the first ranked one onward still gets a column.
+    timelines = _timelines(badges, group_bys, image_map=image_map, emit='updated', granularity=granularity)
+    dates = {period_end(b['date'], granularity).isoformat() for b in badges}
+    outputs = {}
+    for group_by in group_bys:
+        records = timelines[group_by]
+        first = records[0]['date'] if records else None
+        outputs[group_by] = _cumulative_table(
+            records,
+            group_by=group_by,
+            image_map=image_map,
+            dates=[d for d in dates if d >= first] if first else None,
+        )
+    return outputs
 
-    # Filter and process badges
-    start, end = _resolve_date_filters(args)
-    filtered = _filter_badges(badges, start=start, end=end)
-    records = _timeline_rows(filtered, args.group_by, image_map=image_map)
-    
-    if args.cumulative:
-        return _cumulative_table(records, group_by=args.group_by, image_map=image_map)
-    
-    return records, base_fieldnames
+
+def export_time_series(
+    args: argparse.Namespace
+) -> Tuple[Iterable[Dict[str, Any]], List[str]]:
+    """Generate time series data for the first requested group-by dimension.
+
+    Returns:
+        Tuple of (rows, fieldnames) for CSV output.
+    """
+    return export_timelines(args)[_group_bys(args)[0]]
+
+
+def output_path(path: Path, group_by: str, multiple: bool) -> Path:
+    """Return where a dimension's CSV goes: ``path`` itself, or ``<stem>-<group_by>`` for multi exports."""
+    if not multiple:
+        return path
+    return path.with_name(f'{path.stem}-{group_by}{path.suffix}')
 
 
 def write_csv(
-    rows: List[Dict[str, Any]],
+    rows: Iterable[Dict[str, Any]],
     path: Path,
     fieldnames: Sequence[str]
-) -> None:
-    """Write rows to CSV file with specified fieldnames."""
+) -> int:
+    """Write rows to CSV file with specified fieldnames, one at a time.
+
+    Returns the number of rows written.
+    """
+    count = 0
     with path.open('w', newline='', encoding='utf-8') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(rows)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
 
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     """Main entry point."""
     args = parse_arguments(argv)
-    rows, fieldnames = export_time_series(args)
-    write_csv(rows, args.output, fieldnames)
-    print(f"Exported {len(rows)} rows to {args.output}")
+    outputs = export_timelines(args)
+    jobs = [
+        (rows, output_path(args.output, group_by, len(outputs) > 1), fieldnames)
+        for group_by, (rows, fieldnames) in outputs.items()
+    ]
+    if args.workers > 1 and len(jobs) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+            counts = list(pool.map(lambda job: write_csv(*job), jobs))
+    else:
+        counts = [write_csv(*job) for job in jobs]
+    for (_, path, _), count in zip(jobs, counts):
+        print(f"Exported {count} rows to {path}")
 
 
 if __name__ == '__main__':
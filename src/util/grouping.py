@@ -19,6 +19,24 @@ def group_badges(
     return grouped
 
 
+def index_positions(
+    badges: Sequence[Badge],
+    key_getter: Callable[[Badge], GroupKey],
+) -> Dict[GroupKey, List[int]]:
+    """Map each group key to the positions of its badges, skipping empty keys.
+
+    Positions preserve the input order, so slicing a key's list pages through
+    that group without re-filtering the whole sequence.
+    """
+    positions: Dict[GroupKey, List[int]] = defaultdict(list)
+    for i, badge in enumerate(badges):
+        key = key_getter(badge)
+        if not key:
+            continue
+        positions[key].append(i)
+    return positions
+
+
 def sort_group_items(
     groups: Dict[GroupKey, Sequence[Badge]],
     *,
@@ -3,12 +3,15 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import json
 from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from util.badges import TIER_WEIGHTS, season_bounds, tier_points
-from util.data import FILENAME as DEFAULT_DATA_FILE, read_data_from_file
+import util.normalize
+import util.seasons
+from util.badges import season_bounds, tier_points
+from util.data import FILENAME as DEFAULT_DATA_FILE, iter_records
 
 TIER_ORDER = ['locals', 'online', 'league challenge', 'league cup', 'regionals', 'internationals', 'worlds']
 TIER_ABBREV = {
@@ -41,12 +44,11 @@ def _badge_date(badge: Dict[str, Any]) -> Optional[datetime.date]:
 
 
 def _filter_badges(
-    badges: List[Dict[str, Any]],
+    badges: Iterable[Dict[str, Any]],
     *,
     start: Optional[datetime.date] = None,
     end: Optional[datetime.date] = None,
-) -> List[Dict[str, Any]]:
-    out = []
+) -> Iterator[Dict[str, Any]]:
     for b in badges:
         d = _badge_date(b)
         if not d:
@@ -55,8 +57,7 @@ def _filter_badges(
             continue
         if end and d >= end:
             continue
-        out.append({**b, 'date': d})
-    return out
+        yield {**b, 'date': d}
 
 
 def _bar(count: int, total: int, width: int = 20) -> str:
@@ -70,141 +71,171 @@ def _sep(width: int = 58) -> str:
     return '  ' + '─' * width
 
 
-def run_insights(badges: List[Dict[str, Any]], title: str) -> None:
-    if not badges:
-        print("No badges found.")
-        return
-
-    dates = [b['date'] for b in badges if b.get('date')]
-    min_date = min(dates)
-    max_date = max(dates)
+def aggregate(badges: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute every insight in a single pass over dated badges.
+
+    Returns a plain, JSON-friendly structure (dates as ``datetime.date``)::
+
+        total, min_date, max_date, trainers, stores  -- headline numbers
+        formats / tiers          -- {name: count}
+        local / premier          -- badge counts by tier class
+        monthly                  -- {'YYYY-MM': {tier: count}}
+        store_popularity         -- [{store, total, local, premier, top_tier}],
+                                    most badges first, ties by name
+        day_of_week              -- {'local': [Mon..Sun], 'premier': [Mon..Sun]}
+
+    Pure: nothing is printed, so callers can cache or serialize the result.
+    """
+    total = 0
+    min_date: Optional[datetime.date] = None
+    max_date: Optional[datetime.date] = None
+    trainers = set()
+    stores = set()
+    formats: Counter = Counter()
+    tiers: Counter = Counter()
+    monthly: Dict[str, Counter] = defaultdict(Counter)
+    store_total: Counter = Counter()
+    store_local: Counter = Counter()
+    store_tiers: Dict[str, Counter] = defaultdict(Counter)
+    dow = {'local': [0] * 7, 'premier': [0] * 7}
 
-    trainers = {b.get('trainer') for b in badges if b.get('trainer')}
-    stores = {b.get('store') for b in badges if b.get('store')}
-    formats = Counter(str(b.get('format', 'unknown')).lower() for b in badges)
-    tiers = Counter(str(b.get('tier', 'unknown')).lower() for b in badges)
+    for b in badges:
+        d = b.get('date')
+        tier = str(b.get('tier', 'unknown')).lower()
+        local = _is_local(tier)
+        store = b.get('store')
+        total += 1
+        if d:
+            min_date = d if min_date is None or d < min_date else min_date
+            max_date = d if max_date is None or d > max_date else max_date
+            monthly[d.strftime('%Y-%m')][tier] += 1
+            dow['local' if local else 'premier'][d.weekday()] += 1
+        if b.get('trainer'):
+            trainers.add(b['trainer'])
+        if store:
+            stores.add(store)
+        formats[str(b.get('format', 'unknown')).lower()] += 1
+        tiers[tier] += 1
+        store_key = store or '(unknown)'
+        store_total[store_key] += 1
+        store_local[store_key] += local
+        store_tiers[store_key][tier] += 1
 
-    total = len(badges)
     local_count = sum(c for t, c in tiers.items() if _is_local(t))
-    premier_count = total - local_count
+    store_popularity = []
+    for store, count in sorted(store_total.items(), key=lambda item: (-item[1], item[0])):
+        tier_counts = store_tiers[store]
+        store_popularity.append({
+            'store': store,
+            'total': count,
+            'local': store_local[store],
+            'premier': count - store_local[store],
+            # Break ties by name so output doesn't depend on input order.
+            'top_tier': min(tier_counts, key=lambda t: (-tier_counts[t], t)),
+        })
+
+    return {
+        'total': total,
+        'min_date': min_date,
+        'max_date': max_date,
+        'trainers': len(trainers),
+        'stores': len(stores),
+        'formats': dict(sorted(formats.items())),
+        'tiers': dict(tiers),
+        'local': local_count,
+        'premier': total - local_count,
+        'monthly': {month: dict(monthly[month]) for month in sorted(monthly)},
+        'store_popularity': store_popularity,
+        'day_of_week': dow,
+    }
+
+
+def render_text(result: Dict[str, Any], title: str) -> str:
+    """Format an :func:`aggregate` result as the terminal report."""
+    if not result['total']:
+        return 'No badges found.'
+
+    total = result['total']
+    tiers = result['tiers']
+    lines: List[str] = []
+    out = lines.append
 
     # ── Header ──────────────────────────────────────────────────────────────
-    print()
-    print('━' * 62)
-    print(f'  {title}')
-    print('━' * 62)
-    print(f'  Badges:   {total:<6}  Date range: {min_date} → {max_date}')
-    print(f'  Trainers: {len(trainers):<6}  Stores:     {len(stores)}')
-    fmt_str = '  '.join(f'{fmt.title()} {cnt}' for fmt, cnt in sorted(formats.items()))
-    print(f'  Formats:  {fmt_str}')
+    out('')
+    out('━' * 62)
+    out(f'  {title}')
+    out('━' * 62)
+    out(f"  Badges:   {total:<6}  Date range: {result['min_date']} → {result['max_date']}")
+    out(f"  Trainers: {result['trainers']:<6}  Stores:     {result['stores']}")
+    fmt_str = '  '.join(f'{fmt.title()} {cnt}' for fmt, cnt in result['formats'].items())
+    out(f'  Formats:  {fmt_str}')
 
     # ── Tier breakdown ───────────────────────────────────────────────────────
-    print()
-    print('  TIER BREAKDOWN')
-    print(_sep())
+    out('')
+    out('  TIER BREAKDOWN')
+    out(_sep())
     for tier in TIER_ORDER:
         count = tiers.get(tier, 0)
-        pct = count / total * 100 if total else 0
+        pct = count / total * 100
         bar = _bar(count, total, 18)
         tag = '  [local]' if _is_local(tier) else ''
-        print(f'  {tier:<22} {count:>4}  ({pct:5.1f}%)  {bar}{tag}')
+        out(f'  {tier:<22} {count:>4}  ({pct:5.1f}%)  {bar}{tag}')
     unknown_tiers = {t for t in tiers if t not in TIER_ORDER}
     if unknown_tiers:
         unk_count = sum(tiers[t] for t in unknown_tiers)
-        print(f'  {"(other)":<22} {unk_count:>4}')
-    print()
-    lp = local_count / total * 100 if total else 0
-    pp = premier_count / total * 100 if total else 0
-    print(f'  Local  (<3 pts):   {local_count:>4}  ({lp:.1f}%)')
-    print(f'  Premier (3+ pts):  {premier_count:>4}  ({pp:.1f}%)')
+        out(f'  {"(other)":<22} {unk_count:>4}')
+    out('')
+    out(f"  Local  (<3 pts):   {result['local']:>4}  ({result['local'] / total * 100:.1f}%)")
+    out(f"  Premier (3+ pts):  {result['premier']:>4}  ({result['premier'] / total * 100:.1f}%)")
 
     # ── Tier activity by month ───────────────────────────────────────────────
-    monthly: Dict[str, Counter] = defaultdict(Counter)
-    for b in badges:
-        d = b['date']
-        if not d:
-            continue
-        key = d.strftime('%Y-%m')
-        tier = str(b.get('tier', 'unknown')).lower()
-        monthly[key][tier] += 1
-
-    print()
-    print('  TIER ACTIVITY BY MONTH')
-    print(_sep(62))
+    out('')
+    out('  TIER ACTIVITY BY MONTH')
+    out(_sep(62))
     abbrevs = [TIER_ABBREV[t] for t in TIER_ORDER]
     header_row = f"  {'Month':<9}" + ''.join(f'{a:>7}' for a in abbrevs) + f"{'Total':>7}"
-    print(header_row)
-    print(_sep(len(header_row) - 2))
-    for month in sorted(monthly):
-        counts = monthly[month]
-        month_total = sum(counts.values())
+    out(header_row)
+    out(_sep(len(header_row) - 2))
+    for month, counts in result['monthly'].items():
         row = f"  {month:<9}"
         for tier in TIER_ORDER:
             c = counts.get(tier, 0)
             row += f'{c:>7}' if c else '      ·'
-        row += f'{month_total:>7}'
-        print(row)
+        row += f'{sum(counts.values()):>7}'
+        out(row)
 
     # ── Store popularity ─────────────────────────────────────────────────────
-    store_total: Counter = Counter()
-    store_local: Counter = Counter()
-    store_premier: Counter = Counter()
-    store_tiers: Dict[str, Counter] = defaultdict(Counter)
-
-    for b in badges:
-        store = b.get('store') or '(unknown)'
-        tier = str(b.get('tier', 'unknown')).lower()
-        store_total[store] += 1
-        if _is_local(tier):
-            store_local[store] += 1
-        else:
-            store_premier[store] += 1
-        store_tiers[store][tier] += 1
-
-    print()
-    print('  STORE POPULARITY  (top 20)')
-    name_col = min(max((len(s) for s in store_total), default=10), 35)
-    print(_sep(name_col + 40))
-    print(f"  {'Store':<{name_col}}  {'Total':>5}  {'Local':>5}  {'Premier':>7}  Top tier")
-    print(_sep(name_col + 40))
-    for store, count in store_total.most_common(20):
-        top_tier = store_tiers[store].most_common(1)[0][0] if store_tiers[store] else '—'
-        local = store_local.get(store, 0)
-        premier = store_premier.get(store, 0)
-        print(f"  {store[:name_col]:<{name_col}}  {count:>5}  {local:>5}  {premier:>7}  {top_tier}")
+    top_stores = result['store_popularity'][:20]
+    out('')
+    out('  STORE POPULARITY  (top 20)')
+    name_col = min(max((len(s['store']) for s in result['store_popularity']), default=10), 35)
+    out(_sep(name_col + 40))
+    out(f"  {'Store':<{name_col}}  {'Total':>5}  {'Local':>5}  {'Premier':>7}  Top tier")
+    out(_sep(name_col + 40))
+    for s in top_stores:
+        out(f"  {s['store'][:name_col]:<{name_col}}  {s['total']:>5}  {s['local']:>5}  {s['premier']:>7}  {s['top_tier']}")
 
     # ── Day-of-week distribution ─────────────────────────────────────────────
-    dow_local: Counter = Counter()
-    dow_premier: Counter = Counter()
-    for b in badges:
-        d = b['date']
-        if not d:
-            continue
-        tier = str(b.get('tier', '')).lower()
-        if _is_local(tier):
-            dow_local[d.weekday()] += 1
-        else:
-            dow_premier[d.weekday()] += 1
-
-    print()
-    print('  DAY-OF-WEEK  (local events)')
-    print(_sep())
-    local_max = max(dow_local.values()) if dow_local else 1
-    for i, day in enumerate(DAYS):
-        count = dow_local.get(i, 0)
-        bar = _bar(count, local_max, 28)
-        print(f'  {day}  {bar}  {count}')
-
-    print()
-    print('  DAY-OF-WEEK  (premier events)')
-    print(_sep())
-    premier_max = max(dow_premier.values()) if dow_premier else 1
-    for i, day in enumerate(DAYS):
-        count = dow_premier.get(i, 0)
-        bar = _bar(count, premier_max, 28)
-        print(f'  {day}  {bar}  {count}')
-
-    print()
+    for kind in ('local', 'premier'):
+        counts = result['day_of_week'][kind]
+        peak = max(counts) or 1
+        out('')
+        out(f'  DAY-OF-WEEK  ({kind} events)')
+        out(_sep())
+        for day, count in zip(DAYS, counts):
+            out(f'  {day}  {_bar(count, peak, 28)}  {count}')
+
+    out('')
+    return '\n'.join(lines)
+
+
+def render_json(result: Dict[str, Any]) -> str:
+    """Serialize an :func:`aggregate` result (dates as ISO strings)."""
+    return json.dumps(result, indent=2, default=str, ensure_ascii=False)
+
+
+def run_insights(badges: Iterable[Dict[str, Any]], title: str) -> None:
+    print(render_text(aggregate(badges), title))
 
 
 def _default_input_path() -> Path:
@@ -221,6 +252,25 @@ def _parse_date(value: str) -> datetime.date:
         raise argparse.ArgumentTypeError(f'invalid date: {value}') from exc
 
 
+def _source_badges(
+    args: argparse.Namespace,
+    start: Optional[datetime.date],
+    end: Optional[datetime.date],
+) -> Iterable[Dict[str, Any]]:
+    """Badges for the CLI: an explicit input file, else the season config."""
+    if args.input is None and args.all_seasons:
+        return util.seasons.read_badges(util.seasons.OVERALL)
+    if args.input is None and args.season:
+        return util.seasons.read_badges(args.season)
+    path = str(args.input or _default_input_path())
+    records = iter_records(path, start=start, end=end)
+    mode = util.seasons.mode_for_file(path)
+    if mode == 'badges':
+        return records
+    badges, _ = util.normalize.normalize_records(records, mode)
+    return badges
+
+
 def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Print seasonal insights from badge JSONL data.',
@@ -229,13 +279,20 @@ def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         'input',
         nargs='?',
         type=Path,
-        default=_default_input_path(),
-        help='Source JSONL file (defaults to TH_BL_FILE or example data).',
+        help=('Source JSONL file (defaults to TH_BL_FILE or example data). Events-mode '
+              'season files are expanded into their badges.'),
     )
-    parser.add_argument(
+    seasons = parser.add_mutually_exclusive_group()
+    seasons.add_argument(
         '--season',
         type=int,
-        help='Limit to a season year (e.g. 2025 = Jul 2024–Jun 2025).',
+        help=('Limit to a season year (e.g. 2025 = Jul 2024–Jun 2025). Without an '
+              'input file, reads that season\'s configured data file.'),
+    )
+    seasons.add_argument(
+        '--all-seasons',
+        action='store_true',
+        help='Read every configured season\'s data file (badges and events); not with an input file.',
     )
     parser.add_argument(
         '--start-date',
@@ -247,12 +304,20 @@ def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         type=_parse_date,
         help='Filter badges before this date (YYYY-MM-DD).',
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
+    parser.add_argument(
+        '--format',
+        choices=('text', 'json'),
+        default='text',
+        help='Output a terminal report (default) or the raw aggregates as JSON.',
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    if args.input is not None and args.all_seasons:
+        parser.error('argument --all-seasons: not allowed with argument input')
+    return args
 
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     args = parse_arguments(argv)
-    badges = read_data_from_file(str(args.input))
 
     start: Optional[datetime.date] = args.start_date
     end: Optional[datetime.date] = args.end_date
@@ -262,7 +327,7 @@ def main(argv: Optional[Iterable[str]] = None) -> None:
         start = max(start, season_start) if start else season_start
         end = min(end, season_end) if end else season_end
 
-    filtered = _filter_badges(badges, start=start, end=end)
+    filtered = _filter_badges(_source_badges(args, start, end), start=start, end=end)
 
     if args.season:
         title = f'INSIGHTS — Season {args.season}  ({start} → {end})'
@@ -270,10 +335,16 @@ def main(argv: Optional[Iterable[str]] = None) -> None:
         s = str(start) if start else '…'
         e = str(end) if end else '…'
         title = f'INSIGHTS — {s} → {e}'
+    elif args.all_seasons:
+        title = 'INSIGHTS — All seasons'
     else:
-        title = f'INSIGHTS — All time  ({args.input.name})'
+        title = f'INSIGHTS — All time  ({(args.input or _default_input_path()).name})'
 
-    run_insights(filtered, title)
+    result = aggregate(filtered)
+    if args.format == 'json':
+        print(render_json({'title': title, **result}))
+    else:
+        print(render_text(result, title))
 
 
 if __name__ == '__main__':
@@ -5,6 +5,8 @@ from __future__ import annotations
 from collections import Counter, defaultdict
 from typing import Dict, List, Sequence, Tuple
 
+import util.timing
+
 # Single source of truth for tier point values (used as a tie breaker when
 # players have the same number of badges). Re-exported for existing importers.
 from util.badges import TIER_WEIGHTS
@@ -23,6 +25,7 @@ def badge_points(badge: dict) -> int:
     return TIER_WEIGHTS.get(tier, 0)
 
 
+@util.timing.timed('aggregate')
 def weighted_leaderboard(badges: Sequence[dict], key: str) -> List[Tuple[str, int, int]]:
     """Return leaderboard tuples sorted by badge count and tie-broken by points."""
     counts: Counter[str] = Counter()
@@ -35,8 +38,18 @@ def weighted_leaderboard(badges: Sequence[dict], key: str) -> List[Tuple[str, in
         counts[value] += 1
         weights[value] += badge_points(badge)
 
+    return leaderboard_from_counts(counts, weights)
+
+
+@util.timing.timed('aggregate')
+def leaderboard_from_counts(counts: Dict[str, int], weights: Dict[str, int]) -> List[Tuple[str, int, int]]:
+    """Return leaderboard tuples from precomputed per-value badge counts and points.
+
+    Same ordering as :func:`weighted_leaderboard`; used when counts come from
+    pre-aggregated buckets rather than a badge list.
+    """
     leaderboard = [
-        (value, counts[value], weights[value])
+        (value, counts[value], weights.get(value, 0))
         for value in counts
     ]
 
@@ -80,6 +93,7 @@ def deck_diversity_score(badges: Sequence[dict]) -> Dict[str, float]:
     return {t: len(decks[t]) ** 2 / counts[t] for t in counts}
 
 
+@util.timing.timed('aggregate')
 def trainer_extras(badges: Sequence[dict]) -> Dict[str, Tuple[float, float]]:
     """Return per-trainer (avg_pts_per_badge, deck_diversity_score) in one pass."""
     counts, points, decks = _collect_trainer_stats(badges)
@@ -91,5 +105,6 @@ def trainer_extras(badges: Sequence[dict]) -> Dict[str, Tuple[float, float]]:
 
 __all__ = [
     'TIER_WEIGHTS', 'normalize_value', 'badge_points', 'weighted_leaderboard',
+    'leaderboard_from_counts',
     'avg_points_per_badge', 'deck_diversity_score', 'trainer_extras',
 ]
@@ -0,0 +1,513 @@
+"""Drive the real app over HTTP and report latency per endpoint.
+
+For each ``--workers`` count this starts gunicorn locally with the production
+config (``gunicorn.conf.py``, gevent workers) on a free port. It then has
+``--concurrency`` simulated visitors send a weighted mix of requests for
+``--duration`` seconds:
+
+    dash-layout  GET /_dash-layout (every page load)
+    page         a page layout via Dash's pages callback, random page/scope
+    quarter      home quarter tab switch (render_quarter)
+    month        home month tab switch (render_month)
+    player       players page selection (render_player_badges)
+    gallery      badge gallery month expand (load_month_badges)
+    admin-write  an admin saving a badge (appends to the badge file)
+
+Callback ids and keys come from ``/_dash-dependencies``, as in the browser.
+Parameters (quarters, months, trainers) are sampled from the local data.
+Results are p50/p95/p99 latency, error count and throughput per request
+kind; compare worker counts to size ``gunicorn.conf.py``.
+
+``admin-write`` is off by default. It needs a scratch ``TH_BL_DATA_DIR``
+(see ``util.synthetic``), since it appends badges. The harness creates a
+throwaway admin account for the spawned server. Discord posting is always
+disabled for the spawned server. Before any write, the harness imports the app
+with the server's exact environment and checks the effective data dir,
+webhook and admin accounts. They're passed in ``TH_BL_ENV_OVERRIDES``, which
+app.py applies after ``.env``::
+
+    TH_BL_DATA_DIR=/tmp/scale TH_BL_FILE=badges.jsonl PYTHONPATH=src python -m util.loadtest \\
+        --workers 1,2,4 --concurrency 32 --duration 30 --mix page=30,quarter=15,admin-write=2
+
+``--url`` targets an already-running server instead (``--admin USER:PASS``
+for writes there).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+import util.buckets
+import util.data
+import util.seasons
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = {
+    'dash-layout': 10, 'page': 30, 'quarter': 15, 'month': 15, 'player': 15, 'gallery': 15,
+    'admin-write': 0,
+}
+PAGES = ['/', '/badges', '/players', '/decks', '/leaderboard', '/locations', '/rules']
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# Run in a child with the server's environment and working directory: reports
+# what the app actually ends up with once app.py has loaded .env.
+_PROBE = '''
+import json, app, util.data, util.discord
+print(json.dumps({
+    "data_dir": util.data.DATA_DIR,
+    "badge_file": util.data.FILENAME,
+    "webhook": bool(util.discord._WEBHOOK_URL),
+    "admins": sorted(app.load_admins()),
+}))
+'''
+
+
+def _server_env(admin: Optional[Tuple[str, str]]) -> Dict[str, str]:
+    # app.py lets .env override the environment, so pass everything that
+    # matters through TH_BL_ENV_OVERRIDES, which it applies after .env.
+    overrides = {'FLASK_ENV': 'production', 'TH_BL_DISCORD_WEBHOOK': ''}
+    if admin:
+        from util.passwords import hash_password
+        overrides.update(
+            TH_BL_DATA_DIR=util.data.DATA_DIR,
+            TH_BL_FILE=os.path.basename(util.data.FILENAME),
+            TH_BL_USERS=json.dumps({admin[0]: hash_password(admin[1])}),
+            TH_BL_USER='',
+            TH_BL_PASSWORD_HASH='',
+        )
+    return dict(os.environ, **overrides, TH_BL_ENV_OVERRIDES=json.dumps(overrides))
+
+
+def confirm_sandbox(env: Dict[str, str], admin: Tuple[str, str]) -> None:
+    """Refuse to write unless the app, started with ``env``, uses only the scratch setup."""
+    proc = subprocess.run(
+        [sys.executable, '-c', _PROBE], cwd=_SRC_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    try:
+        effective = json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        raise SystemExit(f'Could not inspect the app configuration:\n{proc.stderr[-2000:]}')
+    problems = []
+    scratch = os.path.realpath(util.data.DATA_DIR)
+    if os.path.realpath(effective['data_dir'] or '.') != scratch:
+        problems.append(f"data dir is {effective['data_dir']!r}, not {util.data.DATA_DIR!r}")
+    elif os.path.dirname(os.path.realpath(effective['badge_file'])) != scratch:
+        problems.append(f"badge file {effective['badge_file']!r} is outside {util.data.DATA_DIR!r}")
+    if effective['webhook']:
+        problems.append('a Discord webhook is configured')
+    if effective['admins'] != [admin[0]]:
+        problems.append(f"admin accounts are {effective['admins']}, not only {admin[0]!r}")
+    if problems:
+        raise SystemExit('Refusing admin writes: ' + '; '.join(problems))
+
+
+@contextlib.contextmanager
+def spawn_server(workers: int, admin: Optional[Tuple[str, str]] = None):
+    """Run gunicorn with the production config and ``workers`` workers; yields its URL.
+
+    With ``admin``, the server gets that throwaway account and the scratch
+    data dir, and :func:`confirm_sandbox` must pass before it starts.
+    """
+    port = _free_port()
+    env = _server_env(admin)
+    if admin:
+        confirm_sandbox(env, admin)
+    log = tempfile.NamedTemporaryFile(prefix='th-bl-loadtest-', suffix='.log', delete=False)
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:server',
+         '-k', 'gevent', '-w', str(workers), '-b', f'127.0.0.1:{port}'],
+        cwd=_SRC_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit(f'gunicorn exited with {proc.returncode}; see {log.name}')
+            try:
+                if requests.get(f'{url}/health', timeout=2).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f'gunicorn did not come up; see {log.name}')
+            time.sleep(0.5)
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+
+
+# ---------------------------------------------------------------------------
+# Requests
+# ---------------------------------------------------------------------------
+def _id_key(component_id) -> str:
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+    return component_id
+
+
+def _callback(output: str, outputs: Any, inputs: List[Tuple[Any, str, Any]],
+              state: Optional[List[Tuple[Any, str, Any]]] = None) -> dict:
+    return {
+        'output': output,
+        'outputs': outputs,
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in state or []],
+        'changedPropIds': [f'{_id_key(i)}.{p}' for i, p, _ in inputs],
+    }
+
+
+class Scenario:
+    """Builds randomized requests from the app's callback graph and local data."""
+
+    def __init__(self, dependencies: List[dict], rng: random.Random):
+        self.rng = rng
+        self.outputs = {d['output']: d for d in dependencies}
+        self.scopes: List[Any] = [util.seasons.OVERALL] + util.seasons.available_seasons()
+        self.quarters: List[Tuple[int, datetime.date]] = []
+        self.months: List[datetime.date] = []
+        self.gallery: List[Tuple[Any, datetime.date]] = []
+        self.trainers: Dict[Any, List[str]] = {}
+        for scope in self.scopes:
+            badges = util.seasons.read_badges(scope)
+            months = {b['date'].replace(day=1) for b in badges if b.get('date')}
+            self.gallery.extend((scope, m) for m in months)
+            counts = Counter(b.get('trainer') for b in badges if b.get('trainer'))
+            self.trainers[scope] = [t for t, _ in counts.most_common(200)]
+            if not util.seasons.is_overall(scope):
+                season_months = [m for m, b in util.buckets.month_buckets(scope).items() if m and b.get('total')]
+                self.months.extend(season_months)
+                self.quarters.extend({(scope, util.buckets.quarter_start(m)) for m in season_months})
+
+    def supports(self, kind: str) -> bool:
+        """Whether the local data has anything to request for ``kind``."""
+        if kind == 'quarter':
+            return bool(self.quarters)
+        if kind == 'month':
+            return bool(self.months)
+        if kind == 'gallery':
+            return bool(self.gallery)
+        return kind in DEFAULT_MIX
+
+    def _find(self, predicate: Callable[[str], bool]) -> str:
+        for key in self.outputs:
+            if predicate(key):
+                return key
+        raise SystemExit('Callback not found in /_dash-dependencies; is this the badge leaderboard app?')
+
+    def build(self, kind: str) -> Tuple[str, str, Optional[dict]]:
+        """Return ``(method, path, json_body)`` for one request of ``kind``."""
+        rng = self.rng
+        if kind == 'dash-layout':
+            return 'GET', '/_dash-layout', None
+        if kind == 'page':
+            key = self._find(lambda k: '_pages_content.children' in k)
+            path, scope = rng.choice(PAGES), rng.choice(self.scopes)
+            return 'POST', '/_dash-update-component', _callback(
+                key,
+                [{'id': '_pages_content', 'property': 'children'}, {'id': '_pages_store', 'property': 'data'}],
+                [('_pages_location', 'pathname', path), ('_pages_location', 'search', f'?season={scope}')],
+            )
+        if kind == 'quarter':
+            season, quarter = rng.choice(self.quarters)
+            return 'POST', '/_dash-update-component', _callback(
+                '{"index":["MATCH"],"type":"quarter-content"}.children',
+                {'id': {'type': 'quarter-content', 'index': season}, 'property': 'children'},
+                [({'type': 'quarter-tabs', 'index': season}, 'active_tab', quarter.isoformat())],
+            )
+        if kind == 'month':
+            month = rng.choice(self.months)
+            tabs = util.buckets.quarter_start(month).isoformat()
+            return 'POST', '/_dash-update-component', _callback(
+                '{"index":["MATCH"],"type":"home-month-content"}.children',
+                {'id': {'type': 'home-month-content', 'index': tabs}, 'property': 'children'},
+                [({'type': 'month-tabs', 'index': tabs}, 'active_tab', month.isoformat())],
+            )
+        if kind == 'player':
+            scope = rng.choice(self.scopes)
+            trainers = self.trainers.get(scope) or ['Nobody']
+            # Popular players get looked up more: favor the top of the list.
+            trainer = trainers[min(len(trainers) - 1, int(rng.expovariate(1 / 20)))]
+            return 'POST', '/_dash-update-component', _callback(
+                'player-badges.children',
+                {'id': 'player-badges', 'property': 'children'},
+                [('player-dropdown', 'value', trainer)],
+                [('players-season', 'data', scope)],
+            )
+        if kind == 'gallery':
+            scope, month = rng.choice(self.gallery)
+            index = month.isoformat()
+            return 'POST', '/_dash-update-component', _callback(
+                '{"index":["MATCH"],"type":"month-content"}.children',
+                {'id': {'type': 'month-content', 'index': index}, 'property': 'children'},
+                [({'type': 'month-collapse', 'index': index}, 'is_open', True)],
+                [
+                    ({'type': 'month-content', 'index': index}, 'children', None),
+                    ({'type': 'month-collapse', 'index': index}, 'id', {'type': 'month-collapse', 'index': index}),
+                    ('badges-season', 'data', scope),
+                ],
+            )
+        if kind == 'admin-write':
+            return 'POST', '/_dash-update-component', self._admin_write()
+        raise ValueError(f'Unknown request kind {kind!r}')
+
+    def _admin_write(self) -> dict:
+        key = self._find(lambda k: k.startswith('_pages_location.pathname@') and any(
+            i.get('id') == 'admin-save' for i in self.outputs[k]['inputs']))
+        rng = self.rng
+        trainer = rng.choice(self.trainers.get(util.seasons.OVERALL) or ['Load Tester'])
+        values = {
+            'admin-inputs-trainer': trainer,
+            'admin-inputs-pronoun': 'their',
+            'admin-inputs-deck': 'loadtest',
+            'admin-inputs-store': 'Load Test Store',
+            'admin-inputs-date': datetime.date.today().isoformat(),
+            'admin-inputs-deck-store': {'loadtest': {'id': 'loadtest', 'name': 'Load Test', 'icons': []}},
+            'admin-inputs-color': '#ffffff',
+            'admin-inputs-background': 'Colorless',
+            'admin-inputs-tier': 'locals',
+            'admin-inputs-format': 'standard',
+            'admin-inputs-discord-id': None,
+            'admin-edit-index': None,
+        }
+        state = []
+        for entry in self.outputs[key]['state']:
+            component_id = entry['id']
+            if component_id.startswith('{'):
+                component_id = json.loads(component_id)
+                name = component_id.get('aio_id')
+            else:
+                name = component_id
+            state.append((component_id, entry['property'], values.get(name)))
+        return _callback(
+            key, {'id': '_pages_location', 'property': 'pathname'},
+            [('admin-save', 'n_clicks', 1)], state,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+def _visitor(url: str, scenario: Scenario, kinds: List[str], weights: List[float], deadline: float,
+             warmup_until: float, samples: Dict[str, List[float]], errors: Counter,
+             lock: threading.Lock, admin: Optional[Tuple[str, str]]) -> None:
+    session = requests.Session()
+    if admin:
+        # Same as a browser admin: load a protected page so dash_auth puts the
+        # user's groups in the session, then every request carries the credentials.
+        session.auth = admin
+        session.get(f'{url}/admin', timeout=30)
+    rng = random.Random(scenario.rng.random())
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        kind = rng.choices(kinds, weights)[0]
+        with lock:
+            method, path, body = scenario.build(kind)
+        started = time.perf_counter()
+        try:
+            resp = session.request(method, url + path, json=body, timeout=60)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if now < warmup_until:
+            continue
+        with lock:
+            samples[kind].append(elapsed)
+            if not ok:
+                errors[kind] += 1
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+def run_load(url: str, scenario: Scenario, mix: Dict[str, float], concurrency: int, duration: float,
+             warmup: float = 5.0, admin: Optional[Tuple[str, str]] = None) -> Dict[str, Dict[str, float]]:
+    """Run the mix against ``url``; returns per-kind stats plus a ``total`` row.
+
+    Kinds the local data can't exercise (e.g. no season months for ``month``)
+    are dropped from the mix rather than measured as something else.
+    """
+    kinds = [k for k, w in mix.items() if w > 0]
+    skipped = [k for k in kinds if not scenario.supports(k)]
+    if skipped:
+        print(f'Skipping {", ".join(skipped)}: no matching data', file=sys.stderr)
+        kinds = [k for k in kinds if k not in skipped]
+    if not kinds:
+        raise SystemExit('Nothing to request: every kind in --mix was skipped')
+    weights = [mix[k] for k in kinds]
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    start = time.monotonic()
+    warmup_until = start + warmup
+    deadline = warmup_until + duration
+    threads = [
+        threading.Thread(
+            target=_visitor,
+            args=(url, scenario, kinds, weights, deadline, warmup_until, samples, errors, lock, admin),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = {}
+    everything: List[float] = []
+    for kind in kinds:
+        values = sorted(samples[kind])
+        everything.extend(values)
+        stats[kind] = _stats(values, errors[kind], duration)
+    stats['total'] = _stats(sorted(everything), sum(errors.values()), duration)
+    return stats
+
+
+def _stats(values: List[float], errors: int, duration: float) -> Dict[str, float]:
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'rps': len(values) / duration if duration else 0.0,
+        'p50_ms': _percentile(values, 50) * 1000,
+        'p95_ms': _percentile(values, 95) * 1000,
+        'p99_ms': _percentile(values, 99) * 1000,
+        'max_ms': (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def render_text(results: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    lines = []
+    for label, stats in results.items():
+        lines.append(label)
+        lines.append(f'  {"kind":<12} {"reqs":>7} {"errs":>5} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+        for kind, s in stats.items():
+            lines.append(
+                f'  {kind:<12} {s["requests"]:>7} {s["errors"]:>5} {s["rps"]:>8.1f} {s["p50_ms"]:>9.1f}'
+                f' {s["p95_ms"]:>9.1f} {s["p99_ms"]:>9.1f} {s["max_ms"]:>9.1f}'
+            )
+        lines.append('')
+    return '\n'.join(lines)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = dict(DEFAULT_MIX)
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f'Unknown request kind {kind!r}; choose from {", ".join(DEFAULT_MIX)}')
+        try:
+            mix[kind] = float(weight)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(f'Invalid weight in {part!r}') from exc
+    return mix
+
+
+def _parse_workers(value: str) -> List[int]:
+    try:
+        workers = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f'Invalid worker counts {value!r}') from exc
+    if not workers or any(w <= 0 for w in workers):
+        raise argparse.ArgumentTypeError('Worker counts must be positive integers')
+    return workers
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Load-test the app locally and report latency percentiles.')
+    parser.add_argument('--url', help='Test an already-running server instead of spawning gunicorn.')
+    parser.add_argument(
+        '--workers', type=_parse_workers, default=[2],
+        help='Comma-separated gunicorn worker counts to compare (default: 2).',
+    )
+    parser.add_argument('--concurrency', type=int, default=16, help='Simultaneous visitors (default: 16).')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per run (default: 30).')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds first (default: 5).')
+    parser.add_argument(
+        '--mix', type=_parse_mix, default=dict(DEFAULT_MIX),
+        help='Request weights, e.g. page=30,quarter=15,admin-write=2 (unlisted kinds keep defaults).',
+    )
+    parser.add_argument('--admin', help='USER:PASSWORD for admin writes against --url.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix.')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format.')
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_arguments(argv)
+    admin = None
+    if args.mix.get('admin-write'):
+        if args.url:
+            if not args.admin or ':' not in args.admin:
+                raise SystemExit('admin-write against --url needs --admin USER:PASSWORD')
+            admin = tuple(args.admin.split(':', 1))
+        elif not util.data.DATA_DIR:
+            # Writes append to the badge file; keep them off the checked-in data.
+            raise SystemExit('admin-write needs a scratch TH_BL_DATA_DIR (see util.synthetic)')
+        else:
+            admin = ('loadtest', secrets.token_urlsafe(16))
+
+    rng = random.Random(args.seed)
+    results = {}
+    targets = [(args.url, None)] if args.url else [(None, w) for w in args.workers]
+    for url, workers in targets:
+        with (contextlib.nullcontext(url) if url else spawn_server(workers, admin)) as base:
+            dependencies = requests.get(f'{base}/_dash-dependencies', timeout=60).json()
+            scenario = Scenario(dependencies, rng)
+            label = base if url else f'{workers} worker{"s" if workers != 1 else ""}'
+            label += f', {args.concurrency} concurrent, {args.duration:g}s'
+            results[label] = run_load(
+                base, scenario, args.mix, args.concurrency, args.duration, args.warmup, admin,
+            )
+
+    if args.format == 'json':
+        print(json.dumps(results, indent=2))
+    else:
+        print(render_text(results))
+
+
+if __name__ == '__main__':
+    main()
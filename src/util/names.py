@@ -14,10 +14,11 @@ Admin pages intentionally keep full names -- only call these from public views.
 """
 from __future__ import annotations
 
-import functools
 from collections import defaultdict
+from typing import Dict, Iterable
 
 import util.seasons
+import util.timing
 
 
 def abbreviate(full_name) -> str:
@@ -28,8 +29,8 @@ def abbreviate(full_name) -> str:
     return f'{parts[0]} {parts[1][0].upper()}.'
 
 
-@functools.lru_cache(maxsize=64)
-def _display_map(names: frozenset) -> dict:
+@util.timing.timed('names')
+def _display_map(names) -> dict:
     """Map each full name to a unique abbreviation, indexing collisions."""
     groups: defaultdict = defaultdict(list)
     for name in names:
@@ -50,8 +51,38 @@ def _all_trainer_names() -> frozenset:
     return frozenset(names)
 
 
+_MAP_CACHE: dict = {}
+
+
+def display_map() -> dict:
+    """Return the full-name -> public-name map, rebuilt only when data changes.
+
+    Keyed on the all-time data version, so a page render does one stat per
+    data file instead of re-reading every season per name.
+    """
+    version = util.seasons.data_version()
+    if _MAP_CACHE.get('version') == version:
+        return _MAP_CACHE['map']
+    mapping = _display_map(_all_trainer_names())
+    _MAP_CACHE.update(version=version, map=mapping)
+    return mapping
+
+
 def public_name(full_name) -> str:
     """Return the public display name for a trainer (abbreviated, deduped)."""
     if not full_name:
         return full_name
-    return _display_map(_all_trainer_names()).get(full_name, abbreviate(full_name))
+    return display_map().get(full_name, abbreviate(full_name))
+
+
+@util.timing.timed('names')
+def public_names(full_names: Iterable) -> Dict[str, str]:
+    """Return ``{full_name: public_name}`` for many trainers with one map lookup.
+
+    Prefer this over :func:`public_name` in loops (leaderboard rows, standings).
+    """
+    mapping = display_map()
+    return {
+        name: mapping.get(name, abbreviate(name)) if name else name
+        for name in full_names
+    }
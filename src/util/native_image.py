@@ -0,0 +1,353 @@
+"""Chromium-free badge image renderer (Pillow).
+
+Draws the same card as ``util.discord_image._build_badge_html`` -- colored
+card, tiled energy background rotated -30 degrees, trainer, deck sprites and
+name, store, date, tier/format pills -- directly with Pillow. No browser
+process, tens of milliseconds per badge, and safe to run across threads.
+
+Select it with ``TH_BL_BADGE_RENDERER=native`` (see ``util.discord_image``).
+
+The energy SVGs are single evenodd paths of absolute ``M``/``L``/``C``
+commands, which :func:`_svg_polygons` flattens into polygons so Pillow can
+fill them; no SVG library needed.
+"""
+import concurrent.futures
+import functools
+import io
+import logging
+import os
+import re
+
+import th_helpers.utils.colors
+from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageFont
+
+import util.sprites
+
+logger = logging.getLogger(__name__)
+
+_ASSETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets')
+
+# Geometry mirrors the HTML card at html { font-size: 32px } in an 816px viewport.
+WIDTH = 816
+BORDER = 1                # .card border
+PADDING = 32              # .card-body padding: 1rem
+CONTENT_WIDTH = WIDTH - 2 * (BORDER + PADDING)
+RADIUS = 12               # .card border-radius: .375rem
+H4_SIZE = 43              # h4: calc(1.275rem + .3vw)
+H4_LINE = 52              # line-height 1.2
+BODY_SIZE = 32
+BODY_LINE = 48            # line-height 1.5
+MARGIN = 16               # h4 / .mb-2 margin-bottom: .5rem
+PILL_SIZE = 24            # .badge: .75em
+SPRITE_HEIGHT = 90
+SPRITE_GAP = 8            # deck name .ms-1
+TILE = (216, 144)         # .gym-badge-bg background-size
+TILE_FILL = (255, 255, 255, 0x22)
+PILL_COLOR = (108, 117, 125)  # bg-secondary
+
+_FONT_CANDIDATES = {
+    'regular': ['DejaVuSans.ttf', 'LiberationSans-Regular.ttf', 'Arial.ttf'],
+    'bold': ['DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf', 'Arial Bold.ttf'],
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _font(size, weight='regular'):
+    path = os.getenv('TH_BL_BADGE_FONT_BOLD' if weight == 'bold' else 'TH_BL_BADGE_FONT')
+    for candidate in ([path] if path else []) + _FONT_CANDIDATES[weight]:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+# ---------------------------------------------------------------------------
+# Energy backgrounds
+# ---------------------------------------------------------------------------
+_TOKEN = re.compile(r'[MLC]|-?\d*\.?\d+')
+
+
+def _cubic(p0, p1, p2, p3, steps=12):
+    points = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        points.append((
+            u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+            u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1],
+        ))
+    return points
+
+
+def _svg_polygons(svg_text):
+    """Flatten an energy SVG into ``(viewbox, [polygon, ...])``."""
+    viewbox = [float(v) for v in re.search(r'viewBox="([^"]+)"', svg_text).group(1).split()]
+    path = re.search(r' d="([^"]+)"', svg_text).group(1)
+    tokens = _TOKEN.findall(path)
+    polygons, current, command, pos, i = [], [], None, (0.0, 0.0), 0
+    while i < len(tokens):
+        if tokens[i] in 'MLC':
+            command = tokens[i]
+            i += 1
+            continue
+        if command == 'M':
+            if current:
+                polygons.append(current)
+            pos = (float(tokens[i]), float(tokens[i + 1]))
+            current = [pos]
+            command = 'L'  # extra pairs after M are implicit line-tos
+            i += 2
+        elif command == 'L':
+            pos = (float(tokens[i]), float(tokens[i + 1]))
+            current.append(pos)
+            i += 2
+        elif command == 'C':
+            c = [float(t) for t in tokens[i:i + 6]]
+            current.extend(_cubic(pos, (c[0], c[1]), (c[2], c[3]), (c[4], c[5])))
+            pos = (c[4], c[5])
+            i += 6
+        else:
+            i += 1
+    if current:
+        polygons.append(current)
+    return viewbox, polygons
+
+
+@functools.lru_cache(maxsize=16)
+def _energy_tile(background):
+    """One background tile: the energy symbol fit (meet) and centered in ``TILE``."""
+    svg_path = os.path.join(_ASSETS_DIR, 'energy_types', f'{background.lower()}.svg')
+    try:
+        with open(svg_path, 'r') as f:
+            viewbox, polygons = _svg_polygons(f.read())
+    except (OSError, AttributeError):
+        return None
+    min_x, min_y, vb_w, vb_h = viewbox
+    scale = min(TILE[0] / vb_w, TILE[1] / vb_h)
+    off_x = (TILE[0] - vb_w * scale) / 2
+    off_y = (TILE[1] - vb_h * scale) / 2
+    mask = Image.new('1', TILE, 0)
+    for polygon in polygons:
+        if len(polygon) < 3:
+            continue
+        layer = Image.new('1', TILE, 0)
+        ImageDraw.Draw(layer).polygon(
+            [((x - min_x) * scale + off_x, (y - min_y) * scale + off_y) for x, y in polygon],
+            fill=1,
+        )
+        mask = ImageChops.logical_xor(mask, layer)  # evenodd fill
+    tile = Image.new('RGBA', TILE, (0, 0, 0, 0))
+    tile.paste(Image.new('RGBA', TILE, TILE_FILL), (0, 0), mask)
+    return tile
+
+
+def _spaced(extent, tile):
+    """Tile offsets for ``background-repeat: space``: whole tiles, the outer ones at the edges."""
+    count = max(1, int(extent // tile))
+    if count == 1:
+        return [(extent - tile) / 2]
+    step = tile + (extent - count * tile) / (count - 1)
+    return [i * step for i in range(count)]
+
+
+@functools.lru_cache(maxsize=16)  # ~1.5 MB each; cards mostly share a few heights
+def _background_layer(background, size):
+    """Lay out ``.gym-badge-bg`` as the browser does, rotate it -30deg and crop to ``size``.
+
+    The element is 150% x 250% of the card's padding box, offset by -40% / -25%,
+    and rotates about its own center.
+    """
+    tile = _energy_tile(background) if background else None
+    if tile is None:
+        return None
+    width, height = size
+    inner_w, inner_h = width - 2 * BORDER, height - 2 * BORDER
+    field_w, field_h = round(inner_w * 1.5), round(inner_h * 2.5)
+    field = Image.new('RGBA', (field_w, field_h), (0, 0, 0, 0))
+    for y in _spaced(field_h, TILE[1]):
+        for x in _spaced(field_w, TILE[0]):
+            field.alpha_composite(tile, (round(x), round(y)))
+    field = field.rotate(30, resample=Image.BICUBIC, expand=True)  # counter-clockwise == CSS -30deg
+    center_x = BORDER - inner_w * 0.4 + field_w / 2
+    center_y = BORDER - inner_h * 0.25 + field_h / 2
+    left = round(field.width / 2 - center_x)
+    top = round(field.height / 2 - center_y)
+    return field.crop((left, top, left + width, top + height))
+
+
+# ---------------------------------------------------------------------------
+# Card layout
+# ---------------------------------------------------------------------------
+def _text_size(draw, text, font):
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right - left, bottom - top
+
+
+def _width(draw, seg):
+    return seg.width if isinstance(seg, Image.Image) else draw.textlength(seg[0], font=seg[1])
+
+
+def _wrap(draw, segments, width):
+    """Break ``(text, font)`` segments into rows at spaces, the way the browser wraps a centered div."""
+    rows, row, used = [], [], 0
+    for text, font in segments:
+        for word in re.findall(r'\S+\s*|\s+', text):
+            word_width = draw.textlength(word.rstrip(), font=font)
+            if row and used + word_width > width:
+                rows.append(row)
+                row, used = [], 0
+            row.append((word, font))
+            used += draw.textlength(word, font=font)
+    rows.append(row)
+    # Trailing spaces at a line break take no room.
+    return [[*r[:-1], (r[-1][0].rstrip(), r[-1][1])] if r else r for r in rows]
+
+
+def _block(rows, line_height, margin=0):
+    """Rows of ``(text, font)`` / ``Image`` segments, each at least ``line_height`` tall."""
+    heights = [
+        max([line_height] + [seg.height for seg in row if isinstance(seg, Image.Image)])
+        for row in rows
+    ]
+    return {'rows': rows, 'heights': heights, 'margin': margin}
+
+
+def _sprites(deck):
+    images = []
+    for icon in (deck or {}).get('icons') or []:
+        data = util.sprites.sprite_png(icon)
+        if not data:
+            continue
+        try:
+            sprite = Image.open(io.BytesIO(data)).convert('RGBA')
+        except Exception:
+            continue
+        ratio = SPRITE_HEIGHT / sprite.height
+        images.append(sprite.resize((max(1, round(sprite.width * ratio)), SPRITE_HEIGHT)))
+    return images
+
+
+def render_badge(badge):
+    """Render a badge card to PNG bytes."""
+    color = badge.get('color') or '#ffffff'
+    try:
+        fill = ImageColor.getrgb(color)[:3]
+    except ValueError:
+        fill, color = (255, 255, 255), '#ffffff'
+    text_fill = ImageColor.getrgb(th_helpers.utils.colors.text_color_for_background(color))
+
+    # Bootstrap headings are weight 500; with only regular and bold
+    # available the browser draws them regular.
+    h4 = _font(H4_SIZE)
+    body = _font(BODY_SIZE)
+    strong = _font(BODY_SIZE, 'bold')
+    pill = _font(PILL_SIZE, 'bold')
+
+    deck = badge.get('deck') or {}
+    date = badge.get('date', '')
+    if hasattr(date, 'isoformat'):
+        date = date.isoformat()
+    sprites = _sprites(deck)
+    pills = [str(v) for v in (badge.get('tier'), badge.get('format')) if v]
+
+    draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    deck_row = [*sprites, (str(deck.get('name', '')), h4)]  # a flex row: never wraps
+    blocks = [
+        _block(_wrap(draw, [(str(badge.get('trainer', '')), h4)], CONTENT_WIDTH), H4_LINE, MARGIN),
+        _block(_wrap(draw, [('earned ', body), (str(badge.get('pronouns', 'their')), body)], CONTENT_WIDTH),
+               BODY_LINE, MARGIN),
+        _block([deck_row], H4_LINE, MARGIN),
+        _block(_wrap(draw, [('badge at ', body), (str(badge.get('store', '')), strong)], CONTENT_WIDTH), BODY_LINE),
+        _block(_wrap(draw, [('on ', body), (str(date), body)], CONTENT_WIDTH), BODY_LINE),
+    ]
+    height = (BORDER + PADDING) * 2 + (BODY_LINE if pills else 0) + sum(
+        sum(block['heights']) + block['margin'] for block in blocks
+    )
+
+    card = Image.new('RGBA', (WIDTH, height), fill + (255,))
+    layer = _background_layer(badge.get('background'), card.size)
+    if layer is not None:
+        card.alpha_composite(layer)
+    draw = ImageDraw.Draw(card)
+
+    y = BORDER + PADDING
+    for block in blocks:
+        for row, row_height in zip(block['rows'], block['heights']):
+            widths = [_width(draw, seg) for seg in row]
+            gaps = [SPRITE_GAP if isinstance(a, Image.Image) and not isinstance(b, Image.Image) else 0
+                    for a, b in zip(row, row[1:])] + [0]
+            x = (WIDTH - sum(widths) - sum(gaps)) / 2
+            for seg, width, gap in zip(row, widths, gaps):
+                if isinstance(seg, Image.Image):
+                    card.alpha_composite(seg, (round(x), y + (row_height - seg.height) // 2))
+                else:
+                    text, font = seg
+                    draw.text((x, y + row_height / 2), text, font=font, fill=text_fill, anchor='lm')
+                x += width + gap
+            y += row_height
+        y += block['margin']
+
+    if pills:
+        pad_x, pad_y, gap = round(PILL_SIZE * 0.65), round(PILL_SIZE * 0.35), 8
+        sizes = [round(draw.textlength(text, font=pill)) for text in pills]
+        total = sum(w + pad_x * 2 for w in sizes) + gap * (len(pills) - 1)
+        x = (WIDTH - total) // 2
+        pill_height = PILL_SIZE + pad_y * 2
+        # Pills are inline blocks on the text baseline of their line.
+        ascent, descent = body.getmetrics()
+        pill_ascent, pill_descent = pill.getmetrics()
+        baseline = (BODY_LINE - ascent - descent) / 2 + ascent
+        pill_baseline = pad_y + (PILL_SIZE - pill_ascent - pill_descent) / 2 + pill_ascent
+        top = y + round(baseline - pill_baseline)
+        for text, w in zip(pills, sizes):
+            draw.rounded_rectangle((x, top, x + w + pad_x * 2, top + pill_height), radius=RADIUS, fill=PILL_COLOR)
+            draw.text((x + pad_x, top + pill_height / 2), text, font=pill, fill=(255, 255, 255), anchor='lm')
+            x += w + pad_x * 2 + gap
+
+    # Rounded card corners with the card border.
+    mask = Image.new('L', card.size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, WIDTH - 1, height - 1), radius=RADIUS, fill=255)
+    card.putalpha(ImageChops.multiply(card.getchannel('A'), mask))
+    ImageDraw.Draw(card).rounded_rectangle(
+        (0, 0, WIDTH - 1, height - 1), radius=RADIUS, outline=(0, 0, 0, 45), width=1,
+    )
+
+    out = io.BytesIO()
+    card.save(out, format='PNG')
+    return out.getvalue()
+
+
+class NativeRenderer:
+    """Same interface as ``util.discord_image.BrowserRenderer``, no browser."""
+
+    kind = 'native'
+
+    def __init__(self, workers=4):
+        self.workers = workers
+
+    def render(self, badge):
+        """Render one badge to PNG bytes (None on failure)."""
+        try:
+            return render_badge(badge)
+        except Exception as e:
+            logger.warning('Badge render failed: %s', e)
+            return None
+
+    def render_many(self, badges):
+        """Render badges in parallel threads, in order. Failed renders are None."""
+        badges = list(badges)
+        if len(badges) <= 1:
+            return [self.render(b) for b in badges]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(self.render, badges))
+
+    def close(self):
+        pass
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    sys.stdout.buffer.write(render_badge(json.loads(sys.stdin.read())))
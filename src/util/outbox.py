@@ -0,0 +1,145 @@
+"""Durable on-disk outbox drained by a small in-process worker pool.
+
+Slow side effects (Discord announcements) shouldn't run inside a save
+callback. Callers :meth:`Outbox.put` a JSON job instead: it is written to its
+own file in the outbox directory before anything else happens, then handed to
+a bounded thread pool (greenlets under gevent). A job's file is deleted only
+after its handler returns, so a crash or restart loses nothing -- pending jobs
+are picked up again by :meth:`Outbox.start`.
+
+Several gunicorn workers can share one outbox: a worker claims a job by
+atomically renaming its file, so each job runs once. The claim's name records
+when it was taken; claims older than ``claim_timeout`` are requeued (their
+process died mid-job; pids can't tell us that, since they repeat across
+container restarts) by :meth:`Outbox.start` and then every ``sweep_interval``
+seconds by a background sweeper, so a live server picks them up too. Jobs whose handler raises are parked
+as ``*.failed`` for inspection rather than retried in a loop.
+"""
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_PENDING = '.json'
+_CLAIMED = '.claimed-'
+_FAILED = '.failed'
+
+# A claim this old is abandoned: no handler (webhook retries included) runs
+# anywhere near this long.
+CLAIM_TIMEOUT = 600
+# How often a started outbox looks for abandoned claims.
+SWEEP_INTERVAL = 60
+
+
+class Outbox:
+
+    def __init__(self, directory, handler, workers=2, claim_timeout=CLAIM_TIMEOUT,
+                 sweep_interval=SWEEP_INTERVAL):
+        self.directory = directory
+        self.handler = handler
+        self.workers = workers
+        self.claim_timeout = claim_timeout
+        self.sweep_interval = sweep_interval
+        self._executor = None
+        self._sweeper = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='outbox',
+                )
+            return self._executor
+
+    def put(self, job):
+        """Persist ``job`` (a JSON-serializable dict) and schedule it. Returns its id."""
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = f'{time.time_ns()}-{uuid.uuid4().hex}'
+        path = os.path.join(self.directory, job_id + _PENDING)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp, path)
+        self._pool().submit(self._run, job_id)
+        return job_id
+
+    def _requeue_stale(self):
+        """Return claims older than ``claim_timeout`` to pending; returns their ids."""
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        stale_before = time.time() - self.claim_timeout
+        requeued = []
+        for name in names:
+            if _CLAIMED not in name:
+                continue
+            job_id, _, claimed_at = name.partition(_CLAIMED)
+            if claimed_at.isdigit() and int(claimed_at) < stale_before:
+                try:
+                    os.replace(
+                        os.path.join(self.directory, name),
+                        os.path.join(self.directory, job_id + _PENDING),
+                    )
+                except OSError:
+                    continue  # another worker requeued (and maybe reclaimed) it
+                requeued.append(job_id)
+        return requeued
+
+    def _sweep(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                requeued = self._requeue_stale()
+            except Exception:
+                logger.exception('Outbox %s: sweeping stale claims failed', self.directory)
+                continue
+            for job_id in requeued:
+                self._pool().submit(self._run, job_id)
+            if requeued:
+                logger.warning('Outbox %s: requeued %d abandoned job(s)', self.directory, len(requeued))
+
+    def start(self):
+        """Requeue jobs left behind by a previous (or crashed) process.
+
+        Also starts the background sweeper (once) that keeps requeuing
+        abandoned claims while this process runs.
+        """
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep, name='outbox-sweeper', daemon=True)
+                self._sweeper.start()
+        self._requeue_stale()
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return 0
+        pending = [name[:-len(_PENDING)] for name in names if name.endswith(_PENDING)]
+        for job_id in pending:
+            self._pool().submit(self._run, job_id)
+        if pending:
+            logger.info('Outbox %s: resuming %d pending job(s)', self.directory, len(pending))
+        return len(pending)
+
+    def _run(self, job_id):
+        pending = os.path.join(self.directory, job_id + _PENDING)
+        claimed = os.path.join(self.directory, f'{job_id}{_CLAIMED}{int(time.time())}')
+        try:
+            os.rename(pending, claimed)
+        except OSError:
+            return  # another worker claimed (or finished) it
+        try:
+            with open(claimed, 'r') as f:
+                job = json.load(f)
+            self.handler(job)
+        except Exception:
+            logger.exception('Outbox job %s failed', job_id)
+            os.replace(claimed, os.path.join(self.directory, job_id + _FAILED))
+            return
+        os.remove(claimed)
@@ -0,0 +1,260 @@
+"""Profile every Dash page layout and the heavy callbacks without serving the app.
+
+Imports ``app`` (so every page registers), then for each scope -- the
+all-time view and every season -- measures:
+
+* each registered page's ``layout(season=...)``;
+* ``render_quarter`` / ``render_month`` (home tabs), ``load_month_badges``
+  (badge gallery) and ``render_player_badges`` (players page), for the
+  ``--samples`` most recent quarters/months and most active trainers.
+
+Callbacks go through Dash's real ``/_dash-update-component`` endpoint on a
+Flask test client, so dispatch, ``ctx.triggered_id`` and serialization are
+included exactly as a browser would trigger them.
+
+Every target is run twice: ``cold`` is the first call (derived caches
+empty), ``warm`` the second. A third run under ``tracemalloc`` gives the peak
+allocation, and ``payload`` is the size of the JSON sent to the browser.
+``--profile DIR`` adds a fourth (warm) run under cProfile and writes one
+``.prof`` per target. Open them with ``python -m pstats`` or a viewer such
+as snakeviz, or turn them into a flamegraph with flameprof. Point
+``TH_BL_DATA_DIR`` at real or synthetic (``util.synthetic``) data::
+
+    TH_BL_DATA_DIR=/tmp/scale TH_BL_FILE=badges.jsonl PYTHONPATH=src python -m util.profile_pages --samples 2
+"""
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Pin these over .env (app.py applies TH_BL_ENV_OVERRIDES after loading it):
+# the profiler is single-threaded, so skip gevent monkey patching, and it must
+# never announce anything to Discord.
+_OVERRIDES = {'FLASK_ENV': 'development', 'TH_BL_DISCORD_WEBHOOK': ''}
+os.environ.update(_OVERRIDES, TH_BL_ENV_OVERRIDES=json.dumps(_OVERRIDES))
+
+Target = Tuple[str, Callable[[], int]]
+
+
+def _layout_target(server, page: dict, scope) -> Target:
+    import dash._utils
+
+    def run() -> int:
+        with server.test_request_context(f"{page['path']}?season={scope}"):
+            return len(dash._utils.to_json(page['layout'](season=scope)))
+    return f"layout {page['path']} [{scope}]", run
+
+
+def _id_key(component_id) -> str:
+    """Dash's string form of a component id (sorted, compact JSON for dict ids)."""
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+    return component_id
+
+
+def _callback_target(client, label: str, output: Tuple[Any, str], inputs: List[Tuple[Any, str, Any]],
+                     state: Optional[List[Tuple[Any, str, Any]]] = None) -> Target:
+    """A ``/_dash-update-component`` request for one callback."""
+    output_id, output_prop = output
+
+    def pattern(component_id):
+        if isinstance(component_id, dict):
+            return _id_key({k: (['MATCH'] if k == 'index' else v) for k, v in component_id.items()})
+        return component_id
+
+    body = {
+        'output': f'{pattern(output_id)}.{output_prop}',
+        'outputs': {'id': output_id, 'property': output_prop},
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in state or []],
+        'changedPropIds': [f'{_id_key(i)}.{p}' for i, p, _ in inputs],
+    }
+
+    def run() -> int:
+        resp = client.post('/_dash-update-component', json=body)
+        if resp.status_code not in (200, 204):
+            raise RuntimeError(f'HTTP {resp.status_code}: {resp.get_data(as_text=True)[:200]}')
+        return len(resp.get_data())
+    return label, run
+
+
+def _targets(app, scopes: List[Any], samples: int) -> List[Target]:
+    import dash
+
+    import util.buckets
+    import util.seasons
+
+    server = app.server
+    client = server.test_client()
+    targets: List[Target] = []
+    for scope in scopes:
+        for page in dash.page_registry.values():
+            if callable(page.get('layout')):
+                targets.append(_layout_target(server, page, scope))
+
+        badges = util.seasons.read_badges(scope)
+        months = sorted({b['date'].replace(day=1) for b in badges if b.get('date')}, reverse=True)
+        for month in months[:samples]:
+            targets.append(_callback_target(
+                client, f'load_month_badges [{scope} {month:%Y-%m}]',
+                ({'type': 'month-content', 'index': month.isoformat()}, 'children'),
+                [({'type': 'month-collapse', 'index': month.isoformat()}, 'is_open', True)],
+                [
+                    ({'type': 'month-content', 'index': month.isoformat()}, 'children', None),
+                    ({'type': 'month-collapse', 'index': month.isoformat()}, 'id',
+                     {'type': 'month-collapse', 'index': month.isoformat()}),
+                    ('badges-season', 'data', scope),
+                ],
+            ))
+        trainers = Counter(b.get('trainer') for b in badges if b.get('trainer'))
+        for trainer, _ in trainers.most_common(samples):
+            targets.append(_callback_target(
+                client, f'render_player_badges [{scope} {trainer}]',
+                ('player-badges', 'children'),
+                [('player-dropdown', 'value', trainer)],
+                [('players-season', 'data', scope)],
+            ))
+
+        if util.seasons.is_overall(scope):
+            continue
+        buckets = util.buckets.month_buckets(scope)
+        season_months = sorted((m for m, bucket in buckets.items() if m and bucket.get('total')), reverse=True)
+        quarters = sorted({util.buckets.quarter_start(m) for m in season_months}, reverse=True)
+        for quarter in quarters[:samples]:
+            targets.append(_callback_target(
+                client, f'render_quarter [{scope} {quarter:%Y-%m}]',
+                ({'type': 'quarter-content', 'index': scope}, 'children'),
+                [({'type': 'quarter-tabs', 'index': scope}, 'active_tab', quarter.isoformat())],
+            ))
+        for month in season_months[:samples]:
+            tabs = util.buckets.quarter_start(month).isoformat()
+            targets.append(_callback_target(
+                client, f'render_month [{scope} {month:%Y-%m}]',
+                ({'type': 'home-month-content', 'index': tabs}, 'children'),
+                [({'type': 'month-tabs', 'index': tabs}, 'active_tab', month.isoformat())],
+            ))
+    return targets
+
+
+def _timed(run: Callable[[], int]) -> Tuple[float, int]:
+    started = time.perf_counter()
+    payload = run()
+    return time.perf_counter() - started, payload
+
+
+def profile_target(name: str, run: Callable[[], int], profile_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Measure one target; errors are reported in the row rather than raised."""
+    result: Dict[str, Any] = {'target': name}
+    try:
+        result['cold_ms'] = _timed(run)[0] * 1000
+        warm, payload = _timed(run)
+        result['warm_ms'] = warm * 1000
+        result['payload_kib'] = payload / 1024
+        tracemalloc.start()
+        try:
+            run()
+            result['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+        if profile_dir:
+            profiler = cProfile.Profile()
+            profiler.runcall(run)
+            filename = re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('_') + '.prof'
+            profiler.dump_stats(os.path.join(profile_dir, filename))
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    return result
+
+
+def render_text(results: List[Dict[str, Any]]) -> str:
+    width = max((len(r['target']) for r in results), default=0)
+    lines = [f'{"target".ljust(width)}  {"cold ms":>9}  {"warm ms":>9}  {"peak KiB":>10}  {"payload KiB":>11}']
+    for r in results:
+        if 'error' in r:
+            lines.append(f"{r['target'].ljust(width)}  ERROR {r['error']}")
+            continue
+        lines.append(
+            f"{r['target'].ljust(width)}  {r['cold_ms']:>9.1f}  {r['warm_ms']:>9.1f}"
+            f"  {r['peak_kib']:>10.1f}  {r['payload_kib']:>11.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def _parse_scope(value: str):
+    import util.seasons
+
+    if util.seasons.is_overall(value):
+        return util.seasons.OVERALL
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid scope {value!r}; expected a year or 'overall'") from exc
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Profile Dash page layouts and callbacks.')
+    parser.add_argument(
+        '--scope',
+        dest='scopes',
+        action='append',
+        type=_parse_scope,
+        help="Season year or 'overall'; repeatable (default: overall and every season).",
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        default=3,
+        help='Recent quarters/months and top trainers per callback and scope (default: 3).',
+    )
+    parser.add_argument(
+        '--only',
+        type=lambda value: [part for part in value.split(',') if part],
+        help='Comma-separated substrings; profile only targets whose name contains one.',
+    )
+    parser.add_argument('--profile', metavar='DIR', help='Write a cProfile .prof per target to DIR.')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format.')
+    parser.add_argument(
+        '--sort',
+        choices=['none', 'cold', 'warm', 'peak', 'payload'],
+        default='none',
+        help='Sort rows by this metric, largest first (default: run order).',
+    )
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_arguments(argv)
+    import app
+    import util.seasons
+
+    scopes = args.scopes or [util.seasons.OVERALL] + util.seasons.available_seasons()
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    results = []
+    for name, run in _targets(app.app, scopes, args.samples):
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        results.append(profile_target(name, run, args.profile))
+
+    if args.sort != 'none':
+        metric = {'cold': 'cold_ms', 'warm': 'warm_ms', 'peak': 'peak_kib', 'payload': 'payload_kib'}[args.sort]
+        results.sort(key=lambda r: r.get(metric, -1), reverse=True)
+
+    if args.format == 'json':
+        print(json.dumps(results, indent=2))
+    else:
+        print(render_text(results))
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Visual regression check of the badge renderers against reference PNGs.
+
+The references are browser (Chromium) renders of a fixed set of fixture
+badges, kept in ``docs/badge_reference/``. ``check`` renders the same
+fixtures with the native renderer and compares them pixel by pixel:
+
+* size: the card heights may differ by at most ``--max-size-delta`` px (the
+  width is fixed by both renderers);
+* pixels: the mean per-channel difference, as a fraction of full scale, must
+  stay under ``--max-diff``. Fonts and anti-aliasing never match a browser
+  exactly, so this is a tolerance, not equality.
+
+The fixtures' deck icons are fixed sprites kept in ``sprites/`` under the
+reference directory and loaded into the sprite cache before rendering, so
+both commands work offline and always draw the same icons. Re-record the
+references wherever Chromium is installed (e.g. the browser Docker image)
+when the browser card itself changes::
+
+    PYTHONPATH=src python -m util.render_check record
+    PYTHONPATH=src python -m util.render_check check --diff /tmp/badge-diff
+
+``check`` exits 1 if any fixture is over tolerance. ``--diff DIR`` writes a
+reference | render | difference strip for each fixture.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from PIL import Image, ImageChops, ImageStat
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_DIR = os.path.normpath(os.path.join(_SRC_DIR, '..', 'docs', 'badge_reference'))
+
+# Cover light/dark text, every layout branch (sprites or not, one or two
+# pills, missing background) and long text.
+FIXTURES: Dict[str, Dict[str, Any]] = {
+    'fire-two-sprites': {
+        'trainer': 'Ash Ketchum', 'pronouns': 'his',
+        'deck': {'id': 'charizard', 'name': 'Charizard ex', 'icons': ['fixture-flame', 'fixture-bird']},
+        'store': 'Area Zero TCG', 'date': '2026-03-14', 'color': '#e25822',
+        'background': 'Fire', 'tier': 'League Cup', 'format': 'standard',
+    },
+    'water-light': {
+        'trainer': 'Misty', 'pronouns': 'her',
+        'deck': {'id': 'palkia', 'name': 'Origin Forme Palkia VSTAR', 'icons': ['fixture-wave']},
+        'store': 'Cerulean Games', 'date': '2026-05-02', 'color': '#a7d8f0',
+        'background': 'Water', 'tier': 'locals', 'format': 'expanded',
+    },
+    'dark-no-sprites': {
+        'trainer': 'Someone With A Rather Long Display Name', 'pronouns': 'their',
+        'deck': {'id': 'rogue', 'name': 'Rogue', 'icons': []},
+        'store': 'The Friendly Local Game Store Downtown', 'date': '2026-08-30', 'color': '#1b1b3a',
+        'background': 'Dark', 'tier': 'League Challenge', 'format': '',
+    },
+    'plain-no-background': {
+        'trainer': 'Brock', 'pronouns': 'his',
+        'deck': {'id': 'lugia', 'name': 'Lugia VSTAR', 'icons': ['fixture-storm']},
+        'store': 'Pewter Cards', 'date': '2026-11-21', 'color': '#ffffff',
+        'background': None, 'tier': '', 'format': '',
+    },
+}
+
+
+def _reference_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f'{name}.png')
+
+
+def _load_sprites(directory: str, names: List[str]) -> None:
+    """Put the fixture sprites into the sprite cache so neither renderer downloads them."""
+    import util.sprites
+
+    for name in names:
+        for icon in FIXTURES[name]['deck']['icons']:
+            with open(os.path.join(directory, 'sprites', f'{icon}.png'), 'rb') as f:
+                util.sprites.preload(icon, f.read())
+
+
+def _flatten(png: bytes) -> Image.Image:
+    """Decode a render and flatten it onto white (both renderers leave rounded corners transparent)."""
+    image = Image.open(io.BytesIO(png)).convert('RGBA')
+    background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+    background.alpha_composite(image)
+    return background.convert('RGB')
+
+
+def compare(reference: bytes, candidate: bytes) -> Dict[str, Any]:
+    """Compare two PNG renders; returns sizes, height delta, mean difference and the diff image."""
+    ref, cand = _flatten(reference), _flatten(candidate)
+    # Compare on the reference's canvas; a taller/shorter render shows up as
+    # rows of difference as well as in ``size_delta``.
+    canvas = Image.new('RGB', ref.size, (255, 255, 255))
+    canvas.paste(cand, (0, 0))
+    diff = ImageChops.difference(ref, canvas)
+    mean = sum(ImageStat.Stat(diff).mean) / 3 / 255
+    return {
+        'reference_size': ref.size,
+        'size': cand.size,
+        'size_delta': max(abs(ref.width - cand.width), abs(ref.height - cand.height)),
+        'diff': mean,
+        'diff_image': diff,
+        'images': (ref, cand),
+    }
+
+
+def _write_strip(path: str, result: Dict[str, Any]) -> None:
+    ref, cand = result['images']
+    diff = result['diff_image']
+    height = max(ref.height, cand.height)
+    strip = Image.new('RGB', (ref.width + cand.width + diff.width, height), (255, 255, 255))
+    strip.paste(ref, (0, 0))
+    strip.paste(cand, (ref.width, 0))
+    strip.paste(diff, (ref.width + cand.width, 0))
+    strip.save(path)
+
+
+def _renderer(kind: str):
+    import util.discord_image
+
+    if kind == 'native':
+        import util.native_image
+        return util.native_image.NativeRenderer()
+    return util.discord_image.BrowserRenderer()
+
+
+def record(directory: str, names: Optional[List[str]] = None) -> List[str]:
+    """Render the fixtures with the browser renderer into ``directory``; returns the files written."""
+    names = names or list(FIXTURES)
+    _load_sprites(directory, names)
+    renderer = _renderer('browser')
+    try:
+        pngs = renderer.render_many([FIXTURES[name] for name in names])
+    finally:
+        renderer.close()
+    failed = [name for name, png in zip(names, pngs) if png is None]
+    if failed:
+        raise SystemExit(f'Browser render failed for {", ".join(failed)}; is Chromium installed?')
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, png in zip(names, pngs):
+        path = _reference_path(directory, name)
+        with open(path, 'wb') as f:
+            f.write(png)
+        written.append(path)
+    return written
+
+
+def check(directory: str, renderer: str = 'native', max_diff: float = 0.04, max_size_delta: int = 8,
+          diff_dir: Optional[str] = None, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Render the fixtures and compare each against its reference; returns one row per fixture."""
+    names = names or list(FIXTURES)
+    missing = [name for name in names if not os.path.exists(_reference_path(directory, name))]
+    if missing:
+        raise SystemExit(
+            f'No reference PNG for {", ".join(missing)} in {directory}; '
+            "record them with 'python -m util.render_check record' where Chromium is installed"
+        )
+    _load_sprites(directory, names)
+    active = _renderer(renderer)
+    try:
+        pngs = active.render_many([FIXTURES[name] for name in names])
+    finally:
+        active.close()
+    if diff_dir:
+        os.makedirs(diff_dir, exist_ok=True)
+
+    rows = []
+    for name, png in zip(names, pngs):
+        row: Dict[str, Any] = {'fixture': name}
+        if png is None:
+            row.update(ok=False, error='render failed')
+            rows.append(row)
+            continue
+        with open(_reference_path(directory, name), 'rb') as f:
+            result = compare(f.read(), png)
+        row.update(
+            size=result['size'],
+            reference_size=result['reference_size'],
+            size_delta=result['size_delta'],
+            diff=result['diff'],
+            ok=result['size_delta'] <= max_size_delta and result['diff'] <= max_diff,
+        )
+        if diff_dir:
+            _write_strip(os.path.join(diff_dir, f'{name}.png'), result)
+        rows.append(row)
+    return rows
+
+
+def render_text(rows: List[Dict[str, Any]]) -> str:
+    width = max((len(r['fixture']) for r in rows), default=0)
+    lines = [f'{"fixture".ljust(width)}  {"size":>9}  {"reference":>9}  {"diff":>6}  result']
+    for r in rows:
+        if 'error' in r:
+            lines.append(f"{r['fixture'].ljust(width)}  ERROR {r['error']}")
+            continue
+        size = '{}x{}'.format(*r['size'])
+        reference = '{}x{}'.format(*r['reference_size'])
+        lines.append(
+            f"{r['fixture'].ljust(width)}  {size:>9}  {reference:>9}  {r['diff']:>6.3f}"
+            f"  {'ok' if r['ok'] else 'FAIL'}"
+        )
+    return '\n'.join(lines)
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Compare badge renders against browser reference PNGs.')
+    parser.add_argument('--reference', default=REFERENCE_DIR, help='Reference PNG directory.')
+    parser.add_argument(
+        '--only',
+        type=lambda value: [part for part in value.split(',') if part],
+        help='Comma-separated fixture names (default: all).',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('record', help='Render the references with the browser renderer.')
+    checking = commands.add_parser('check', help='Render the fixtures and compare them to the references.')
+    checking.add_argument('--renderer', choices=['native', 'browser'], default='native')
+    checking.add_argument(
+        '--max-diff', type=float, default=0.04,
+        help='Allowed mean per-channel difference, 0-1 (default: 0.04).',
+    )
+    checking.add_argument(
+        '--max-size-delta', type=int, default=8,
+        help='Allowed difference in card width/height, px (default: 8).',
+    )
+    checking.add_argument('--diff', metavar='DIR', help='Write reference | render | difference strips to DIR.')
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    unknown = [name for name in args.only or [] if name not in FIXTURES]
+    if unknown:
+        parser.error(f'Unknown fixture(s) {", ".join(unknown)}; choose from {", ".join(FIXTURES)}')
+    return args
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_arguments(argv)
+    if args.command == 'record':
+        for path in record(args.reference, args.only):
+            print(f'Wrote {os.path.relpath(path)}')
+        return 0
+    rows = check(args.reference, args.renderer, args.max_diff, args.max_size_delta, args.diff, args.only)
+    print(render_text(rows))
+    return 0 if all(r['ok'] for r in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,6 +16,7 @@ from typing import List, Optional, Tuple
 
 import util.data
 import util.normalize
+import util.timing
 
 logger = logging.getLogger(__name__)
 
@@ -180,12 +181,56 @@ def rules_path_for(season_year: int) -> Optional[str]:
 def _read_normalized(filename: str, mode: str) -> List[dict]:
     """Read a data file and normalize its records to badge dicts."""
     records = util.data.read_data_from_file(filename)
-    badges, warnings = util.normalize.normalize_records(records, mode)
+    with util.timing.span('normalize'):
+        badges, warnings = util.normalize.normalize_records(records, mode)
     for warning in warnings:
         logger.warning('%s: %s', filename, warning)
     return badges
 
 
+def _files_for(season) -> dict:
+    """Return ``{filename: mode}`` for every data file backing a scope.
+
+    The overall view reads each distinct data file once, using that file's
+    season mode.
+    """
+    if is_overall(season):
+        files: dict = {}
+        for year in SEASONS:
+            files.setdefault(data_file_for(year), mode_for(year))
+        files.setdefault(util.data.FILENAME, 'badges')
+        return files
+    season_year = resolve_season(season)
+    return {data_file_for(season_year): mode_for(season_year)}
+
+
+def data_files(season=None) -> dict:
+    """Public ``{filename: mode}`` for a scope (every file when ``None``)."""
+    return dict(_files_for(OVERALL if season is None else season))
+
+
+def mode_for_file(filename: str) -> str:
+    """Return the mode of the season backed by ``filename`` ('badges' if none)."""
+    target = os.path.realpath(filename)
+    for path, mode in _files_for(OVERALL).items():
+        if os.path.realpath(path) == target:
+            return mode
+    return 'badges'
+
+
+def data_version(season=None) -> tuple:
+    """Return a token that changes whenever any file backing a scope changes.
+
+    Derived caches (indexes, aggregates) key on this so they rebuild exactly
+    when :func:`read_badges` would return something new.
+    """
+    return tuple(
+        (filename, util.data.file_version(filename))
+        for filename in _files_for(season)
+    )
+
+
+@util.timing.timed('sort')
 def _sort_badges(badges: List[dict]) -> List[dict]:
     """Sort badges by date descending, mirroring util.data.read_data ordering."""
     return sorted(
@@ -204,13 +249,8 @@ def read_badges(season: Optional[int] = None) -> List[dict]:
     default data file, or the whole file when the season has a dedicated one.
     """
     if is_overall(season):
-        # Read each distinct data file once, using that file's season mode.
-        files: dict = {}
-        for year in SEASONS:
-            files.setdefault(data_file_for(year), mode_for(year))
-        files.setdefault(util.data.FILENAME, 'badges')
-        badges: List[dict] = []
-        for filename, mode in files.items():
+        badges = []
+        for filename, mode in _files_for(season).items():
             badges.extend(_read_normalized(filename, mode))
         return _sort_badges(badges)
 
@@ -0,0 +1,255 @@
+"""Local cache of deck sprite PNGs for badge image rendering.
+
+Badge cards embed each deck icon as a data URI. Sprites come from GitHub, so
+without a cache every render pays a network round trip per icon (and fails
+offline). Lookups go memory -> disk -> network:
+
+* memory: an LRU of PNG bytes (and their data URI once asked for), bounded
+          by total size;
+* disk:   one PNG per URL under the data dir's ``sprite_cache/``, bounded by
+          ``TH_BL_SPRITE_CACHE_MB`` and evicted least-recently-used first.
+
+A failed download is remembered for ``_FAILURE_TTL`` seconds, so a missing
+icon (or no network) doesn't cost the request timeout on every render.
+
+Prefetch every icon our data references (so rendering works offline) with::
+
+    PYTHONPATH=src python -m util.sprites warm
+"""
+import base64
+import collections
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import util.data
+
+logger = logging.getLogger(__name__)
+
+SPRITE_URL = 'https://raw.githubusercontent.com/bradley-erickson/pokesprite/master/pokemon/regular/{}.png'
+
+if util.data.DATA_DIR:
+    _CACHE_DIR = util.data.data_path('sprite_cache')
+else:
+    _CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sprite_cache')
+_DISK_LIMIT = int(float(os.getenv('TH_BL_SPRITE_CACHE_MB', '64')) * 1024 * 1024)
+_MEMORY_LIMIT = 8 * 1024 * 1024
+_FAILURE_TTL = 300
+
+_memory = collections.OrderedDict()  # url -> [PNG bytes, data URI or None]
+_memory_bytes = 0
+_failures = {}  # url -> monotonic time the failure expires
+_disk_bytes = None  # running size of the disk tier; None until first scanned
+_lock = threading.Lock()
+
+
+def sprite_url(icon):
+    """Return the download URL for a deck icon name (or pass a URL through)."""
+    if not icon or not isinstance(icon, str):
+        return None
+    return icon if icon.startswith('https') else SPRITE_URL.format(icon)
+
+
+def _disk_path(url):
+    return os.path.join(_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + '.png')
+
+
+def _trim_memory():
+    global _memory_bytes
+    while _memory_bytes > _MEMORY_LIMIT and len(_memory) > 1:
+        _, (data, uri) = _memory.popitem(last=False)
+        _memory_bytes -= len(data) + len(uri or '')
+
+
+def _remember(url, data):
+    global _memory_bytes
+    with _lock:
+        if url in _memory:
+            _memory.move_to_end(url)
+            return
+        _memory[url] = [data, None]
+        _memory_bytes += len(data)
+        _trim_memory()
+
+
+def _remember_uri(url, uri):
+    global _memory_bytes
+    with _lock:
+        entry = _memory.get(url)
+        if entry is None or entry[1] is not None:
+            return
+        entry[1] = uri
+        _memory_bytes += len(uri)
+        _trim_memory()
+
+
+def _recall(url):
+    """Return the memory entry ``[data, uri]`` for ``url`` (don't mutate it), or None."""
+    with _lock:
+        entry = _memory.get(url)
+        if entry is not None:
+            _memory.move_to_end(url)
+        return entry
+
+
+def _read_disk(url):
+    path = _disk_path(url)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return data
+
+
+def _scan_disk():
+    """Return ``[(stat, path)]`` for every cached sprite, least recently used first."""
+    try:
+        entries = [os.path.join(_CACHE_DIR, n) for n in os.listdir(_CACHE_DIR) if n.endswith('.png')]
+        return sorted(((os.stat(p), p) for p in entries), key=lambda item: item[0].st_mtime)
+    except OSError:
+        return []
+
+
+def _evict_disk():
+    """Trim the disk tier to 90% of its budget; returns the size left."""
+    stats = _scan_disk()
+    total = sum(st.st_size for st, _ in stats)
+    target = _DISK_LIMIT * 0.9  # headroom, so a full cache doesn't rescan on every write
+    for st, path in stats:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= st.st_size
+    return total
+
+
+def _track_disk(added):
+    """Add ``added`` bytes to the running disk size; rescan and evict only past the limit.
+
+    Other workers' writes aren't counted, so the figure can lag -- the rescan
+    it triggers sees the real size.
+    """
+    global _disk_bytes
+    with _lock:
+        if _disk_bytes is None:
+            _disk_bytes = sum(st.st_size for st, _ in _scan_disk())
+        else:
+            _disk_bytes += added
+        if _disk_bytes > _DISK_LIMIT:
+            _disk_bytes = _evict_disk()
+
+
+def _write_disk(url, data):
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        path = _disk_path(url)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning('Could not cache sprite %s: %s', url, e)
+        return
+    _track_disk(len(data))
+
+
+def _fetch(url):
+    import requests
+    try:
+        resp = requests.get(url, timeout=5)
+        resp.raise_for_status()
+    except Exception:
+        return None
+    return resp.content
+
+
+def sprite_png(icon):
+    """Return the PNG bytes for a deck icon, or None if unavailable."""
+    url = sprite_url(icon)
+    if not url:
+        return None
+    entry = _recall(url)
+    if entry is not None:
+        return entry[0]
+    data = _read_disk(url)
+    if data is None:
+        if _failures.get(url, 0) > time.monotonic():
+            return None
+        data = _fetch(url)
+        if data is None:
+            _failures[url] = time.monotonic() + _FAILURE_TTL
+            return None
+        _failures.pop(url, None)
+        _write_disk(url, data)
+    _remember(url, data)
+    return data
+
+
+def preload(icon, data):
+    """Cache PNG bytes for a deck icon as if they had been downloaded."""
+    url = sprite_url(icon)
+    if not url:
+        return
+    _failures.pop(url, None)
+    _write_disk(url, data)
+    _remember(url, data)
+
+
+def sprite_data_uri(icon):
+    """Return a ``data:image/png`` URI for a deck icon, or None if unavailable."""
+    url = sprite_url(icon)
+    entry = _recall(url) if url else None
+    if entry is not None and entry[1] is not None:
+        return entry[1]
+    data = sprite_png(icon)
+    if data is None:
+        return None
+    uri = f'data:image/png;base64,{base64.b64encode(data).decode()}'
+    _remember_uri(url, uri)
+    return uri
+
+
+def deck_icons(badges):
+    """Return every distinct icon referenced by the badges' decks."""
+    icons = set()
+    for badge in badges:
+        deck = badge.get('deck')
+        if isinstance(deck, dict):
+            icons.update(i for i in deck.get('icons') or [] if isinstance(i, str) and i)
+    return icons
+
+
+def warm(badges=None):
+    """Prefetch sprites for every deck in our data. Returns ``(cached, failed)``."""
+    if badges is None:
+        import util.seasons
+        badges = util.seasons.read_badges()
+    cached = failed = 0
+    for icon in sorted(deck_icons(badges)):
+        if sprite_png(icon):
+            cached += 1
+        else:
+            failed += 1
+            logger.warning('Could not fetch sprite for %s', icon)
+    return cached, failed
+
+
+if __name__ == '__main__':
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] != ['warm']:
+        print('usage: python -m util.sprites warm', file=sys.stderr)
+        raise SystemExit(2)
+    cached, failed = warm()
+    print(f'Cached {cached} sprite(s) in {_CACHE_DIR}; {failed} failed')
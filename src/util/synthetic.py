@@ -0,0 +1,365 @@
+"""Generate realistic synthetic data files for scale testing.
+
+``example.jsonl`` is too small to expose slow paths. This writes a
+badges-mode default file and an events-mode file per events season, shaped
+like production data:
+
+* trainer activity follows a power law (a few regulars earn most badges);
+* each season has its own deck meta, with a handful of dominant decks and a
+  long tail of rogue decks;
+* stores follow a power law too, and trainers mostly play at a home store;
+* dates spread over several seasons and cluster on weekends;
+* events record the standings ``util.badges`` suggests for the field size,
+  with badges on the placements that earn them;
+* a small fraction of lines is malformed (truncated writes, blank lines,
+  non-object JSON, records missing fields).
+
+Output goes to ``TH_BL_DATA_DIR`` (or ``--out``) using the file names the app
+reads. The badges-mode file is ``TH_BL_FILE``, or ``badges.jsonl`` when that
+is unset -- never ``example.jsonl``, which would put the app in demo mode --
+so point the app straight at it::
+
+    TH_BL_DATA_DIR=/tmp/scale PYTHONPATH=src python -m util.synthetic --badges 100000 --events 10000
+    TH_BL_DATA_DIR=/tmp/scale TH_BL_FILE=badges.jsonl python src/app.py
+
+Same ``--seed``, same files.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import datetime
+import itertools
+import json
+import os
+import random
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import util.badges
+import util.data
+import util.seasons
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Badges-mode output name when TH_BL_FILE is the demo file.
+BADGE_FILE = 'badges.jsonl'
+_TEMPLATE = os.path.join(_SRC_DIR, 'example.jsonl')
+
+_FIRST_NAMES = [
+    'Ash', 'Misty', 'Brock', 'May', 'Dawn', 'Serena', 'Cynthia', 'Leon', 'Nessa', 'Raihan',
+    'Gloria', 'Hop', 'Marnie', 'Bede', 'Iris', 'Cilan', 'Lillie', 'Gladion', 'Hau', 'Kiawe',
+    'Lana', 'Mallow', 'Sophocles', 'Nemona', 'Arven', 'Penny', 'Juliana', 'Florian', 'Rika', 'Geeta',
+    'Larry', 'Hassel', 'Grusha', 'Iono', 'Kieran', 'Carmine', 'Drayton', 'Lacey', 'Crispin', 'Amarys',
+]
+_LAST_NAMES = [
+    'Ketchum', 'Waterflower', 'Harrison', 'Maple', 'Berlitz', 'Yvonne', 'Shirona', 'Dande',
+    'Rurina', 'Kibana', 'Masaru', 'Hopkins', 'Mary', 'Bead', 'Airis', 'Dent', 'Aether', 'Mohn',
+    'Kahuna', 'Wela', 'Brooklet', 'Lush', 'Volt', 'Orange', 'Violet', 'Clavell', 'Sada', 'Turo',
+    'Nemo', 'Tapu', 'Alder', 'Lance', 'Steven', 'Wallace', 'Diantha', 'Blue', 'Green', 'Silver',
+    'Gold', 'Crystal',
+]
+_PRONOUNS = (['his', 'her', 'their'], [46, 46, 8])
+_BACKGROUND_COLORS = {
+    'Grass': '#5DBB63', 'Fire': '#E25822', 'Water': '#4A90E2', 'Lightning': '#F5C518',
+    'Psychic': '#9B59B6', 'Fighting': '#C0392B', 'Dark': '#2C3E50', 'Metal': '#95A5A6',
+    'Dragon': '#4A90A4', 'Fairy': '#F4A7C7', 'Colorless': '#D5D8DC',
+}
+# Badges-mode tier mix (locals and league challenges dominate).
+_BADGE_TIERS = (
+    ['locals', 'online', 'league challenge', 'league cup', 'regionals', 'internationals', 'worlds'],
+    [45, 10, 25, 12, 6, 1.5, 0.5],
+)
+# Events-mode tiers with the field-size range each draws.
+_EVENT_TIERS = {
+    'Locals': ((6, 24), 50),
+    'League Challenge': ((8, 40), 30),
+    'League Cup': ((16, 80), 15),
+    'Regionals': ((120, 700), 5),
+}
+_FORMATS = (['standard', 'expanded'], [95, 5])
+_MALFORMED_KINDS = ('truncated', 'blank', 'non_object', 'missing_fields', 'bad_date')
+
+
+class _Weighted:
+    """Weighted sampler with precomputed cumulative weights (O(log n) draws)."""
+
+    def __init__(self, items: Sequence, weights: Iterable[float]):
+        self.items = list(items)
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def draw(self, rng: random.Random):
+        return self.items[bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+def _power_law(items: Sequence, alpha: float) -> _Weighted:
+    """Rank ``items`` in order with weight ``1 / rank ** alpha``."""
+    return _Weighted(items, (1 / rank ** alpha for rank in range(1, len(items) + 1)))
+
+
+def _trainer_names(count: int) -> List[str]:
+    names = [f'{first} {last}' for last in _LAST_NAMES for first in _FIRST_NAMES]
+    if count <= len(names):
+        return names[:count]
+    extra = (f'{name} {n}' for n in itertools.count(2) for name in names)
+    return names + list(itertools.islice(extra, count - len(names)))
+
+
+def _templates() -> List[dict]:
+    with open(_TEMPLATE, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _World:
+    """The trainers, stores and decks every generated record draws from."""
+
+    def __init__(self, rng: random.Random, trainers: int, stores: int, rogue_decks: int):
+        self.rng = rng
+        templates = _templates()
+        store_names = sorted({t['store'] for t in templates})
+        while len(store_names) < stores:
+            store_names.append(f'Card Shop {len(store_names) + 1}')
+        rng.shuffle(store_names)
+        self.stores = _power_law(store_names[:stores], 0.8)
+
+        self.decks = list({t['deck']['id']: t['deck'] for t in templates}.values())
+        icons = sorted({icon for d in self.decks for icon in d.get('icons', [])})
+        self.rogues = [
+            {'id': f'rogue_{i + 1}', 'name': f'Rogue Deck {i + 1}', 'icons': [rng.choice(icons)]}
+            for i in range(rogue_decks)
+        ]
+        self._metas: Dict[int, _Weighted] = {}
+
+        names = _trainer_names(trainers)
+        rng.shuffle(names)
+        self.trainers = _power_law(names, 0.8)
+        backgrounds = list(_BACKGROUND_COLORS)
+        self.profile = {}
+        for name in names:
+            background = rng.choice(backgrounds)
+            self.profile[name] = {
+                'pronouns': rng.choices(*_PRONOUNS)[0],
+                'background': background,
+                'color': _BACKGROUND_COLORS[background],
+                'home': self.stores.draw(rng),
+            }
+
+    def meta(self, season: int) -> _Weighted:
+        """Deck popularity for ``season``.
+
+        Established decks lead the meta in a new order each season; rogue
+        decks fill the long tail.
+        """
+        if season not in self._metas:
+            shuffler = random.Random(f'{self.rng.random()}-{season}')
+            top, tail = list(self.decks), list(self.rogues)
+            shuffler.shuffle(top)
+            shuffler.shuffle(tail)
+            self._metas[season] = _power_law(top + tail, 1.2)
+        return self._metas[season]
+
+    def deck(self, date: datetime.date) -> dict:
+        return self.meta(util.seasons.season_year_for_date(date)).draw(self.rng)
+
+    def store_for(self, trainer: str) -> str:
+        if self.rng.random() < 0.75:
+            return self.profile[trainer]['home']
+        return self.stores.draw(self.rng)
+
+    def date_between(self, start: datetime.date, end: datetime.date) -> datetime.date:
+        """A date in ``[start, end)``, with most events landing on a weekend."""
+        date = start + datetime.timedelta(days=self.rng.randrange((end - start).days))
+        if date.weekday() < 5 and self.rng.random() < 0.7:
+            shifted = date + datetime.timedelta(days=5 - date.weekday() + self.rng.randrange(2))
+            if shifted < end:
+                date = shifted
+        return date
+
+
+def _malformed(rng: random.Random, line: str) -> str:
+    kind = rng.choice(_MALFORMED_KINDS)
+    if kind == 'truncated':
+        return line[:rng.randrange(1, max(2, len(line) // 2))]
+    if kind == 'blank':
+        return ''
+    if kind == 'non_object':
+        return rng.choice(['[]', '"badge"', 'null', '42'])
+    record = json.loads(line)
+    if kind == 'missing_fields':
+        for field in ('deck', 'tier', 'trainer', 'standings'):
+            if field in record and rng.random() < 0.5:
+                del record[field]
+    else:
+        record['date'] = rng.choice(['2025-13-45', 'yesterday', ''])
+    return json.dumps(record)
+
+
+def _write(path: str, lines: Iterable[str], rng: random.Random, malformed: float) -> int:
+    count = 0
+    with open(path, 'w') as f:
+        for line in lines:
+            if malformed and rng.random() < malformed:
+                line = _malformed(rng, line)
+            f.write(line + '\n')
+            count += 1
+    return count
+
+
+def _badge_lines(world: _World, count: int, start: datetime.date, end: datetime.date) -> Iterable[str]:
+    rng = world.rng
+    for _ in range(count):
+        trainer = world.trainers.draw(rng)
+        profile = world.profile[trainer]
+        date = world.date_between(start, end)
+        yield json.dumps({
+            'trainer': trainer,
+            'pronouns': profile['pronouns'],
+            'deck': world.deck(date),
+            'store': world.store_for(trainer),
+            'date': date.isoformat(),
+            'color': profile['color'],
+            'background': profile['background'],
+            'tier': rng.choices(*_BADGE_TIERS)[0],
+            'format': rng.choices(*_FORMATS)[0],
+        })
+
+
+def _standings(world: _World, players: int, date: datetime.date) -> List[dict]:
+    rng = world.rng
+    recorded = max(1, min(players, util.badges.suggested_record_count(players)))
+    rounds = util.badges.swiss_rounds(players)
+    entrants: List[str] = []
+    seen = set()
+    while len(entrants) < recorded:
+        trainer = world.trainers.draw(rng)
+        if trainer not in seen:
+            seen.add(trainer)
+            entrants.append(trainer)
+
+    standings = []
+    for placement, trainer in enumerate(entrants, 1):
+        losses = min(rounds, 0 if placement == 1 else 1 if placement <= rounds + 1 else 2)
+        standing = {
+            'placement': placement,
+            'trainer': trainer,
+            'deck': world.deck(date),
+            'earned_badge': util.badges.earns_badge(players, placement),
+            'record': f'{rounds - losses}-{losses}',
+        }
+        if standing['earned_badge']:
+            profile = world.profile[trainer]
+            standing.update(
+                pronouns=profile['pronouns'], color=profile['color'], background=profile['background'],
+            )
+        standings.append(standing)
+    return standings
+
+
+def _event_lines(world: _World, count: int, start: datetime.date, end: datetime.date) -> Iterable[str]:
+    rng = world.rng
+    tiers = _Weighted(list(_EVENT_TIERS), (weight for _, weight in _EVENT_TIERS.values()))
+    ids = set()
+    for _ in range(count):
+        tier = tiers.draw(rng)
+        low, high = _EVENT_TIERS[tier][0]
+        players = rng.randint(low, high)
+        date = world.date_between(start, end)
+        store = world.stores.draw(rng)
+        slug = ''.join(c.lower() if c.isalnum() else '-' for c in store).strip('-')
+        event_id = f'evt_{date}_{slug}'
+        suffix = 2
+        while event_id in ids:
+            event_id, suffix = f'evt_{date}_{slug}-{suffix}', suffix + 1
+        ids.add(event_id)
+        yield json.dumps({
+            'id': event_id,
+            'store': store,
+            'date': date.isoformat(),
+            'players': players,
+            'tier': tier,
+            'format': rng.choices(*_FORMATS)[0].title(),
+            'author': 'synthetic',
+            'standings': _standings(world, players, date),
+        })
+
+
+def generate(out_dir: str, *, badges: int = 10000, events: int = 1000, seasons: int = 4,
+             trainers: Optional[int] = None, stores: Optional[int] = None,
+             malformed: float = 0.001, seed: int = 0) -> Dict[str, int]:
+    """Write synthetic data files into ``out_dir``; returns ``{path: lines}``.
+
+    ``badges`` lines go to the default badge file, spread over the ``seasons``
+    badges-mode seasons ending with the last configured one. ``events`` lines
+    are split across the events-mode seasons.
+    """
+    rng = random.Random(seed)
+    if trainers is None:
+        trainers = max(20, (badges + events * 4) // 8)
+    if stores is None:
+        stores = max(10, min(2000, trainers // 20))
+    world = _World(rng, trainers, stores, rogue_decks=max(10, trainers // 200))
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+
+    badge_years = [y for y in util.seasons.SEASONS if util.seasons.mode_for(y) == 'badges']
+    last = max(badge_years) if badge_years else util.seasons.current_season()
+    start = util.seasons.season_bounds(last - seasons + 1)[0]
+    end = util.seasons.season_bounds(last)[1]
+    path = os.path.join(out_dir, _output_name(util.data.FILENAME))
+    written[path] = _write(path, _badge_lines(world, badges, start, end), rng, malformed)
+
+    event_years = [y for y in util.seasons.SEASONS if util.seasons.mode_for(y) == 'events']
+    for i, year in enumerate(event_years):
+        share = events // len(event_years) + (1 if i < events % len(event_years) else 0)
+        path = os.path.join(out_dir, _output_name(util.seasons.data_file_for(year)))
+        lines = _event_lines(world, share, *util.seasons.season_bounds(year))
+        written[path] = _write(path, lines, rng, malformed)
+    return written
+
+
+def _output_name(path: str) -> str:
+    """File name to write a data file as: the demo file becomes :data:`BADGE_FILE`."""
+    name = os.path.basename(path)
+    return BADGE_FILE if name == util.data.EXAMPLE else name
+
+
+def parse_arguments(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Generate synthetic badge and event data files.')
+    parser.add_argument('--out', help='Output directory (default: TH_BL_DATA_DIR).')
+    parser.add_argument('--badges', type=int, default=10000, help='Badges-mode lines (default: 10000).')
+    parser.add_argument('--events', type=int, default=1000, help='Events-mode lines (default: 1000).')
+    parser.add_argument(
+        '--seasons', type=int, default=4, help='Badges-mode seasons to spread badges over (default: 4).',
+    )
+    parser.add_argument('--trainers', type=int, help='Distinct trainers (default: scales with volume).')
+    parser.add_argument('--stores', type=int, help='Distinct stores (default: scales with trainers).')
+    parser.add_argument(
+        '--malformed', type=float, default=0.001, help='Fraction of malformed lines (default: 0.001).',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+    parser.add_argument('--force', action='store_true', help='Overwrite existing data files.')
+    return parser.parse_args(list(argv) if argv is not None else None)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_arguments(argv)
+    out_dir = args.out or util.data.DATA_DIR
+    if not out_dir:
+        # Without a data dir we'd scatter data files into the working directory.
+        raise SystemExit('Set TH_BL_DATA_DIR or pass --out')
+
+    targets = dict.fromkeys(
+        os.path.join(out_dir, _output_name(path)) for path in util.seasons.data_files()
+    )
+    existing = [path for path in targets if os.path.exists(path)]
+    if existing and not args.force:
+        raise SystemExit(f'Refusing to overwrite {", ".join(existing)} (pass --force)')
+
+    written = generate(
+        out_dir, badges=args.badges, events=args.events, seasons=args.seasons,
+        trainers=args.trainers, stores=args.stores, malformed=args.malformed, seed=args.seed,
+    )
+    for path, lines in written.items():
+        print(f'{path}: {lines} lines')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Per-request stage timing, reported as ``Server-Timing`` and structured logs.
+
+Wrap a stage in :func:`span` (or decorate it with :func:`timed`)::
+
+    with util.timing.span('parse'):
+        ...
+
+Inside a request, the elapsed time is added to that request's tally (repeat
+spans of one name are summed and counted). A span opened inside another of the
+same name is ignored -- the outer one already covers it -- so a timed function
+calling another never double-counts. Outside a request -- CLIs, benchmarks --
+a span is a no-op. :func:`install` hooks the Flask server:
+
+* each response gets a ``Server-Timing`` header, shown per request in the
+  browser's network panel, e.g. ``parse;dur=41.2, layout;dur=88.0,
+  total;dur=131.5``. Spans nest: ``layout`` includes the data stages it
+  triggered;
+* one JSON log line per request that recorded spans: path, Dash callback
+  output, season scope, status and every span. The scope is read from the
+  request, or set by the callback with :func:`set_scope`.
+
+Stages: ``stat`` / ``parse`` (util.data), ``normalize`` / ``sort``
+(util.seasons), ``aggregate`` (util.leaderboard, util.buckets), ``names``
+(util.names), ``layout`` (page layouts) and ``serialize`` (Dash's JSON
+encoding). A span costs about a microsecond, cheap enough for production.
+Set ``TH_BL_TIMING=0`` to turn it off entirely.
+"""
+import functools
+import json
+import logging
+import os
+import time
+import urllib.parse
+
+import flask
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv('TH_BL_TIMING', '1') != '0'
+
+
+def _spans():
+    if not ENABLED or not flask.has_request_context():
+        return None
+    return flask.g.get('timing_spans')
+
+
+class _Span:
+
+    __slots__ = ('name', 'spans', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.spans = _spans()
+        if self.spans is not None:
+            open_names = flask.g.timing_open
+            if self.name in open_names:
+                self.spans = None  # nested in a span of the same name
+            else:
+                open_names.add(self.name)
+                self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.spans is not None:
+            elapsed = time.perf_counter() - self.started
+            flask.g.timing_open.discard(self.name)
+            entry = self.spans.get(self.name)
+            if entry is None:
+                self.spans[self.name] = [elapsed, 1]
+            else:
+                entry[0] += elapsed
+                entry[1] += 1
+        return False
+
+
+def span(name):
+    """Context manager adding its elapsed time to the current request's ``name`` tally."""
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator form of :func:`span`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def server_timing(spans, total):
+    """Format spans (``{name: [seconds, count]}``) as a ``Server-Timing`` value."""
+    parts = []
+    for name, (seconds, count) in spans.items():
+        part = f'{name};dur={seconds * 1000:.1f}'
+        if count > 1:
+            part += f';desc="{count}x"'
+        parts.append(part)
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def set_scope(season):
+    """Record the current request's season scope for its log line.
+
+    For callbacks whose inputs don't carry the season (e.g. a tab whose value
+    is a date); a no-op outside a timed request.
+    """
+    if _spans() is not None:
+        flask.g.timing_scope = season
+
+
+def _scope(body):
+    """Season scope of the current request: :func:`set_scope`, else the query string or callback values."""
+    if flask.g.get('timing_scope') is not None:
+        return flask.g.timing_scope
+    season = flask.request.args.get('season')
+    if season or not isinstance(body, dict):
+        return season
+    for item in (body.get('inputs') or []) + (body.get('state') or []):
+        if not isinstance(item, dict):
+            continue
+        component_id, value = item.get('id'), item.get('value')
+        if item.get('property') == 'search' and isinstance(value, str):
+            season = urllib.parse.parse_qs(value.lstrip('?')).get('season')
+            if season:
+                return season[0]
+        elif isinstance(component_id, str) and component_id.endswith('-season') and value is not None:
+            return value
+    return None
+
+
+def _begin():
+    flask.g.timing_spans = {}
+    flask.g.timing_open = set()
+    flask.g.timing_started = time.perf_counter()
+
+
+def _finish(response):
+    spans = flask.g.get('timing_spans')
+    if spans is None:
+        return response
+    total = time.perf_counter() - flask.g.timing_started
+    response.headers['Server-Timing'] = server_timing(spans, total)
+    if spans:
+        request = flask.request
+        body = request.get_json(silent=True) if request.is_json else None
+        logger.info(json.dumps({
+            'event': 'request_timing',
+            'method': request.method,
+            'path': request.path,
+            'callback': body.get('output') if isinstance(body, dict) else None,
+            'scope': _scope(body),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'spans': {name: {'ms': round(s * 1000, 1), 'count': n} for name, (s, n) in spans.items()},
+        }))
+    return response
+
+
+def _wrap_layouts():
+    """Time every page's layout function (Dash reads them from the registry per request)."""
+    import dash
+
+    for page in dash.page_registry.values():
+        layout = page.get('layout')
+        if callable(layout) and not getattr(layout, '_timed', False):
+            page['layout'] = timed('layout')(layout)
+            page['layout']._timed = True
+
+
+def _wrap_serializer():
+    """Time Dash's response encoding (``dash._utils.to_json`` looks this up per call)."""
+    import plotly.io.json
+
+    encode = plotly.io.json.to_json_plotly
+    if getattr(encode, '_timed', False):
+        return
+    plotly.io.json.to_json_plotly = timed('serialize')(encode)
+    plotly.io.json.to_json_plotly._timed = True
+
+
+def install(app):
+    """Enable request timing on a Dash ``app``; a no-op when ``TH_BL_TIMING=0``."""
+    if not ENABLED:
+        return
+    if not logger.handlers:
+        # One line per request on stderr, which gunicorn already collects.
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    app.server.before_request(_begin)
+    app.server.after_request(_finish)
+    _wrap_layouts()
+    _wrap_serializer()
@@ -0,0 +1,165 @@
+"""Pooled, rate-limit-aware HTTP client for a Discord webhook.
+
+Discord throttles webhooks per route and answers bursts with ``429`` plus a
+``retry_after``; a bare ``requests.post`` per announcement opens a fresh
+connection each time and drops anything throttled. :class:`WebhookClient`
+instead:
+
+* reuses one ``requests.Session`` (keep-alive, pooled connections);
+* paces posts with a token bucket (default 5 per 2 seconds, Discord's
+  documented webhook rate), and additionally waits out the bucket reported by
+  ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset-After`` response headers;
+* on ``429`` sleeps ``retry_after`` (body or ``Retry-After`` header) and
+  retries; on connection errors and ``5xx`` retries with exponential backoff;
+* counts what happened in :attr:`metrics` (served per worker by the app's
+  ``/api/discord-stats``).
+
+The URL is a constructor argument, so the client can be pointed at a local
+stub server; ``python -m util.webhook_check`` does exactly that to exercise
+the retry and pacing logic.
+"""
+import json
+import logging
+import threading
+import time
+
+import requests
+import requests.adapters
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookError(Exception):
+    """Raised when a post still fails after every retry."""
+
+
+class TokenBucket:
+    """``rate`` tokens per ``per`` seconds, bursting up to ``rate``."""
+
+    def __init__(self, rate=5, per=2.0):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def block_for(self, seconds):
+        """Hold every caller for ``seconds`` (server-reported limits)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+
+class WebhookClient:
+
+    def __init__(self, url, rate=5, per=2.0, max_retries=4, backoff=0.5, timeout=10, pool_size=4):
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, per)
+        self.metrics = {'queued': 0, 'sent': 0, 'failed': 0, 'retried': 0, 'rate_limited': 0}
+        self._pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def snapshot(self):
+        """Return a copy of the counters."""
+        with self._lock:
+            return dict(self.metrics)
+
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self._pool_size,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def _retry_after(self, resp):
+        try:
+            return float(resp.json().get('retry_after'))
+        except (ValueError, TypeError, AttributeError):
+            pass
+        try:
+            return float(resp.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _note_headers(self, resp):
+        """Respect the bucket Discord reports even before it says 429."""
+        if resp.headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                self.bucket.block_for(float(resp.headers.get('X-RateLimit-Reset-After', 0)))
+            except ValueError:
+                pass
+
+    def post(self, payload, files=None):
+        """Send one message. ``files`` is ``[(filename, bytes, mimetype), ...]``.
+
+        Returns the final response; raises :class:`WebhookError` once retries
+        are exhausted.
+        """
+        self._count('queued')
+        kwargs = {'timeout': self.timeout}
+        if files:
+            kwargs['data'] = {'payload_json': json.dumps(payload)}
+            kwargs['files'] = {f'files[{i}]': file for i, file in enumerate(files)}
+        else:
+            kwargs['json'] = payload
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retried')
+            self.bucket.acquire()
+            try:
+                resp = self.session().post(self.url, **kwargs)
+            except requests.RequestException as e:
+                error, delay = e, self.backoff * 2 ** attempt
+            else:
+                self._note_headers(resp)
+                if resp.status_code == 429:
+                    self._count('rate_limited')
+                    delay = self._retry_after(resp)
+                    if resp.headers.get('X-RateLimit-Global'):
+                        self.bucket.block_for(delay)
+                    error = f'rate limited (retry after {delay}s)'
+                elif resp.status_code >= 500:
+                    error, delay = f'HTTP {resp.status_code}', self.backoff * 2 ** attempt
+                elif resp.status_code >= 400:
+                    # Bad payload or a deleted webhook: retrying won't help.
+                    self._count('failed')
+                    raise WebhookError(f'HTTP {resp.status_code}: {resp.text[:200]}')
+                else:
+                    self._count('sent')
+                    return resp
+            if attempt == self.max_retries:
+                break  # no point waiting before giving up
+            time.sleep(delay)
+        self._count('failed')
+        logger.warning('Webhook post failed; counters: %s', self.snapshot())
+        raise WebhookError(f'Gave up after {self.max_retries + 1} attempts: {error}')
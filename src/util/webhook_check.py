@@ -0,0 +1,172 @@
+"""Exercise ``util.webhook.WebhookClient`` against a local stub server.
+
+Starts a throwaway HTTP server on 127.0.0.1 that answers each POST from a
+script of canned responses and records when it arrived, then checks:
+
+* 429: a ``retry_after`` in the body is waited out before the retry, and the
+  post succeeds;
+* 5xx: retries back off exponentially, and after the last attempt the client
+  raises straight away instead of sleeping once more;
+* 4xx: no retry;
+* pacing: a burst is spread out by the token bucket, and an
+  ``X-RateLimit-Remaining: 0`` response holds the next post for
+  ``X-RateLimit-Reset-After``.
+
+No network or Discord access needed. Exits 1 if any check fails::
+
+    PYTHONPATH=src python -m util.webhook_check
+"""
+from __future__ import annotations
+
+import http.server
+import json
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import util.webhook
+
+Response = Tuple[int, Dict[str, str], dict]
+
+
+class StubServer:
+    """Answers POSTs with ``responses`` in order (the last one repeats); records arrival times."""
+
+    def __init__(self, responses: List[Response]):
+        self.responses = list(responses)
+        self.arrivals: List[float] = []
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                stub.arrivals.append(time.monotonic())
+                status, headers, body = stub.responses[min(len(stub.arrivals), len(stub.responses)) - 1]
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/webhook'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def gaps(self) -> List[float]:
+        return [b - a for a, b in zip(self.arrivals, self.arrivals[1:])]
+
+
+def _client(url: str, **kwargs) -> util.webhook.WebhookClient:
+    options = {'rate': 100, 'per': 1.0, 'max_retries': 3, 'backoff': 0.1, 'timeout': 5}
+    options.update(kwargs)
+    return util.webhook.WebhookClient(url, **options)
+
+
+def check_rate_limited() -> Optional[str]:
+    with StubServer([(429, {}, {'retry_after': 0.4}), (204, {}, {})]) as stub:
+        client = _client(stub.url)
+        client.post({'content': 'hi'})
+    metrics = client.snapshot()
+    if len(stub.arrivals) != 2:
+        return f'expected 2 requests, got {len(stub.arrivals)}'
+    if stub.gaps()[0] < 0.4:
+        return f'retried after {stub.gaps()[0]:.2f}s, before retry_after (0.4s)'
+    if metrics['rate_limited'] != 1 or metrics['sent'] != 1:
+        return f'unexpected counters {metrics}'
+    return None
+
+
+def check_server_errors() -> Optional[str]:
+    with StubServer([(502, {}, {})]) as stub:
+        client = _client(stub.url)
+        started = time.monotonic()
+        try:
+            client.post({'content': 'hi'})
+        except util.webhook.WebhookError:
+            pass
+        else:
+            return 'no WebhookError after persistent 5xx'
+        elapsed = time.monotonic() - started
+    gaps = stub.gaps()
+    if len(stub.arrivals) != 4:
+        return f'expected 4 attempts, got {len(stub.arrivals)}'
+    # Backoff 0.1, 0.2, 0.4 between attempts, nothing after the last.
+    if any(gap < expected * 0.9 for gap, expected in zip(gaps, (0.1, 0.2, 0.4))):
+        return f'backoff gaps too short: {[round(g, 2) for g in gaps]}'
+    if elapsed - (stub.arrivals[-1] - started) > 0.3:
+        return f'slept {elapsed - (stub.arrivals[-1] - started):.2f}s after the final attempt'
+    if client.snapshot()['failed'] != 1:
+        return f'unexpected counters {client.snapshot()}'
+    return None
+
+
+def check_client_error() -> Optional[str]:
+    with StubServer([(400, {}, {'message': 'bad payload'})]) as stub:
+        try:
+            _client(stub.url).post({'content': 'hi'})
+        except util.webhook.WebhookError:
+            pass
+        else:
+            return 'no WebhookError on 400'
+    if len(stub.arrivals) != 1:
+        return f'retried a 400 ({len(stub.arrivals)} requests)'
+    return None
+
+
+def check_bucket_pacing() -> Optional[str]:
+    with StubServer([(204, {}, {})]) as stub:
+        client = _client(stub.url, rate=2, per=0.5)
+        for _ in range(6):
+            client.post({'content': 'hi'})
+    # 2 burst immediately, the remaining 4 at 4 per second.
+    span = stub.arrivals[-1] - stub.arrivals[0]
+    if span < 0.9:
+        return f'6 posts at 2 per 0.5s took {span:.2f}s, expected about 1s'
+    return None
+
+
+def check_reported_bucket() -> Optional[str]:
+    headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.5'}
+    with StubServer([(204, headers, {}), (204, {}, {})]) as stub:
+        client = _client(stub.url)
+        client.post({'content': 'one'})
+        client.post({'content': 'two'})
+    if stub.gaps()[0] < 0.45:
+        return f'second post after {stub.gaps()[0]:.2f}s, before the reported reset (0.5s)'
+    return None
+
+
+CHECKS: Dict[str, Callable[[], Optional[str]]] = {
+    '429 retry_after': check_rate_limited,
+    '5xx backoff': check_server_errors,
+    '4xx no retry': check_client_error,
+    'bucket pacing': check_bucket_pacing,
+    'reported bucket': check_reported_bucket,
+}
+
+
+def main() -> int:
+    failures = 0
+    for name, check in CHECKS.items():
+        problem = check()
+        print(f'{name:<16} {"ok" if problem is None else "FAIL: " + problem}')
+        failures += problem is not None
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())